@@ -0,0 +1,19 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from services.assets import build_assets
+
+assets_cli = AppGroup('assets', help='Static asset pipeline.')
+
+
+@assets_cli.command('build')
+def build():
+    """Fingerprint and precompress static/src/ into static/dist/ (run at build time)."""
+    built = build_assets(current_app.static_folder)
+    for name, hashed, sizes in built:
+        compressed = ', '.join(f'{encoding} {size / 1024:.1f} KB' for encoding, size in sizes.items() if encoding != 'identity')
+        click.echo(f'{name} -> {hashed} ({sizes["identity"] / 1024:.1f} KB; {compressed})')
+    if built and 'br' not in built[0][2]:
+        click.echo('brotli is not installed: wrote gzip copies only')
+    click.echo(f'Wrote {len(built)} assets and the manifest')
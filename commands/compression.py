@@ -0,0 +1,93 @@
+import sys
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from commands.db import SKIP_ENDPOINTS, sample_url_args
+from database import db
+from services.compression import COMPRESSIBLE_TYPES, _brotli, make_compressor
+
+compression_cli = AppGroup('compression', help='Response compression.')
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 11)
+
+
+def _page_bodies(client, sample, min_size):
+    """Uncompressed bodies of the GET routes that the middleware would compress"""
+    bodies = []
+    for rule in current_app.url_map.iter_rules():
+        if 'GET' not in rule.methods or rule.endpoint in SKIP_ENDPOINTS:
+            continue
+        if not set(rule.arguments) <= set(sample):
+            continue
+
+        url = rule.build({arg: sample[arg] for arg in rule.arguments}, append_unknown=False)[1]
+        # No Accept-Encoding, so the middleware passes the body through as is
+        response = client.get(url)
+        if response.status_code == 200 and response.mimetype.startswith(COMPRESSIBLE_TYPES):
+            if len(response.data) >= min_size:
+                bodies.append((url, response.data))
+    return bodies
+
+
+def _compress(encoding, level, body):
+    compressor = make_compressor(encoding, gzip_level=level, brotli_quality=level)
+    return compressor.compress(body) + compressor.finish()
+
+
+@compression_cli.command('bench')
+@click.option('--repeat', default=20, show_default=True, help='Compressions per page and setting.')
+def bench(repeat):
+    """Bytes saved against CPU time per response for each gzip level and brotli quality."""
+    sample = sample_url_args()
+    db.session.rollback()
+    if sample is None:
+        click.echo('Need at least one game and group member in the database to render the pages')
+        sys.exit(1)
+
+    client = current_app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(sample['user_id'])
+        session['_fresh'] = True
+
+    bodies = _page_bodies(client, sample, current_app.config['COMPRESSION_MIN_SIZE'])
+    if not bodies:
+        click.echo('No page is large enough to compress')
+        sys.exit(1)
+
+    total = sum(len(body) for _, body in bodies)
+    click.echo(f'{len(bodies)} pages, {total / 1024:.1f} KB uncompressed:')
+    for url, body in bodies:
+        click.echo(f'  {url} {len(body) / 1024:.1f} KB')
+
+    settings = [('gzip', level) for level in GZIP_LEVELS]
+    if _brotli() is not None:
+        settings += [('br', quality) for quality in BROTLI_QUALITIES]
+    else:
+        click.echo('brotli is not installed: measuring gzip only')
+
+    click.echo(f'\n{"setting":<10} {"bytes":>10} {"saved":>7} {"ms/response":>12} {"KB saved/ms":>12}')
+    for encoding, level in settings:
+        compressed = sum(len(_compress(encoding, level, body)) for _, body in bodies)
+
+        started = time.process_time()
+        for _ in range(repeat):
+            for _, body in bodies:
+                _compress(encoding, level, body)
+        per_response = (time.process_time() - started) * 1000 / (repeat * len(bodies))
+
+        saved = total - compressed
+        click.echo(
+            f'{encoding + " " + str(level):<10} {compressed:>10} {saved / total:>7.1%} '
+            f'{per_response:>12.2f} {saved / 1024 / len(bodies) / per_response:>12.1f}'
+        )
+
+    click.echo(
+        f'\nServing gzip level {current_app.config["COMPRESSION_GZIP_LEVEL"]}, '
+        f'brotli quality {current_app.config["COMPRESSION_BROTLI_QUALITY"]}, '
+        f'from {current_app.config["COMPRESSION_MIN_SIZE"]} bytes '
+        f'(COMPRESSION_ENABLED={current_app.config["COMPRESSION_ENABLED"]})'
+    )
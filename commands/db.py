@@ -0,0 +1,458 @@
+import multiprocessing
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import create_engine, event, exc, func, insert, inspect, select, update
+from sqlalchemy.engine import Engine
+
+from database import db
+from services.schema_migrations import DEFAULT_BATCH_SIZE, applied_versions, discover_migrations, upgrade_database
+from services.sharding import (LAYOUT_TABLE, MAX_SHARDS, SHARDED_TABLES, ShardError, shard_path, split_database,
+                               track_shard_versions)
+from services.snapshots import DEFAULT_PAGES, SnapshotError, list_snapshots, prune_snapshots, take_snapshot
+
+db_cli = AppGroup('db', help='Schema migrations, snapshots, sharding and query plan checks.')
+
+
+def _migrations_dir():
+    return os.path.join(current_app.root_path, 'migrations')
+
+
+def _shard_router():
+    """The shard router, or None for an unsplit database"""
+    router = current_app.extensions.get('db_shards')
+    if router is None and db.engine.dialect.name == 'sqlite':
+        with db.engine.connect() as connection:
+            if inspect(connection).has_table(LAYOUT_TABLE):
+                raise click.ClickException('The database is split into shards; set DB_SHARDS to its shard count')
+    return router
+
+
+@db_cli.command('upgrade')
+@click.option('--dry-run', is_flag=True, help='Show the SQL pending migrations would run, then roll back.')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Rows per backfill transaction.')
+@click.option('--pause-ms', default=50, show_default=True, help='Pause between backfill batches.')
+def upgrade(dry_run, batch_size, pause_ms):
+    """Apply pending migrations from migrations/ in version order.
+
+    Creates the schema on an empty database. With DB_SHARDS, migrates the
+    directory and then each shard file.
+    """
+    options = dict(dry_run=dry_run, batch_size=batch_size, pause=pause_ms / 1000, echo=click.echo)
+    router = _shard_router()
+    if router is None:
+        changed = upgrade_database(db.engine, db.metadata, _migrations_dir(), **options)
+        engines = [db.engine]
+    else:
+        for engine in router.engines:
+            track_shard_versions(engine)
+        directory_tables = set(db.metadata.tables) - SHARDED_TABLES
+        click.echo('Directory:')
+        changed = upgrade_database(db.engine, db.metadata, _migrations_dir(), tables=directory_tables, **options)
+        for shard, engine in enumerate(router.engines):
+            click.echo(f'Shard {shard}:')
+            changed = upgrade_database(
+                engine, db.metadata, _migrations_dir(), tables=SHARDED_TABLES, **options
+            ) or changed
+        engines = [db.engine, *router.engines]
+
+    if changed and not dry_run:
+        # Pooled connections keep the planner statistics they loaded before
+        for engine in engines:
+            engine.dispose()
+
+
+@db_cli.command('status')
+def status():
+    """List migrations and whether they are applied, per shard with DB_SHARDS."""
+    router = _shard_router()
+    files = [('', db.engine)]
+    if router is not None:
+        for engine in router.engines:
+            track_shard_versions(engine)
+        files += [(f'shard {shard} ', engine) for shard, engine in enumerate(router.engines)]
+
+    for label, engine in files:
+        with engine.begin() as connection:
+            applied = applied_versions(connection)
+
+        for version, name, path in discover_migrations(_migrations_dir()):
+            if version not in applied:
+                state = 'pending'
+            elif applied[version] is None:
+                state = 'backfill pending'
+            else:
+                state = 'applied'
+            click.echo(f'{label}{version:04d}_{name}: {state}')
+
+
+@db_cli.command('snapshot')
+@click.option('--dir', 'directory', default=None,
+              help='Where to write snapshots (default SNAPSHOT_DIR or instance/snapshots).')
+@click.option('--pages', default=DEFAULT_PAGES, show_default=True, help='Pages copied per backup step.')
+@click.option('--pause-ms', default=50, show_default=True, help='Pause between backup steps.')
+@click.option('--no-compress', is_flag=True, help='Keep the snapshot as a plain .db file.')
+@click.option('--keep-last', default=7, show_default=True, help='Always keep this many newest snapshots.')
+@click.option('--keep-daily', default=14, show_default=True, help='Keep the newest snapshot of each of the last N days.')
+@click.option('--keep-weekly', default=8, show_default=True, help='Keep the newest snapshot of each of the last N weeks.')
+def snapshot(directory, pages, pause_ms, no_compress, keep_last, keep_daily, keep_weekly):
+    """Copy the live SQLite database without stopping the app, verify it and rotate old snapshots."""
+    if db.engine.dialect.name != 'sqlite' or db.engine.url.database in (None, '', ':memory:'):
+        raise click.ClickException('Snapshots copy a SQLite file; back up other databases with their own tools')
+
+    router = _shard_router()
+    shards = []
+    if router is not None:
+        shards = [shard_path(current_app.config['SHARD_DIR'], shard) for shard in range(router.shard_count)]
+
+    directory = directory or current_app.config.get('SNAPSHOT_DIR') or os.path.join(current_app.instance_path, 'snapshots')
+    try:
+        path, stats = take_snapshot(
+            db.engine.url.database, directory, pages=pages, pause=pause_ms / 1000, compress=not no_compress,
+            shards=shards
+        )
+    except (SnapshotError, sqlite3.Error) as e:
+        raise click.ClickException(f'Snapshot failed: {e}')
+
+    click.echo(
+        f'Wrote {path}{f" and {len(shards)} shard files" if shards else ""} ({stats["size"] / 1024:.0f} KB, '
+        f'{stats["pages"]} pages, {stats["restarts"]} restarts, {stats["seconds"]:.2f} s); integrity check ok'
+    )
+    if stats['single_step']:
+        click.echo('Writes kept restarting the stepped copy, so the rest was copied in one step')
+
+    for deleted in prune_snapshots(directory, keep_last=keep_last, keep_daily=keep_daily, keep_weekly=keep_weekly):
+        click.echo(f'Removed {deleted}')
+    click.echo(f'{len(list_snapshots(directory))} snapshots in {directory}')
+
+
+@db_cli.command('split-shards')
+@click.option('--shards', type=click.IntRange(1, MAX_SHARDS), default=None,
+              help='Number of shard files (default DB_SHARDS).')
+@click.option('--no-snapshot', is_flag=True, help='Skip the snapshot taken before splitting.')
+def split_shards(shards, no_snapshot):
+    """Move group-scoped tables into shard files under SHARD_DIR (run with the app stopped)."""
+    shards = shards or current_app.config['DB_SHARDS']
+    if not shards:
+        raise click.ClickException('Pass --shards or set DB_SHARDS')
+    if db.engine.dialect.name != 'sqlite' or db.engine.url.database in (None, '', ':memory:'):
+        raise click.ClickException('Sharding splits a SQLite database file')
+
+    path = db.engine.url.database
+    if os.path.exists(shard_path(current_app.config['SHARD_DIR'], 0)):
+        raise click.ClickException(f'{current_app.config["SHARD_DIR"]} already holds shards')
+    if not no_snapshot:
+        directory = current_app.config.get('SNAPSHOT_DIR') or os.path.join(current_app.instance_path, 'snapshots')
+        snapshot_path, _ = take_snapshot(path, directory)
+        click.echo(f'Snapshot of the unsplit database: {snapshot_path}')
+
+    try:
+        split_database(path, current_app.config['SHARD_DIR'], shards, db.metadata, echo=click.echo)
+    except (ShardError, sqlite3.Error) as e:
+        raise click.ClickException(f'Split failed, nothing was changed: {e}')
+
+    click.echo(f'Split into {shards} shards in {current_app.config["SHARD_DIR"]}; start the app with DB_SHARDS={shards}')
+
+
+# Tables that grow with usage; a full scan of one of these is a bug
+GROWING_TABLES = {
+    'game', 'group_membership', 'availability_vote', 'team_assignment',
+    'match_event', 'potm_vote', 'feed_item', 'notification',
+    'admin_player_rating', 'player_attributes', 'player_pair_stat', 'player_form', 'data_version'
+}
+
+# GET routes with side effects
+SKIP_ENDPOINTS = {'static', 'auth.logout'}
+
+_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+
+
+def sample_url_args():
+    """IDs from the current database to fill in route arguments"""
+    from models import Game, GroupMembership
+
+    game = Game.query.filter_by(status='finished').order_by(Game.id.desc()).first() or Game.query.first()
+    if game is None:
+        return None
+
+    membership = GroupMembership.query.filter_by(group_id=game.group_id).order_by(
+        GroupMembership.is_admin.desc()
+    ).first()
+    if membership is None:
+        return None
+
+    return {
+        'user_id': membership.user_id,
+        'group_id': game.group_id,
+        'game_id': game.id,
+        'invite_code': game.group.invite_code
+    }
+
+
+def _scanned_table(detail):
+    match = _SCAN.match(detail)
+    if not match:
+        return None
+
+    # SQLAlchemy aliases tables as <table>_<n>; subqueries are anon_<n>
+    name = re.sub(r'_\d+$', '', match.group(1))
+    return name if name in GROWING_TABLES else None
+
+
+@db_cli.command('explain')
+@click.option('--min-rows', default=1000, show_default=True,
+              help='Only fail on scans of tables with at least this many rows.')
+def explain(min_rows):
+    """EXPLAIN QUERY PLAN every SELECT issued by the GET routes and fail on full scans."""
+    if db.engine.dialect.name != 'sqlite':
+        click.echo('EXPLAIN QUERY PLAN checks only run on SQLite')
+        return
+    if current_app.extensions.get('db_shards') is not None:
+        # Plans would go through the directory's views over all shards, not the shard each statement ran on
+        click.echo('EXPLAIN QUERY PLAN checks run on an unsharded database; unset DB_SHARDS')
+        return
+
+    sample = sample_url_args()
+    # CLI transactions begin IMMEDIATE; don't hold the write lock while the routes run
+    db.session.rollback()
+    if sample is None:
+        click.echo('Need at least one game and group member in the database to exercise the routes')
+        sys.exit(1)
+
+    table_rows = {}
+    with db.engine.connect().execution_options(read_only=True) as connection:
+        for table in GROWING_TABLES:
+            try:
+                table_rows[table] = connection.exec_driver_sql(f'SELECT count(*) FROM "{table}"').scalar()
+            except Exception:
+                table_rows[table] = 0
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')) and not executemany:
+            captured.append((statement, parameters))
+
+    client = current_app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(sample['user_id'])
+        session['_fresh'] = True
+
+    # Every engine, so statements sent to the read replica are checked too
+    event.listen(Engine, 'before_cursor_execute', capture)
+    try:
+        for rule in current_app.url_map.iter_rules():
+            if 'GET' not in rule.methods or rule.endpoint in SKIP_ENDPOINTS:
+                continue
+            if not set(rule.arguments) <= set(sample):
+                continue
+
+            url = rule.build({arg: sample[arg] for arg in rule.arguments}, append_unknown=False)[1]
+            status = client.get(url).status_code
+            click.echo(f'{status} {url}')
+    finally:
+        event.remove(Engine, 'before_cursor_execute', capture)
+
+    seen = set()
+    failures = []
+    with db.engine.connect().execution_options(read_only=True) as connection:
+        for statement, parameters in captured:
+            if statement in seen:
+                continue
+            seen.add(statement)
+
+            plan = [row[3] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+            scans = [detail for detail in plan
+                     if (table := _scanned_table(detail)) and table_rows.get(table, 0) >= min_rows]
+            if scans:
+                failures.append((statement, plan))
+
+    click.echo(f'Checked {len(seen)} distinct statements')
+    for statement, plan in failures:
+        click.echo(f'\nFull scan in:\n{statement}\nPlan:\n  ' + '\n  '.join(plan))
+
+    if failures:
+        click.echo(f'\n{len(failures)} statement(s) scan a large table')
+        sys.exit(1)
+
+
+def _stress_engine(url, engine_options, pragmas):
+    from services.sqlite_profile import configure_sqlite_engine
+
+    if pragmas is None:
+        # Baseline: the rollback journal and pysqlite's 5 s busy timeout, with
+        # deferred transactions that begin at their first statement, as the
+        # app had before the profile. A writer's read takes a shared lock it
+        # then has to upgrade; when two writers hold one, SQLite fails one of
+        # them with "database is locked" at once instead of waiting.
+        engine = create_engine(url)
+
+        @event.listens_for(engine, 'connect')
+        def explicit_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, 'begin')
+        def begin_deferred(connection):
+            connection.connection.driver_connection.execute('BEGIN')
+
+        return engine
+    engine = create_engine(url, **engine_options)
+    configure_sqlite_engine(engine, pragmas)
+    return engine
+
+
+def _stress_reader(connection, user_id, game_id):
+    """The reads of a game page and a notification poll"""
+    from models import AvailabilityVote, Notification
+
+    connection.execute(select(AvailabilityVote.status, func.count()).where(
+        AvailabilityVote.game_id == game_id
+    ).group_by(AvailabilityVote.status)).all()
+    connection.execute(select(Notification).where(
+        Notification.user_id == user_id
+    ).order_by(Notification.created_at.desc()).limit(20)).all()
+    connection.execute(select(func.count()).where(
+        Notification.user_id == user_id, Notification.is_read.is_(False)
+    )).scalar()
+
+
+def _stress_transaction(engine, reader, user_id, user_ids, game_id, i):
+    from models import AvailabilityVote, Notification
+
+    if reader:
+        with engine.connect().execution_options(read_only=True) as connection:
+            _stress_reader(connection, user_id, game_id)
+        return
+
+    with engine.begin() as connection:
+        # Read first, as the routes do in their access checks
+        voted = connection.execute(select(AvailabilityVote.id).where(
+            AvailabilityVote.game_id == game_id, AvailabilityVote.user_id == user_id
+        )).scalar()
+
+        status = ('in', 'out', 'maybe')[i % 3]
+        if voted:
+            connection.execute(update(AvailabilityVote).where(
+                AvailabilityVote.id == voted
+            ).values(status=status))
+        else:
+            connection.execute(insert(AvailabilityVote).values(
+                game_id=game_id, user_id=user_id, status=status
+            ))
+
+        connection.execute(insert(Notification), [
+            {'user_id': member_id, 'type': 'vote', 'title': 'Vote', 'message': status,
+             'game_id': game_id, 'is_read': False}
+            for member_id in user_ids if member_id != user_id
+        ])
+
+
+def _is_lock_error(error):
+    return 'locked' in str(error) or 'busy' in str(error)
+
+
+def _stress_worker(url, engine_options, pragmas, user_id, user_ids, game_id, writes, reader, think, ready):
+    """
+    One process either voting and fanning out notifications like a
+    match-day route, or polling the pages those writes change
+    """
+    engine = _stress_engine(url, engine_options, pragmas)
+
+    # Warm up: connect and compile the statements before the clock starts,
+    # as a long-running worker would have
+    while True:
+        try:
+            _stress_transaction(engine, reader, user_id, user_ids, game_id, 0)
+            break
+        except (exc.OperationalError, sqlite3.OperationalError) as e:
+            if not _is_lock_error(e):
+                raise
+    ready.wait()
+
+    committed = locked = 0
+    for i in range(writes):
+        # Time spent outside the database handling the request
+        time.sleep(random.uniform(0, 2 * think))
+        try:
+            _stress_transaction(engine, reader, user_id, user_ids, game_id, i)
+            committed += 1
+        except (exc.OperationalError, sqlite3.OperationalError) as e:
+            # BEGIN IMMEDIATE fails with the driver's own exception
+            if not _is_lock_error(e):
+                raise
+            locked += 1
+
+    engine.dispose()
+    return committed, locked
+
+
+@db_cli.command('stress')
+@click.option('--workers', default=8, show_default=True, help='Concurrent writer processes.')
+@click.option('--readers', default=8, show_default=True, help='Concurrent reader processes.')
+@click.option('--writes', default=200, show_default=True, help='Transactions per process.')
+@click.option('--think-ms', default=5, show_default=True, help='Mean time between transactions of one process.')
+@click.option('--baseline', is_flag=True, help='Use the pre-profile settings (rollback journal, deferred transactions) instead.')
+def stress(workers, readers, writes, think_ms, baseline):
+    """Run concurrent vote and notification writes on a scratch SQLite database and count lock errors."""
+    from models import Game, Group, GroupMembership, User
+
+    scratch = tempfile.mkdtemp(prefix='footmob-stress-')
+    url = f'sqlite:///{os.path.join(scratch, "stress.db")}'
+    engine_options = current_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    pragmas = None if baseline else current_app.config['SQLITE_PRAGMAS']
+
+    engine = _stress_engine(url, engine_options, pragmas)
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        group_id = connection.execute(insert(Group).values(name='Stress', data_version=0)).inserted_primary_key[0]
+        user_ids = [
+            connection.execute(insert(User).values(
+                username=f'stress{i}', display_name=f'Stress {i}', password_hash='-'
+            )).inserted_primary_key[0]
+            for i in range(workers)
+        ]
+        connection.execute(insert(GroupMembership), [
+            {'user_id': user_id, 'group_id': group_id, 'is_admin': False} for user_id in user_ids
+        ])
+        game_id = connection.execute(insert(Game).values(
+            group_id=group_id, datetime=datetime.now(timezone.utc), status='upcoming', data_version=0
+        )).inserted_primary_key[0]
+    engine.dispose()
+
+    think = think_ms / 1000
+    with multiprocessing.Manager() as manager:
+        # Start the measured run once every process has warmed up
+        ready = manager.Barrier(workers + readers + 1)
+        jobs = [(url, engine_options, pragmas, user_id, user_ids, game_id, writes, False, think, ready)
+                for user_id in user_ids]
+        jobs += [(url, engine_options, pragmas, user_ids[i % workers], user_ids, game_id, writes, True, think, ready)
+                 for i in range(readers)]
+
+        with multiprocessing.Pool(len(jobs)) as pool:
+            pending = pool.starmap_async(_stress_worker, jobs)
+            ready.wait()
+            started = time.perf_counter()
+            results = pending.get()
+        elapsed = time.perf_counter() - started
+
+    writes_done = sum(result[0] for result in results[:workers])
+    reads_done = sum(result[0] for result in results[workers:])
+    locked = sum(result[1] for result in results)
+    click.echo(f'{"Baseline" if baseline else "Profile"}: {workers} writers, {readers} readers '
+               f'x {writes} transactions in {elapsed:.1f}s')
+    click.echo(f'  writes committed: {writes_done} ({writes_done / elapsed:.0f}/s)')
+    click.echo(f'  reads completed: {reads_done} ({reads_done / elapsed:.0f}/s)')
+    click.echo(f'  "database is locked" errors: {locked}')
+
+    # The baseline is expected to hit lock errors; the profile should not
+    if locked and not baseline:
+        sys.exit(1)
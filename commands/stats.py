@@ -0,0 +1,180 @@
+import json
+import os
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from database import db
+from models import Game, Group, MatchEvent, TeamAssignment
+from services.match_stats import replace_applied_games
+from services.pair_stats import PairStatsRebuilder
+from services.recent_form import RecentFormRebuilder
+from services.sharding import use_shard
+
+stats_cli = AppGroup('stats', help='Maintain denormalized match statistics.')
+
+# Rebuilders for every materialized stat, each constructed per group
+REBUILDERS = [PairStatsRebuilder, RecentFormRebuilder]
+
+CHECKPOINT_FILE = 'stats_rebuild.checkpoint.json'
+
+
+def _checkpoint_path():
+    return os.path.join(current_app.instance_path, CHECKPOINT_FILE)
+
+
+def _load_checkpoint(run_args):
+    """Groups already rebuilt by an interrupted run with the same arguments"""
+    try:
+        with open(_checkpoint_path(), 'r') as f:
+            checkpoint = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return set()
+    
+    if checkpoint.get('args') != run_args:
+        return set()
+    return set(checkpoint.get('completed_group_ids', []))
+
+
+def _save_checkpoint(run_args, completed_group_ids):
+    path = _checkpoint_path()
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'args': run_args, 'completed_group_ids': sorted(completed_group_ids)}, f)
+    os.replace(tmp_path, path)
+
+
+def _clear_checkpoint():
+    try:
+        os.remove(_checkpoint_path())
+    except FileNotFoundError:
+        pass
+
+
+def stream_finished_games(group_id, chunk_size):
+    """
+    Yield a group's finished games in id order, chunk by chunk, together
+    with their team assignments and events.
+
+    Yields:
+        (games, assignments_by_game, events_by_game) per chunk
+    """
+    # Plain rows rather than ORM objects, so nothing accumulates in the session
+    query = db.session.query(Game.id, Game.datetime).filter(
+        Game.group_id == group_id,
+        Game.status == 'finished'
+    ).order_by(Game.id).yield_per(chunk_size)
+    
+    chunk = []
+    for game in query:
+        chunk.append(game)
+        if len(chunk) >= chunk_size:
+            yield _load_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield _load_chunk(chunk)
+
+
+def _load_chunk(games):
+    game_ids = [game.id for game in games]
+    assignments = {game_id: [] for game_id in game_ids}
+    events = {game_id: [] for game_id in game_ids}
+    
+    for game_id, user_id, team in db.session.query(
+        TeamAssignment.game_id, TeamAssignment.user_id, TeamAssignment.team
+    ).filter(TeamAssignment.game_id.in_(game_ids)).order_by(TeamAssignment.id):
+        assignments[game_id].append((user_id, team))
+    
+    for game_id, event_type, scorer_id, assist_id in db.session.query(
+        MatchEvent.game_id, MatchEvent.event_type, MatchEvent.scorer_id, MatchEvent.assist_id
+    ).filter(MatchEvent.game_id.in_(game_ids)).order_by(MatchEvent.id):
+        events[game_id].append((event_type, scorer_id, assist_id))
+    
+    return games, assignments, events
+
+
+def _begin_read_only(model):
+    """
+    Begin the session's transaction on `model`'s database as a read-only
+    one. CLI transactions otherwise start with BEGIN IMMEDIATE on SQLite
+    and would hold the write lock while a group's history streams in.
+    """
+    db.session.connection(bind_arguments={'mapper': model.__mapper__}, execution_options={'read_only': True})
+
+
+@stats_cli.command('rebuild')
+@click.option('--group', 'group_id', type=int, help='Only rebuild this group.')
+@click.option('--since', type=click.DateTime(formats=['%Y-%m-%d']),
+              help='Only rebuild groups that have played a game on or after this date.')
+@click.option('--chunk-size', default=500, show_default=True, help='Games loaded per round trip.')
+@click.option('--restart', is_flag=True, help='Ignore any checkpoint left by an interrupted run.')
+def rebuild(group_id, since, chunk_size, restart):
+    """Recompute materialized stats from the full match history."""
+    run_args = {
+        'group': group_id,
+        'since': since.strftime('%Y-%m-%d') if since else None
+    }
+    completed = set() if restart else _load_checkpoint(run_args)
+    if completed:
+        click.echo(f'Resuming: {len(completed)} group(s) already rebuilt')
+    
+    _begin_read_only(Group)
+    groups_query = db.session.query(Group.id).order_by(Group.id)
+    if group_id:
+        groups_query = groups_query.filter(Group.id == group_id)
+    if since:
+        groups_query = groups_query.filter(Group.id.in_(
+            db.session.query(Game.group_id).filter(
+                Game.status == 'finished',
+                Game.datetime >= since
+            )
+        ))
+    group_ids = [row.id for row in groups_query if row.id not in completed]
+    db.session.rollback()
+    
+    started = time.monotonic()
+    total_games = 0
+    
+    for index, current_group_id in enumerate(group_ids, start=1):
+        # The group's games and stats are on its shard when DB_SHARDS is set
+        with use_shard(current_group_id):
+            group_started = time.monotonic()
+            rebuilders = [rebuilder_cls(current_group_id) for rebuilder_cls in REBUILDERS]
+            group_games = 0
+            last_game_id = None
+            
+            _begin_read_only(Game)
+            for games, assignments, events in stream_finished_games(current_group_id, chunk_size):
+                for game in games:
+                    for rebuilder in rebuilders:
+                        rebuilder.add_game(game, assignments[game.id], events[game.id])
+                group_games += len(games)
+                last_game_id = games[-1].id
+            
+                elapsed = max(time.monotonic() - group_started, 1e-6)
+                click.echo(f'  group {current_group_id}: {group_games} games ({group_games / elapsed:.0f} games/s)')
+            
+            # Only the writes below take the write lock, not the streaming above
+            db.session.rollback()
+            try:
+                written = {rebuilder.name: rebuilder.write() for rebuilder in rebuilders}
+                replace_applied_games(current_group_id, last_game_id)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+        
+        completed.add(current_group_id)
+        _save_checkpoint(run_args, completed)
+        total_games += group_games
+        
+        summary = ', '.join(f'{count} {name} rows' for name, count in written.items())
+        click.echo(f'[{index}/{len(group_ids)}] group {current_group_id}: {group_games} games -> {summary}')
+    
+    _clear_checkpoint()
+    
+    elapsed = max(time.monotonic() - started, 1e-6)
+    click.echo(f'Rebuilt {len(group_ids)} group(s), {total_games} games in {elapsed:.1f}s '
+               f'({total_games / elapsed:.0f} games/s)')
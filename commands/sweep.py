@@ -0,0 +1,21 @@
+import time
+
+import click
+from flask.cli import with_appcontext
+
+from services.game_status import expire_past_games
+
+
+@click.command('sweep')
+@with_appcontext
+@click.option('--interval', type=int, default=0,
+              help='Keep running and sweep every N seconds instead of once.')
+def sweep_cli(interval):
+    """Mark upcoming games whose kick-off has passed as finished."""
+    while True:
+        updated = expire_past_games()
+        click.echo(f'Marked {updated} game(s) as finished')
+
+        if interval <= 0:
+            return
+        time.sleep(interval)
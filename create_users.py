@@ -6,23 +6,14 @@ Script to create users from players.json and make them join a group
 import json
 import sys
 import os
-from flask import Flask
-from flask_bcrypt import generate_password_hash
-from database import db
-from models import User, Group, GroupMembership
 
 # Add the current directory to Python path to import our modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-def create_app():
-    """Create and configure the Flask app"""
-    app = Flask(__name__)
-    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///footmob.db')
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    
-    db.init_app(app)
-    return app
+from flask_bcrypt import generate_password_hash
+from app import create_app
+from database import db
+from models import User, Group, GroupMembership
 
 def load_players():
     """Load players from players.json"""
@@ -1,3 +1,53 @@
+from datetime import timezone
+
+from flask import current_app, g, has_app_context, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import DateTime
+from sqlalchemy.types import TypeDecorator
+
+
+class RoutingSession(Session):
+    """
+    Sends every statement of a request to g.db_replica when it is set
+    (see services/db_routing.py), statements on group-scoped tables to
+    their shard when sharding is on (services/sharding.py), otherwise to
+    the primary database.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            replica = g.get('db_replica')
+            if replica is not None:
+                return replica
+        if bind is None and has_app_context():
+            router = current_app.extensions.get('db_shards')
+            if router is not None:
+                engine = router.route(self, mapper, clause)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    Timestamps stored as naive UTC in a plain TIMESTAMP column and read
+    back timezone-aware, the same way on SQLite and PostgreSQL. Naive
+    values written by the app are taken to be UTC already.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
 
-db = SQLAlchemy()
\ No newline at end of file
+    def process_result_value(self, value, dialect):
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
@@ -0,0 +1,24 @@
+"""Composite indexes for the hot filter / sort shapes of the route queries"""
+
+INDEXES = [
+    ('ix_game_group_status_datetime', 'game', ['group_id', 'status', 'datetime']),
+    ('ix_game_status_datetime', 'game', ['status', 'datetime']),
+    ('ix_group_membership_group_admin', 'group_membership', ['group_id', 'is_admin', 'user_id']),
+    ('ix_availability_vote_game_status', 'availability_vote', ['game_id', 'status', 'user_id']),
+    ('ix_team_assignment_game_team', 'team_assignment', ['game_id', 'team', 'user_id']),
+    ('ix_match_event_game_type_scorer', 'match_event', ['game_id', 'event_type', 'scorer_id']),
+    ('ix_match_event_scorer_type', 'match_event', ['scorer_id', 'event_type']),
+    ('ix_match_event_assist', 'match_event', ['assist_id']),
+    ('ix_potm_vote_game_voted_for', 'potm_vote', ['game_id', 'voted_for_id']),
+    ('ix_feed_item_group_created', 'feed_item', ['group_id', 'created_at']),
+    ('ix_feed_item_game', 'feed_item', ['game_id']),
+    ('ix_notification_user_read_created', 'notification', ['user_id', 'is_read', 'created_at']),
+]
+
+
+def upgrade(op):
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+    
+    # Let the query planner see the new indexes
+    op.execute('ANALYZE')
@@ -0,0 +1,8 @@
+"""Version counters on game and group, used for ETags and cached fragments"""
+
+from sqlalchemy import Column, Integer
+
+
+def upgrade(op):
+    for table in ('game', 'group'):
+        op.add_column(table, Column('data_version', Integer, nullable=False, server_default='0'))
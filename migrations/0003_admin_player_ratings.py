@@ -0,0 +1,65 @@
+"""
+Per-admin ratings for player attributes from before multi-admin rating
+(formerly migrate_attributes.py): every admin of the group gets a rating
+with the player's attributes, truncated to whole numbers, and the
+averaged attributes become those whole numbers. Players that already
+have a rating are left alone.
+"""
+
+from datetime import datetime, timezone
+
+from models import AdminPlayerRating
+
+ATTRIBUTES = [
+    'pace', 'stamina', 'strength', 'agility', 'jumping',
+    'ball_control', 'dribbling', 'passing', 'shooting', 'crossing', 'free_kicks',
+    'positioning', 'marking', 'tackling', 'interceptions', 'vision', 'decision_making',
+    'composure', 'concentration', 'determination', 'leadership', 'teamwork',
+    'goalkeeping', 'handling', 'distribution', 'aerial_reach'
+]
+
+# Attributes without any rating, in a group that has an admin to own one
+LEGACY = '''
+    player_attributes.id > :start AND player_attributes.id <= :end
+    AND NOT EXISTS (
+        SELECT 1 FROM admin_player_rating
+        WHERE admin_player_rating.user_id = player_attributes.user_id
+          AND admin_player_rating.group_id = player_attributes.group_id
+    )
+    AND EXISTS (
+        SELECT 1 FROM group_membership
+        WHERE group_membership.group_id = player_attributes.group_id AND group_membership.is_admin
+    )
+'''
+
+
+def upgrade(op):
+    # Databases from before multi-admin rating don't have the table yet
+    op.create_table(AdminPlayerRating.__table__)
+
+
+def backfill(batches):
+    if batches.engine.dialect.name == 'sqlite':
+        whole = 'CAST({} AS INTEGER)'
+    else:
+        # CAST rounds on PostgreSQL; the old script truncated
+        whole = 'CAST(FLOOR({}) AS INTEGER)'
+
+    ratings = (
+        f'INSERT INTO admin_player_rating (user_id, admin_id, group_id, {", ".join(ATTRIBUTES)}, '
+        f'preferred_position, notes, created_at, updated_at) '
+        f'SELECT player_attributes.user_id, group_membership.user_id, player_attributes.group_id, '
+        f'{", ".join(whole.format("player_attributes." + name) for name in ATTRIBUTES)}, '
+        f'player_attributes.preferred_position, player_attributes.notes, :now, :now '
+        f'FROM player_attributes JOIN group_membership '
+        f'ON group_membership.group_id = player_attributes.group_id AND group_membership.is_admin '
+        f'WHERE {LEGACY}'
+    )
+    averages = (
+        f'UPDATE player_attributes SET {", ".join(f"{name} = {whole.format(name)}" for name in ATTRIBUTES)} '
+        f'WHERE {LEGACY}'
+    )
+
+    # Averages first: the ratings take the rows out of LEGACY
+    now = datetime.now(timezone.utc).replace(tzinfo=None).isoformat(sep=' ')
+    batches.run('player_attributes', averages, ratings, params={'now': now})
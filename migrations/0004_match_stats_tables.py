@@ -0,0 +1,64 @@
+"""
+Tables for the materialized match stats: the partnership / head-to-head
+index, the packed recent form and the ledger of games folded into them.
+
+They are loaded from the finished matches already in the database, as
+`flask stats rebuild` does, so team balancing sees the existing history
+from the first request after the deploy. On a sharded database each shard
+loads the groups whose teams it holds.
+"""
+from collections import defaultdict
+
+from sqlalchemy import insert, select
+
+from models import Game, MatchEvent, PlayerForm, PlayerPairStat, StatsAppliedGame, TeamAssignment
+from services.pair_stats import PairStatsRebuilder
+from services.recent_form import RecentFormRebuilder
+
+
+def _load_history(connection):
+    if connection.execute(select(StatsAppliedGame.game_id).limit(1)).first():
+        # Already loaded, e.g. by `flask stats rebuild`
+        return
+
+    # Games with teams in this database file; the others add nothing to the stats
+    games = connection.execute(select(Game.id, Game.group_id, Game.datetime).where(
+        Game.status == 'finished',
+        Game.id.in_(select(TeamAssignment.game_id))
+    ).order_by(Game.id)).all()
+    if not games:
+        return
+
+    finished_ids = select(Game.id).where(Game.status == 'finished')
+    assignments = defaultdict(list)
+    events = defaultdict(list)
+    for game_id, user_id, team in connection.execute(
+        select(TeamAssignment.game_id, TeamAssignment.user_id, TeamAssignment.team)
+        .where(TeamAssignment.game_id.in_(finished_ids)).order_by(TeamAssignment.id)
+    ):
+        assignments[game_id].append((user_id, team))
+    for game_id, event_type, scorer_id, assist_id in connection.execute(
+        select(MatchEvent.game_id, MatchEvent.event_type, MatchEvent.scorer_id, MatchEvent.assist_id)
+        .where(MatchEvent.game_id.in_(finished_ids)).order_by(MatchEvent.id)
+    ):
+        events[game_id].append((event_type, scorer_id, assist_id))
+
+    rebuilders = {}
+    for game in games:
+        if game.group_id not in rebuilders:
+            rebuilders[game.group_id] = [PairStatsRebuilder(game.group_id), RecentFormRebuilder(game.group_id)]
+        for rebuilder in rebuilders[game.group_id]:
+            rebuilder.add_game(game, assignments[game.id], events[game.id])
+
+    for group_rebuilders in rebuilders.values():
+        for rebuilder in group_rebuilders:
+            rebuilder.write(connection)
+    connection.execute(insert(StatsAppliedGame), [{'game_id': game.id} for game in games])
+
+
+def upgrade(op):
+    for model in (PlayerPairStat, PlayerForm, StatsAppliedGame):
+        op.create_table(model.__table__)
+
+    if op.in_scope(StatsAppliedGame.__tablename__):
+        _load_history(op.connection)
@@ -0,0 +1,6 @@
+"""Index for a player's POTM awards (profile stats), which filter on voted_for_id"""
+
+
+def upgrade(op):
+    op.create_index('ix_potm_vote_voted_for_game', 'potm_vote', ['voted_for_id', 'game_id'])
+    op.execute('ANALYZE potm_vote')
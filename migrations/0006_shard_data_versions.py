@@ -0,0 +1,28 @@
+"""
+Version counters of the group-scoped data (DataVersion), which sharded
+databases keep on the shards with the data itself, as they now do
+notifications.
+
+A shard of a database split while notifications stayed in the directory
+copies its groups' notifications from there. The directory's old table
+is left in place, hidden behind the view over the shards; drop it once
+the shards are checked.
+"""
+from models import DataVersion, Notification
+from services.sharding import LAYOUT_TABLE, reserve_ids
+
+
+def upgrade(op):
+    op.create_table(DataVersion.__table__)
+
+    if op.in_scope(Notification.__tablename__) and not op.has_table(Notification.__tablename__):
+        op.create_table(Notification.__table__)
+        shard, shard_count = op.execute(f'SELECT shard, shard_count FROM main.{LAYOUT_TABLE}').one()
+        columns = ', '.join(op.quote(name) for name in Notification.__table__.columns.keys())
+        op.execute(
+            f'INSERT INTO main.notification ({columns}) SELECT {columns} FROM directory.notification '
+            f'WHERE group_id % :shard_count = :shard',
+            {'shard_count': shard_count, 'shard': shard}
+        )
+        last_id = op.execute('SELECT coalesce(max(id), 0) FROM directory.notification').scalar()
+        reserve_ids(op.connection.exec_driver_sql, 'main', Notification.__tablename__, last_id, shard)
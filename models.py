@@ -1,9 +1,9 @@
-from database import db
+from database import db, UTCDateTime
 from flask_login import UserMixin
 from datetime import datetime, timezone
-from sqlalchemy import DateTime
 import secrets
 import string
+import struct
 from sqlalchemy import func
 
 class User(UserMixin, db.Model):
@@ -11,7 +11,7 @@ class User(UserMixin, db.Model):
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
     display_name = db.Column(db.String(100), nullable=False)
-    created_at = db.Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
     
     memberships = db.relationship('GroupMembership', back_populates='user', cascade='all, delete-orphan')
     availability_votes = db.relationship('AvailabilityVote', back_populates='user', cascade='all, delete-orphan')
@@ -24,8 +24,10 @@ class Group(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     emoji = db.Column(db.String(10), default='⚽')
-    created_at = db.Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
     invite_code = db.Column(db.String(8), unique=True)
+    # Bumped on every commit that changes what the group page shows
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     memberships = db.relationship('GroupMembership', back_populates='group', cascade='all, delete-orphan')
     games = db.relationship('Game', back_populates='group', cascade='all, delete-orphan')
@@ -50,27 +52,9 @@ class Group(db.Model):
         ).all()
     
     def get_next_game(self):
-        from datetime import datetime, timedelta
-        
-        # First, auto-update any expired games
-        expired_games = Game.query.filter(
-            Game.group_id == self.id,
-            Game.status == 'upcoming',
-            Game.datetime < datetime.now(timezone.utc)
-        ).all()
-        
-        # Update expired games to 'finished' status if they weren't manually managed
-        for game in expired_games:
-            game.status = 'finished'
-        
-        if expired_games:
-            db.session.commit()
-        
-        # Now get the next upcoming or live game
         return Game.query.filter(
             Game.group_id == self.id,
-            Game.status.in_(['upcoming', 'live']),
-            Game.datetime >= datetime.now(timezone.utc) - timedelta(hours=6)  # Allow 6 hours grace period for live games
+            Game.next_game_clause()
         ).order_by(Game.datetime.asc()).first()
     
     def get_last_game(self):
@@ -78,51 +62,35 @@ class Group(db.Model):
             Game.group_id == self.id,
             Game.status == 'finished'
         ).order_by(Game.datetime.desc()).first()
-    
-    def update_game_statuses(self):
-        """Auto-update game statuses based on current time"""
-        from datetime import datetime
-        
-        # Update expired upcoming games to finished
-        expired_games = Game.query.filter(
-            Game.group_id == self.id,
-            Game.status == 'upcoming',
-            Game.datetime < datetime.now(timezone.utc)
-        ).all()
-        
-        updated = False
-        for game in expired_games:
-            game.status = 'finished'
-            updated = True
-        
-        if updated:
-            db.session.commit()
-        
-        return len(expired_games)
 
 class GroupMembership(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     group_id = db.Column(db.Integer, db.ForeignKey('group.id'), nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
-    joined_at = db.Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    joined_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
     
     user = db.relationship('User', back_populates='memberships')
     group = db.relationship('Group', back_populates='memberships')
     
-    __table_args__ = (db.UniqueConstraint('user_id', 'group_id'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'group_id'),
+        db.Index('ix_group_membership_group_admin', 'group_id', 'is_admin', 'user_id'),
+    )
 
 class Game(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     group_id = db.Column(db.Integer, db.ForeignKey('group.id'), nullable=False)
-    datetime = db.Column(DateTime, nullable=False)
+    datetime = db.Column(UTCDateTime, nullable=False)
     location = db.Column(db.String(200))
     notes = db.Column(db.Text)
     status = db.Column(db.String(20), default='upcoming')  # upcoming, live, finished
-    poll_lock_datetime = db.Column(DateTime)
-    created_at = db.Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    started_at = db.Column(DateTime)
-    ended_at = db.Column(DateTime)
+    poll_lock_datetime = db.Column(UTCDateTime)
+    created_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
+    started_at = db.Column(UTCDateTime)
+    ended_at = db.Column(UTCDateTime)
+    # Bumped on every commit that changes what the game page shows
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     group = db.relationship('Group', back_populates='games')
     availability_votes = db.relationship('AvailabilityVote', back_populates='game', cascade='all, delete-orphan')
@@ -130,6 +98,26 @@ class Game(db.Model):
     events = db.relationship('MatchEvent', back_populates='game', cascade='all, delete-orphan')
     potm_votes = db.relationship('POTMVote', back_populates='game', cascade='all, delete-orphan')
     
+    __table_args__ = (
+        db.Index('ix_game_group_status_datetime', 'group_id', 'status', 'datetime'),
+        db.Index('ix_game_status_datetime', 'status', 'datetime'),
+    )
+    
+    @staticmethod
+    def next_game_clause(now=None):
+        """
+        SQL condition for games that can be a group's next game. Pure read:
+        upcoming games past kick-off are left for the status sweeper to
+        finish, so they are simply skipped here.
+        """
+        from datetime import timedelta
+        
+        now = now or datetime.now(timezone.utc)
+        return db.or_(
+            (Game.status == 'upcoming') & (Game.datetime >= now),
+            (Game.status == 'live') & (Game.datetime >= now - timedelta(hours=6))  # Allow 6 hours grace period for live games
+        )
+    
     def is_poll_locked(self):
         if self.poll_lock_datetime and datetime.now(timezone.utc) > self.poll_lock_datetime:
             return True
@@ -172,39 +160,13 @@ class Game(db.Model):
         ).all()
     
     def get_score(self):
-        # Regular goals for Team A
-        team_a_goals = MatchEvent.query.filter_by(game_id=self.id, event_type='goal').join(
-            TeamAssignment, 
-            (MatchEvent.scorer_id == TeamAssignment.user_id) & 
-            (TeamAssignment.game_id == self.id)
-        ).filter(TeamAssignment.team == 'A').count()
-        
-        # Regular goals for Team B
-        team_b_goals = MatchEvent.query.filter_by(game_id=self.id, event_type='goal').join(
-            TeamAssignment, 
-            (MatchEvent.scorer_id == TeamAssignment.user_id) & 
-            (TeamAssignment.game_id == self.id)
-        ).filter(TeamAssignment.team == 'B').count()
-        
-        # Own goals by Team A players (add to Team B's score)
-        team_a_own_goals = MatchEvent.query.filter_by(game_id=self.id, event_type='own_goal').join(
-            TeamAssignment, 
-            (MatchEvent.scorer_id == TeamAssignment.user_id) & 
-            (TeamAssignment.game_id == self.id)
-        ).filter(TeamAssignment.team == 'A').count()
-        
-        # Own goals by Team B players (add to Team A's score)
-        team_b_own_goals = MatchEvent.query.filter_by(game_id=self.id, event_type='own_goal').join(
-            TeamAssignment, 
-            (MatchEvent.scorer_id == TeamAssignment.user_id) & 
-            (TeamAssignment.game_id == self.id)
-        ).filter(TeamAssignment.team == 'B').count()
-        
-        # Final scores: own goals add to opponent's score
-        final_team_a_score = team_a_goals + team_b_own_goals
-        final_team_b_score = team_b_goals + team_a_own_goals
+        # Scores attached in bulk by services.scores.attach_scores()
+        loaded_score = getattr(self, '_loaded_score', None)
+        if loaded_score is not None:
+            return loaded_score
         
-        return {'team_a': final_team_a_score, 'team_b': final_team_b_score}
+        from services.scores import load_scores
+        return load_scores([self.id])[self.id]
     
     def get_responses(self):
         """Get categorized availability responses for this game"""
@@ -234,12 +196,15 @@ class AvailabilityVote(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     game_id = db.Column(db.Integer, db.ForeignKey('game.id'), nullable=False)
     status = db.Column(db.String(10), nullable=False)  # in, out, maybe
-    voted_at = db.Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    voted_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
     
     user = db.relationship('User', back_populates='availability_votes')
     game = db.relationship('Game', back_populates='availability_votes')
     
-    __table_args__ = (db.UniqueConstraint('user_id', 'game_id'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'game_id'),
+        db.Index('ix_availability_vote_game_status', 'game_id', 'status', 'user_id'),
+    )
 
 class TeamAssignment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -247,12 +212,15 @@ class TeamAssignment(db.Model):
     game_id = db.Column(db.Integer, db.ForeignKey('game.id'), nullable=False)
     team = db.Column(db.String(1), nullable=False)  # A or B
     position = db.Column(db.String(20))  # optional position
-    created_at = db.Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
     
     user = db.relationship('User')
     game = db.relationship('Game', back_populates='team_assignments')
     
-    __table_args__ = (db.UniqueConstraint('user_id', 'game_id'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'game_id'),
+        db.Index('ix_team_assignment_game_team', 'game_id', 'team', 'user_id'),
+    )
 
 class MatchEvent(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -261,24 +229,34 @@ class MatchEvent(db.Model):
     scorer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     assist_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     minute = db.Column(db.Integer)
-    created_at = db.Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
     
     game = db.relationship('Game', back_populates='events')
     scorer = db.relationship('User', foreign_keys=[scorer_id], back_populates='events_scored')
     assist = db.relationship('User', foreign_keys=[assist_id], back_populates='events_assisted')
+    
+    __table_args__ = (
+        db.Index('ix_match_event_game_type_scorer', 'game_id', 'event_type', 'scorer_id'),
+        db.Index('ix_match_event_scorer_type', 'scorer_id', 'event_type'),
+        db.Index('ix_match_event_assist', 'assist_id'),
+    )
 
 class POTMVote(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     voter_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     game_id = db.Column(db.Integer, db.ForeignKey('game.id'), nullable=False)
     voted_for_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    voted_at = db.Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    voted_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
     
     voter = db.relationship('User', foreign_keys=[voter_id], back_populates='potm_votes')
     game = db.relationship('Game', back_populates='potm_votes')
     voted_for = db.relationship('User', foreign_keys=[voted_for_id])
     
-    __table_args__ = (db.UniqueConstraint('voter_id', 'game_id'),)
+    __table_args__ = (
+        db.UniqueConstraint('voter_id', 'game_id'),
+        db.Index('ix_potm_vote_game_voted_for', 'game_id', 'voted_for_id'),
+        db.Index('ix_potm_vote_voted_for_game', 'voted_for_id', 'game_id'),
+    )
 
 class FeedItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -286,10 +264,15 @@ class FeedItem(db.Model):
     item_type = db.Column(db.String(50), nullable=False)  # game_created, poll_locked, teams_published, goal_scored, match_finished, potm_announced
     content = db.Column(db.Text, nullable=False)
     game_id = db.Column(db.Integer, db.ForeignKey('game.id'))
-    created_at = db.Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
     
     group = db.relationship('Group', back_populates='feed_items')
     game = db.relationship('Game')
+    
+    __table_args__ = (
+        db.Index('ix_feed_item_group_created', 'group_id', 'created_at'),
+        db.Index('ix_feed_item_game', 'game_id'),
+    )
 
 class AdminPlayerRating(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -336,8 +319,8 @@ class AdminPlayerRating(db.Model):
     # Meta information
     preferred_position = db.Column(db.String(20))  # GK, DEF, MID, FWD
     notes = db.Column(db.Text)  # Additional notes from admin
-    updated_at = db.Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    created_at = db.Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
     
     # Relationships
     user = db.relationship('User', foreign_keys=[user_id])
@@ -390,8 +373,8 @@ class PlayerAttributes(db.Model):
     # Meta information - from most recent rating
     preferred_position = db.Column(db.String(20))
     notes = db.Column(db.Text)
-    updated_at = db.Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    created_at = db.Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
     
     # Relationships
     user = db.relationship('User', foreign_keys=[user_id])
@@ -527,8 +510,8 @@ class Notification(db.Model):
     is_read = db.Column(db.Boolean, default=False, nullable=False)
     
     # Timestamps
-    created_at = db.Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    read_at = db.Column(DateTime, nullable=True)
+    created_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
+    read_at = db.Column(UTCDateTime, nullable=True)
     
     # Relationships
     user = db.relationship('User', foreign_keys=[user_id], back_populates='notifications')
@@ -536,6 +519,12 @@ class Notification(db.Model):
     game = db.relationship('Game')
     related_user = db.relationship('User', foreign_keys=[related_user_id])
     
+    __table_args__ = (
+        db.Index('ix_notification_user_read_created', 'user_id', 'is_read', 'created_at'),
+        # Sharded, each shard hands out IDs from its own range; see services.sharding
+        {'sqlite_autoincrement': True},
+    )
+    
     def __repr__(self):
         return f'<Notification {self.title} for {self.user.username}>'
     
@@ -562,4 +551,105 @@ class Notification(db.Model):
                 'id': self.related_user.id,
                 'name': self.related_user.display_name
             } if self.related_user else None
-        }
\ No newline at end of file
+        }
+
+
+class PlayerPairStat(db.Model):
+    """Running head-to-head and partnership totals for an ordered pair of players in a group"""
+    id = db.Column(db.Integer, primary_key=True)
+    group_id = db.Column(db.Integer, db.ForeignKey('group.id'), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    other_player_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    
+    # Same team
+    games_together = db.Column(db.Integer, default=0, nullable=False)
+    wins_together = db.Column(db.Integer, default=0, nullable=False)
+    goals_together = db.Column(db.Integer, default=0, nullable=False)  # Goals by either player in games together
+    assists_together = db.Column(db.Integer, default=0, nullable=False)  # Assists by either player in games together
+    assists_to = db.Column(db.Integer, default=0, nullable=False)  # Goals by other_player assisted by player
+    
+    # Opposing teams (from player's point of view)
+    games_against = db.Column(db.Integer, default=0, nullable=False)
+    wins_against = db.Column(db.Integer, default=0, nullable=False)
+    losses_against = db.Column(db.Integer, default=0, nullable=False)
+    
+    last_played_at = db.Column(UTCDateTime)
+    updated_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
+    
+    player = db.relationship('User', foreign_keys=[player_id])
+    other_player = db.relationship('User', foreign_keys=[other_player_id])
+    group = db.relationship('Group')
+    
+    __table_args__ = (db.UniqueConstraint('group_id', 'player_id', 'other_player_id'),)
+    
+    def to_dict(self):
+        return {
+            'player_id': self.player_id,
+            'other_player_id': self.other_player_id,
+            'games_together': self.games_together,
+            'wins_together': self.wins_together,
+            'goals_together': self.goals_together,
+            'assists_together': self.assists_together,
+            'assists_to': self.assists_to,
+            'games_against': self.games_against,
+            'wins_against': self.wins_against,
+            'losses_against': self.losses_against,
+            'draws_against': self.games_against - self.wins_against - self.losses_against
+        }
+
+
+class StatsAppliedGame(db.Model):
+    """Ledger of finished games already folded into the materialized stats (pair index, recent form)"""
+    id = db.Column(db.Integer, primary_key=True)
+    game_id = db.Column(db.Integer, db.ForeignKey('game.id'), nullable=False, unique=True)
+    applied_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class PlayerForm(db.Model):
+    """Ring buffer of a player's most recent results in a group, packed into a small binary column"""
+    WINDOW = 10  # Games kept per player
+    ENTRY_FORMAT = '>BBb'  # goals, assists, result (1 win, 0 draw, -1 loss)
+    ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    group_id = db.Column(db.Integer, db.ForeignKey('group.id'), nullable=False)
+    results = db.Column(db.LargeBinary(WINDOW * ENTRY_SIZE), nullable=False, default=b'')  # Newest first
+    updated_at = db.Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
+    
+    user = db.relationship('User')
+    group = db.relationship('Group')
+    
+    __table_args__ = (db.UniqueConstraint('user_id', 'group_id'),)
+    
+    @classmethod
+    def pack(cls, entries):
+        """Pack (goals, assists, result) tuples, newest first, keeping at most WINDOW"""
+        return b''.join(
+            struct.pack(cls.ENTRY_FORMAT, min(goals, 255), min(assists, 255), result)
+            for goals, assists, result in entries[:cls.WINDOW]
+        )
+    
+    def get_recent(self, n=None):
+        """Unpacked (goals, assists, result) tuples for the last n games, newest first"""
+        entries = list(struct.iter_unpack(self.ENTRY_FORMAT, self.results or b''))
+        return entries if n is None else entries[:n]
+    
+    def push(self, goals, assists, result):
+        """Record a newly finished game, dropping the oldest once the buffer is full"""
+        self.results = self.pack([(goals, assists, result)] + self.get_recent())
+        self.updated_at = datetime.now(timezone.utc)
+
+
+class DataVersion(db.Model):
+    """
+    Version of a group's sharded data, kept next to it: game_id 0 counts
+    the group's changes, other rows one game's. Page ETags and cached
+    fragments combine it with Game.data_version or Group.data_version.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    group_id = db.Column(db.Integer, db.ForeignKey('group.id'), nullable=False)
+    game_id = db.Column(db.Integer, nullable=False, default=0)  # 0 for the group itself, so no foreign key
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (db.UniqueConstraint('group_id', 'game_id'),)
@@ -0,0 +1,109 @@
+from functools import wraps
+from flask import abort, flash, g, jsonify, redirect, url_for
+from flask_login import current_user
+from database import db
+from models import Game, Group, GroupMembership
+from sqlalchemy.orm import contains_eager
+
+NOT_A_MEMBER = 'You are not a member of this group'
+
+
+def load_game_access(game_id):
+    """
+    Load a game, its group and the current user's membership of that group
+    with one joined query. Results are memoized on flask.g for the request.
+
+    Returns:
+        (game, membership) where membership is None for non-members, or
+        (None, None) if the game does not exist
+    """
+    cache = g.setdefault('group_access', {})
+    key = ('game', game_id)
+    
+    if key not in cache:
+        row = db.session.query(Game, GroupMembership).join(
+            Game.group
+        ).outerjoin(
+            GroupMembership,
+            (GroupMembership.group_id == Group.id) &
+            (GroupMembership.user_id == current_user.id)
+        ).options(
+            contains_eager(Game.group)
+        ).filter(Game.id == game_id).first()
+        
+        cache[key] = tuple(row) if row else (None, None)
+        if row:
+            cache[('group', row[0].group_id)] = (row[0].group, row[1])
+    
+    return cache[key]
+
+
+def load_group_access(group_id):
+    """
+    Load a group and the current user's membership of it with one joined
+    query. Results are memoized on flask.g for the request.
+
+    Returns:
+        (group, membership) where membership is None for non-members, or
+        (None, None) if the group does not exist
+    """
+    cache = g.setdefault('group_access', {})
+    key = ('group', group_id)
+    
+    if key not in cache:
+        row = db.session.query(Group, GroupMembership).outerjoin(
+            GroupMembership,
+            (GroupMembership.group_id == Group.id) &
+            (GroupMembership.user_id == current_user.id)
+        ).filter(Group.id == group_id).first()
+        
+        cache[key] = tuple(row) if row else (None, None)
+    
+    return cache[key]
+
+
+def require_group_member(admin=False, message=None, json=False, redirect_endpoint=None):
+    """
+    Resolve the game or group named by the route's game_id / group_id
+    argument together with the caller's membership, 404 if it does not
+    exist, and reject non-members (or non-admins when admin=True).
+
+    The loaded objects are exposed as g.game (game routes), g.group and
+    g.membership. Rejections return a JSON 403 when json=True; otherwise
+    they flash the message and redirect to the dashboard, or for admin-only
+    routes back to the game / group page (or redirect_endpoint).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            if 'game_id' in kwargs:
+                game, membership = load_game_access(kwargs['game_id'])
+                if game is None:
+                    abort(404)
+                g.game = game
+                g.group = game.group
+                back_url = url_for('games.view', game_id=game.id)
+            else:
+                group, membership = load_group_access(kwargs['group_id'])
+                if group is None:
+                    abort(404)
+                g.group = group
+                back_url = url_for('groups.view', group_id=group.id)
+            
+            g.membership = membership
+            
+            if not membership or (admin and not membership.is_admin):
+                error = message or NOT_A_MEMBER
+                if json:
+                    return jsonify({'error': error}), 403
+                
+                flash(error)
+                if redirect_endpoint:
+                    return redirect(url_for(redirect_endpoint, group_id=g.group.id))
+                if admin:
+                    return redirect(back_url)
+                return redirect(url_for('main.dashboard'))
+            
+            return view(*args, **kwargs)
+        return wrapped
+    return decorator
@@ -0,0 +1,49 @@
+import hashlib
+import time
+
+from flask import make_response, request, session
+from flask_login import current_user
+
+from services.assets import assets_version
+
+# Pages with state that changes with the clock alone (live window, poll
+# locks) get a new ETag at least this often
+CLOCK_BUCKET_SECONDS = 60
+
+
+def make_etag(*parts):
+    raw = '\0'.join(str(part) for part in parts)
+    return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+
+def page_etag(*parts, clock=False):
+    """
+    ETag for a page rendered for the current user: the given version
+    parts plus the user's identity, which the navigation bar shows, and
+    the asset build the page links to.
+    """
+    if clock:
+        parts += (int(time.time() // CLOCK_BUCKET_SECONDS),)
+    return make_etag(current_user.id, current_user.version, assets_version(), *parts)
+
+
+def not_modified(etag):
+    """
+    A 304 response if the client's If-None-Match already has `etag`,
+    otherwise None. Call it before loading anything the page needs.
+    """
+    # Flashed messages are shown once, so the page has to be rendered
+    if '_flashes' in session:
+        return None
+
+    if request.if_none_match.contains_weak(etag):
+        return with_etag(make_response('', 304), etag)
+    return None
+
+
+def with_etag(response, etag):
+    response = make_response(response)
+    response.set_etag(etag, weak=True)
+    # Per-user content; browsers may keep it but must revalidate every time
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -1,26 +1,22 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, g
 from flask_login import login_required, current_user
-from models import Game, Group, GroupMembership, AvailabilityVote, TeamAssignment, MatchEvent, POTMVote, FeedItem, User, PlayerAttributes
+from models import Game, GroupMembership, AvailabilityVote, TeamAssignment, MatchEvent, POTMVote, FeedItem, User, PlayerAttributes, Notification
 from database import db
+from routes.access import require_group_member
+from routes.conditional import not_modified, page_etag, with_etag
 from datetime import datetime, timedelta, timezone
-import numpy as np
+from services.data_versions import game_version
+from services.game_view import GameViewModel
+from services.match_stats import lines_before_edit, update_finished_game
+from services.recent_form import get_recent_form
 
 games_bp = Blueprint('games', __name__)
 
 @games_bp.route('/groups/<int:group_id>/create', methods=['GET', 'POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can create games')
 def create(group_id):
-    group = Group.query.get_or_404(group_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=group_id,
-        is_admin=True
-    ).first()
-    
-    if not membership:
-        flash('Only admins can create games')
-        return redirect(url_for('groups.view', group_id=group_id))
+    group = g.group
     
     if request.method == 'POST':
         datetime_str = request.form.get('datetime')
@@ -83,97 +79,25 @@ def create(group_id):
 
 @games_bp.route('/<int:game_id>')
 @login_required
+@require_group_member()
 def view(game_id):
-    game = Game.query.get_or_404(game_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=game.group_id
-    ).first()
-    
-    if not membership:
-        flash('You are not a member of this group')
-        return redirect(url_for('main.dashboard'))
+    game = g.game
     
-    user_vote = AvailabilityVote.query.filter_by(
-        user_id=current_user.id,
-        game_id=game_id
-    ).first()
-    
-    availability_counts = game.get_availability_counts()
-    
-    in_players = game.get_in_players()
-    maybe_players = game.get_maybe_players()
-    out_players = game.get_out_players()
-    team_a_players = game.get_team_a_players()
-    team_b_players = game.get_team_b_players()
+    # Answer revalidations from the game row already loaded for the access
+    # check and the game's data version
+    etag = page_etag(game_version(game), g.membership.is_admin, game.is_poll_locked())
+    response = not_modified(etag)
+    if response:
+        return response
     
-    # Get POTM votes if game is live or finished
-    # Check if teams are formed
-    team_assignments = TeamAssignment.query.filter_by(game_id=game_id).all()
-    teams_formed = len(team_assignments) > 0
-    
-    user_potm_vote = None
-    potm_results = []
-    if teams_formed or game.status == 'finished':
-        user_potm_vote = POTMVote.query.filter_by(
-            voter_id=current_user.id,
-            game_id=game_id
-        ).first()
-        
-        if game.status == 'finished':
-            # Get POTM results
-            from sqlalchemy import func
-            potm_results = db.session.query(
-                User.display_name,
-                func.count(POTMVote.id).label('votes')
-            ).join(POTMVote, User.id == POTMVote.voted_for_id)\
-            .filter(POTMVote.game_id == game_id)\
-            .group_by(User.id, User.display_name)\
-            .order_by(func.count(POTMVote.id).desc()).all()
-    
-    events = MatchEvent.query.filter_by(game_id=game_id).order_by(MatchEvent.minute).all()
-    score = game.get_score() if teams_formed or game.status == 'finished' else {'team_a': 0, 'team_b': 0}
-    
-    # Get unvoted members for admin functionality
-    unvoted_members = []
-    if membership.is_admin and game.status == 'upcoming' and not game.is_poll_locked():
-        # Get all group members
-        all_members = game.group.get_members()
-        # Get members who have already voted
-        voted_user_ids = [vote.user_id for vote in game.availability_votes]
-        # Filter out members who haven't voted
-        unvoted_members = [member for member in all_members if member.id not in voted_user_ids]
-    
-    return render_template('games/view.html', 
-                         game=game, 
-                         membership=membership,
-                         user_vote=user_vote,
-                         availability_counts=availability_counts,
-                         in_players=in_players,
-                         maybe_players=maybe_players,
-                         out_players=out_players,
-                         team_a_players=team_a_players,
-                         team_b_players=team_b_players,
-                         user_potm_vote=user_potm_vote,
-                         potm_results=potm_results,
-                         events=events,
-                         score=score,
-                         unvoted_members=unvoted_members)
+    view_model = GameViewModel.build(game, g.membership, current_user)
+    return with_etag(render_template('games/view.html', **view_model.template_context()), etag)
 
 @games_bp.route('/<int:game_id>/vote', methods=['POST'])
 @login_required
+@require_group_member()
 def vote_availability(game_id):
-    game = Game.query.get_or_404(game_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=game.group_id
-    ).first()
-    
-    if not membership:
-        flash('You are not a member of this group')
-        return redirect(url_for('main.dashboard'))
+    game = g.game
     
     if game.is_poll_locked():
         flash('Availability poll is locked')
@@ -205,18 +129,9 @@ def vote_availability(game_id):
 
 @games_bp.route('/<int:game_id>/lock-poll', methods=['POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can lock polls')
 def lock_poll(game_id):
-    game = Game.query.get_or_404(game_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=game.group_id,
-        is_admin=True
-    ).first()
-    
-    if not membership:
-        flash('Only admins can lock polls')
-        return redirect(url_for('games.view', game_id=game_id))
+    game = g.game
     
     game.poll_lock_datetime = datetime.now(timezone.utc)
     
@@ -235,17 +150,9 @@ def lock_poll(game_id):
 
 @games_bp.route('/<int:game_id>/add-player', methods=['POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can add players to polls', json=True)
 def add_player_to_poll(game_id):
-    game = Game.query.get_or_404(game_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=game.group_id,
-        is_admin=True
-    ).first()
-    
-    if not membership:
-        return jsonify({'error': 'Only admins can add players to polls'}), 403
+    game = g.game
     
     if game.is_poll_locked():
         return jsonify({'error': 'Poll is locked'}), 400
@@ -300,17 +207,9 @@ def add_player_to_poll(game_id):
 
 @games_bp.route('/<int:game_id>/remove-player', methods=['POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can remove players from polls', json=True)
 def remove_player_from_poll(game_id):
-    game = Game.query.get_or_404(game_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=game.group_id,
-        is_admin=True
-    ).first()
-    
-    if not membership:
-        return jsonify({'error': 'Only admins can remove players from polls'}), 403
+    game = g.game
     
     if game.is_poll_locked():
         return jsonify({'error': 'Poll is locked'}), 400
@@ -348,20 +247,13 @@ def remove_player_from_poll(game_id):
 
 @games_bp.route('/<int:game_id>/teams', methods=['GET', 'POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can manage teams')
 def manage_teams(game_id):
-    game = Game.query.get_or_404(game_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=game.group_id,
-        is_admin=True
-    ).first()
-    
-    if not membership:
-        flash('Only admins can manage teams')
-        return redirect(url_for('games.view', game_id=game_id))
+    game = g.game
     
     if request.method == 'POST':
+        previous_lines = lines_before_edit(game)
+        
         # Clear existing team assignments
         TeamAssignment.query.filter_by(game_id=game_id).delete()
         
@@ -384,6 +276,9 @@ def manage_teams(game_id):
             )
             db.session.add(assignment)
         
+        # Teams corrected after the match change the partnership stats
+        update_finished_game(game, previous_lines)
+        
         # Create feed item
         feed_item = FeedItem(
             group_id=game.group_id,
@@ -420,18 +315,9 @@ def manage_teams(game_id):
 
 @games_bp.route('/<int:game_id>/start', methods=['POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can start matches')
 def start_match(game_id):
-    game = Game.query.get_or_404(game_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=game.group_id,
-        is_admin=True
-    ).first()
-    
-    if not membership:
-        flash('Only admins can start matches')
-        return redirect(url_for('games.view', game_id=game_id))
+    game = g.game
     
     if game.status != 'upcoming':
         flash('Game is not in upcoming status')
@@ -446,18 +332,9 @@ def start_match(game_id):
 
 @games_bp.route('/<int:game_id>/end', methods=['POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can end matches')
 def end_match(game_id):
-    game = Game.query.get_or_404(game_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=game.group_id,
-        is_admin=True
-    ).first()
-    
-    if not membership:
-        flash('Only admins can end matches')
-        return redirect(url_for('games.view', game_id=game_id))
+    game = g.game
     
     # Check if teams are formed
     team_assignments = TeamAssignment.query.filter_by(game_id=game_id).all()
@@ -470,6 +347,10 @@ def end_match(game_id):
     
     score = game.get_score()
     
+    # Fold this game into the partnership index and recent-form buffers
+    from services.match_stats import record_finished_game
+    record_finished_game(game)
+    
     # Create match finished feed item
     feed_item = FeedItem(
         group_id=game.group_id,
@@ -487,7 +368,7 @@ def end_match(game_id):
     ).join(POTMVote, User.id == POTMVote.voted_for_id)\
     .filter(POTMVote.game_id == game_id)\
     .group_by(User.id, User.display_name)\
-    .order_by(func.count(POTMVote.id).desc()).first()
+    .order_by(func.count(POTMVote.id).desc(), User.id).first()
     
     if potm_winner:
         potm_feed_item = FeedItem(
@@ -525,18 +406,9 @@ def end_match(game_id):
 
 @games_bp.route('/<int:game_id>/events', methods=['POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can add events')
 def add_event(game_id):
-    game = Game.query.get_or_404(game_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=game.group_id,
-        is_admin=True
-    ).first()
-    
-    if not membership:
-        flash('Only admins can add events')
-        return redirect(url_for('games.view', game_id=game_id))
+    game = g.game
     
     # Allow adding events on or after game day
     from datetime import date
@@ -553,6 +425,7 @@ def add_event(game_id):
         flash('Invalid event data')
         return redirect(url_for('games.view', game_id=game_id))
     
+    previous_lines = lines_before_edit(game)
     event = MatchEvent(
         game_id=game_id,
         event_type=event_type,
@@ -561,6 +434,7 @@ def add_event(game_id):
         minute=minute
     )
     db.session.add(event)
+    update_finished_game(game, previous_lines)
     db.session.commit()
     
     # Create notifications for goals
@@ -588,18 +462,9 @@ def add_event(game_id):
 
 @games_bp.route('/<int:game_id>/events/remove', methods=['POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can remove events')
 def remove_event(game_id):
-    game = Game.query.get_or_404(game_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=game.group_id,
-        is_admin=True
-    ).first()
-    
-    if not membership:
-        flash('Only admins can remove events')
-        return redirect(url_for('games.view', game_id=game_id))
+    game = g.game
     
     # Allow removing events on or after game day
     from datetime import date
@@ -614,6 +479,8 @@ def remove_event(game_id):
         flash('Invalid remove action')
         return redirect(url_for('games.view', game_id=game_id))
     
+    previous_lines = lines_before_edit(game)
+    
     if action == 'remove_goal':
         # Remove the most recent goal by this player (regular or own goal)
         event = MatchEvent.query.filter_by(
@@ -623,6 +490,7 @@ def remove_event(game_id):
         
         if event:
             db.session.delete(event)
+            update_finished_game(game, previous_lines)
             db.session.commit()
         else:
             flash('No goals found to remove for this player')
@@ -636,6 +504,7 @@ def remove_event(game_id):
         
         if event:
             event.assist_id = None
+            update_finished_game(game, previous_lines)
             db.session.commit()
         else:
             flash('No assists found to remove for this player')
@@ -644,18 +513,9 @@ def remove_event(game_id):
 
 @games_bp.route('/<int:game_id>/assists', methods=['POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can add assists')
 def add_assist(game_id):
-    game = Game.query.get_or_404(game_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=game.group_id,
-        is_admin=True
-    ).first()
-    
-    if not membership:
-        flash('Only admins can add assists')
-        return redirect(url_for('games.view', game_id=game_id))
+    game = g.game
     
     # Allow adding assists on or after game day
     from datetime import date
@@ -669,6 +529,8 @@ def add_assist(game_id):
         flash('Invalid assist data')
         return redirect(url_for('games.view', game_id=game_id))
     
+    previous_lines = lines_before_edit(game)
+    
     # Find the most recent goal without an assist
     event = MatchEvent.query.filter_by(
         game_id=game_id,
@@ -678,6 +540,7 @@ def add_assist(game_id):
     
     if event:
         event.assist_id = assist_player_id
+        update_finished_game(game, previous_lines)
         db.session.commit()
     else:
         flash('No recent goal available to assign assist to')
@@ -686,17 +549,9 @@ def add_assist(game_id):
 
 @games_bp.route('/<int:game_id>/potm-vote', methods=['POST'])
 @login_required
+@require_group_member()
 def vote_potm(game_id):
-    game = Game.query.get_or_404(game_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=game.group_id
-    ).first()
-    
-    if not membership:
-        flash('You are not a member of this group')
-        return redirect(url_for('main.dashboard'))
+    game = g.game
     
     # Allow POTM voting on or after game day
     from datetime import date
@@ -731,18 +586,9 @@ def vote_potm(game_id):
 
 @games_bp.route('/<int:game_id>/delete', methods=['POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can delete games')
 def delete_game(game_id):
-    game = Game.query.get_or_404(game_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=game.group_id,
-        is_admin=True
-    ).first()
-    
-    if not membership:
-        flash('Only admins can delete games')
-        return redirect(url_for('games.view', game_id=game_id))
+    game = g.game
     
     # Check if game can be deleted (not past games)
     from datetime import datetime
@@ -770,6 +616,10 @@ def delete_game(game_id):
         MatchEvent.query.filter_by(game_id=game_id).delete()
         POTMVote.query.filter_by(game_id=game_id).delete()
         FeedItem.query.filter_by(game_id=game_id).delete()
+        # Keep members' notifications about the game, without the link to it
+        Notification.query.filter_by(game_id=game_id).update(
+            {Notification.game_id: None}, synchronize_session=False
+        )
         
         # Delete the game itself
         db.session.delete(game)
@@ -804,18 +654,10 @@ def delete_game(game_id):
 
 @games_bp.route('/<int:game_id>/auto-balance', methods=['POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can auto-balance teams', json=True)
 def auto_balance_teams(game_id):
     try:
-        game = Game.query.get_or_404(game_id)
-        
-        membership = GroupMembership.query.filter_by(
-            user_id=current_user.id,
-            group_id=game.group_id,
-            is_admin=True
-        ).first()
-        
-        if not membership:
-            return jsonify({'error': 'Only admins can auto-balance teams'}), 403
+        game = g.game
         
         # Get available players (those who voted 'in')
         in_players = game.get_in_players()
@@ -869,16 +711,9 @@ def auto_balance_teams(game_id):
 
 @games_bp.route('/<int:game_id>/team-ratings', methods=['POST'])
 @login_required
+@require_group_member(json=True)
 def get_team_ratings(game_id):
-    game = Game.query.get_or_404(game_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=game.group_id
-    ).first()
-    
-    if not membership:
-        return jsonify({'error': 'You are not a member of this group'}), 403
+    game = g.game
     
     # Get team compositions from request (temporary assignments) or database (saved assignments)
     team_a_player_ids = request.form.getlist('team_a')
@@ -1022,128 +857,40 @@ def calculate_player_affinity(players, group_id):
     1. Games played together on the same team
     2. Success rate when playing together (wins)
     3. Combined performance (goals + assists) when together
-    4. Recent collaboration (more weight to recent games)
+    
+    Pair totals come from the PlayerPairStat index maintained at the end of
+    each match, so this is a single query rather than a scan of the history.
     """
-    from sqlalchemy import func
-    from datetime import datetime, timedelta
+    from services.pair_stats import get_pair_stats
+    
+    pair_stats = get_pair_stats(group_id, [player.id for player in players])
     
     affinity_matrix = {}
     
-    # Initialize affinity matrix
     for player1 in players:
         affinity_matrix[player1.id] = {}
-        for player2 in players:
-            if player1.id != player2.id:
-                affinity_matrix[player1.id][player2.id] = 0.0
-    
-    # Get all finished games in this group
-    finished_games = Game.query.filter_by(
-        group_id=group_id,
-        status='finished'
-    ).order_by(Game.datetime.desc()).all()
-    
-    # Calculate affinity for each pair
-    for player1 in players:
         for player2 in players:
             if player1.id == player2.id:
                 continue
-                
-            games_together = 0
-            wins_together = 0
-            combined_performance = 0.0
-            total_weight = 0.0
             
-            for game_index, game in enumerate(finished_games):
-                # Get team assignments for both players
-                assignment1 = TeamAssignment.query.filter_by(
-                    game_id=game.id,
-                    user_id=player1.id
-                ).first()
-                
-                assignment2 = TeamAssignment.query.filter_by(
-                    game_id=game.id,
-                    user_id=player2.id
-                ).first()
-                
-                # Check if both players were assigned and on the same team
-                if assignment1 and assignment2 and assignment1.team == assignment2.team:
-                    games_together += 1
-                    
-                    # Calculate time-based weight (recent games matter more)
-                    # Games within last 30 days get full weight, older games get reduced weight
-                    days_ago = (datetime.now(timezone.utc) - game.datetime).days
-                    if days_ago <= 30:
-                        time_weight = 1.0
-                    elif days_ago <= 90:
-                        time_weight = 0.7
-                    elif days_ago <= 180:
-                        time_weight = 0.4
-                    else:
-                        time_weight = 0.2
-                    
-                    total_weight += time_weight
-                    
-                    # Check if they won together
-                    score = game.get_score()
-                    won_game = False
-                    if assignment1.team == 'A' and score['team_a'] > score['team_b']:
-                        won_game = True
-                    elif assignment1.team == 'B' and score['team_b'] > score['team_a']:
-                        won_game = True
-                    
-                    if won_game:
-                        wins_together += time_weight
-                    
-                    # Calculate combined performance in this game
-                    player1_goals = MatchEvent.query.filter_by(
-                        game_id=game.id,
-                        scorer_id=player1.id,
-                        event_type='goal'
-                    ).count()
-                    
-                    player1_assists = MatchEvent.query.filter_by(
-                        game_id=game.id,
-                        assist_id=player1.id
-                    ).count()
-                    
-                    player2_goals = MatchEvent.query.filter_by(
-                        game_id=game.id,
-                        scorer_id=player2.id,
-                        event_type='goal'
-                    ).count()
-                    
-                    player2_assists = MatchEvent.query.filter_by(
-                        game_id=game.id,
-                        assist_id=player2.id
-                    ).count()
-                    
-                    # Check for direct assist combinations (player1 assists player2's goal or vice versa)
-                    direct_combinations = MatchEvent.query.filter_by(
-                        game_id=game.id,
-                        event_type='goal'
-                    ).filter(
-                        ((MatchEvent.scorer_id == player1.id) & (MatchEvent.assist_id == player2.id)) |
-                        ((MatchEvent.scorer_id == player2.id) & (MatchEvent.assist_id == player1.id))
-                    ).count()
-                    
-                    game_performance = (
-                        (player1_goals + player2_goals) * 2.0 +
-                        (player1_assists + player2_assists) * 1.5 +
-                        direct_combinations * 3.0  # Extra bonus for direct combinations
-                    )
-                    
-                    combined_performance += game_performance * time_weight
+            pair = pair_stats.get((player1.id, player2.id))
             
-            # Calculate final affinity score
-            if games_together > 0 and total_weight > 0:
+            if pair and pair.games_together > 0:
+                reverse_pair = pair_stats.get((player2.id, player1.id))
+                direct_combinations = pair.assists_to + (reverse_pair.assists_to if reverse_pair else 0)
+                
                 # Base affinity on games played together
-                games_factor = min(1.0, games_together / 5.0)  # Normalize to max 5 games
+                games_factor = min(1.0, pair.games_together / 5.0)  # Normalize to max 5 games
                 
                 # Win rate when playing together
-                win_rate = wins_together / total_weight if total_weight > 0 else 0
+                win_rate = pair.wins_together / pair.games_together
                 
                 # Average performance when together
-                avg_performance = combined_performance / total_weight if total_weight > 0 else 0
+                avg_performance = (
+                    pair.goals_together * 2.0 +
+                    pair.assists_together * 1.5 +
+                    direct_combinations * 3.0  # Extra bonus for direct combinations
+                ) / pair.games_together
                 performance_factor = min(1.0, avg_performance / 5.0)  # Normalize
                 
                 # Combined affinity score (0-10 scale)
@@ -1198,6 +945,9 @@ def calculate_balanced_teams(players, group_id):
     # Calculate comprehensive player scores
     player_scores = []
     
+    # Recent results for every player, read from the packed form buffers
+    recent_form = get_recent_form(group_id, [player.id for player in players], n=5)
+    
     for player in players:
         score_data = {
             'player': player,
@@ -1294,46 +1044,15 @@ def calculate_balanced_teams(players, group_id):
         else:
             score_data['participation_score'] = 7.0  # Default
         
-        # 4. Calculate recent form (30% weight - recent 5 games)
-        recent_games = Game.query.filter_by(
-            group_id=group_id,
-            status='finished'
-        ).order_by(Game.datetime.desc()).limit(5).all()
+        # 4. Calculate recent form (30% weight - player's last 5 games)
+        recent_results = recent_form[player.id][:5]
         
         recent_performance = 0.0
-        recent_count = 0
+        recent_count = len(recent_results)
         
-        for game in recent_games:
-            team_assignment = TeamAssignment.query.filter_by(
-                game_id=game.id,
-                user_id=player.id
-            ).first()
-            
-            if team_assignment:
-                recent_count += 1
-                
-                # Recent goals and assists
-                goals = MatchEvent.query.filter_by(
-                    game_id=game.id,
-                    scorer_id=player.id,
-                    event_type='goal'
-                ).count()
-                
-                assists = MatchEvent.query.filter_by(
-                    game_id=game.id,
-                    assist_id=player.id
-                ).count()
-                
-                # Recent win
-                score = game.get_score()
-                won = False
-                if team_assignment.team == 'A' and score['team_a'] > score['team_b']:
-                    won = True
-                elif team_assignment.team == 'B' and score['team_b'] > score['team_a']:
-                    won = True
-                
-                game_performance = (goals * 2) + assists + (3 if won else 0)
-                recent_performance += game_performance
+        for goals, assists, result in recent_results:
+            game_performance = (goals * 2) + assists + (3 if result > 0 else 0)
+            recent_performance += game_performance
         
         if recent_count > 0:
             score_data['recent_form'] = min(10.0, recent_performance / recent_count)
@@ -1635,15 +1354,11 @@ def generate_composition_by_strategy(players, group_id, strategy):
     
     elif strategy == 'recent_form':
         # Balance by recent 3 games performance
-        recent_games = Game.query.filter_by(group_id=group_id, status='finished').order_by(Game.datetime.desc()).limit(3).all()
+        recent_form = get_recent_form(group_id, [p.id for p in players], n=3)
         player_recent = []
         
         for player in players:
-            recent_performance = 0
-            for game in recent_games:
-                goals = MatchEvent.query.filter_by(game_id=game.id, scorer_id=player.id, event_type='goal').count()
-                assists = MatchEvent.query.filter_by(game_id=game.id, assist_id=player.id).count()
-                recent_performance += goals + assists
+            recent_performance = sum(goals + assists for goals, assists, _ in recent_form[player.id])
             player_recent.append((player, recent_performance))
         
         player_recent.sort(key=lambda x: x[1], reverse=True)
@@ -1,9 +1,16 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, g
 from flask_login import login_required, current_user
 from models import Group, GroupMembership, User, FeedItem, Game, TeamAssignment, MatchEvent, POTMVote, PlayerAttributes, AdminPlayerRating
 from database import db
+from routes.access import require_group_member
 from datetime import datetime, timezone
+from functools import partial
 from sqlalchemy import func
+from services.pair_stats import get_player_partnerships
+from services.scores import attach_scores
+from routes.conditional import not_modified, page_etag, with_etag
+from services.db_routing import read_only
+from services.data_versions import group_version
 
 groups_bp = Blueprint('groups', __name__)
 
@@ -35,27 +42,24 @@ def create():
     return render_template('groups/create.html')
 
 @groups_bp.route('/<int:group_id>')
+@read_only
 @login_required
+@require_group_member()
 def view(group_id):
-    group = Group.query.get_or_404(group_id)
+    group = g.group
+    membership = g.membership
     
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=group_id
-    ).first()
-    
-    if not membership:
-        flash('You are not a member of this group')
-        return redirect(url_for('main.dashboard'))
-    
-    # Auto-update game statuses first
-    group.update_game_statuses()
+    # Answer revalidations from the group row already loaded for the access
+    # check and the group's data version
+    version = group_version(group)
+    etag = page_etag(version, membership.is_admin, clock=True)
+    response = not_modified(etag)
+    if response:
+        return response
     
     next_game = group.get_next_game()
     last_game = group.get_last_game()
-    
-    # Get all games for this group
-    all_games = Game.query.filter_by(group_id=group_id).order_by(Game.datetime.desc()).all()
+    attach_scores([last_game])
     
     feed_items = FeedItem.query.filter_by(group_id=group_id).order_by(
         FeedItem.created_at.desc()
@@ -63,12 +67,6 @@ def view(group_id):
     
     members = group.get_members()
     
-    # Calculate leaderboard data
-    leaderboard_data = calculate_leaderboard(group_id)
-    
-    # Calculate group statistics
-    group_stats = calculate_group_statistics(group_id)
-    
     # Get player attributes for all members
     player_attributes = {}
     if membership.is_admin:
@@ -76,31 +74,32 @@ def view(group_id):
         for attr in attributes_query:
             player_attributes[attr.user_id] = attr
     
-    return render_template('groups/view.html', 
+    # The games list, leaderboard and stats are cached fragments; they are
+    # only computed when the template misses for this group version
+    def load_games():
+        all_games = Game.query.filter_by(group_id=group_id).order_by(Game.datetime.desc()).all()
+        attach_scores([game for game in all_games if game.status == 'finished'])
+        return all_games
+    
+    return with_etag(render_template('groups/view.html', 
                          group=group, 
                          membership=membership,
                          next_game=next_game,
                          last_game=last_game,
-                         all_games=all_games,
                          feed_items=feed_items,
                          members=members,
-                         leaderboard_data=leaderboard_data,
-                         group_stats=group_stats,
-                         player_attributes=player_attributes)
+                         player_attributes=player_attributes,
+                         group_version=version,
+                         load_games=load_games,
+                         load_leaderboard=partial(calculate_leaderboard, group_id),
+                         load_group_stats=partial(calculate_group_statistics, group_id)), etag)
 
 @groups_bp.route('/<int:group_id>/members')
 @login_required
+@require_group_member()
 def members(group_id):
-    group = Group.query.get_or_404(group_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=group_id
-    ).first()
-    
-    if not membership:
-        flash('You are not a member of this group')
-        return redirect(url_for('main.dashboard'))
+    group = g.group
+    membership = g.membership
     
     memberships = GroupMembership.query.filter_by(group_id=group_id).join(User).all()
     
@@ -111,19 +110,8 @@ def members(group_id):
 
 @groups_bp.route('/<int:group_id>/members/<int:user_id>/promote', methods=['POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can promote members', redirect_endpoint='groups.members')
 def promote_member(group_id, user_id):
-    group = Group.query.get_or_404(group_id)
-    
-    admin_membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=group_id,
-        is_admin=True
-    ).first()
-    
-    if not admin_membership:
-        flash('Only admins can promote members')
-        return redirect(url_for('groups.members', group_id=group_id))
-    
     membership = GroupMembership.query.filter_by(
         user_id=user_id,
         group_id=group_id
@@ -137,19 +125,8 @@ def promote_member(group_id, user_id):
 
 @groups_bp.route('/<int:group_id>/members/<int:user_id>/demote', methods=['POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can demote members', redirect_endpoint='groups.members')
 def demote_member(group_id, user_id):
-    group = Group.query.get_or_404(group_id)
-    
-    admin_membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=group_id,
-        is_admin=True
-    ).first()
-    
-    if not admin_membership:
-        flash('Only admins can demote members')
-        return redirect(url_for('groups.members', group_id=group_id))
-    
     membership = GroupMembership.query.filter_by(
         user_id=user_id,
         group_id=group_id
@@ -172,17 +149,9 @@ def demote_member(group_id, user_id):
 
 @groups_bp.route('/<int:group_id>/players/<int:user_id>/attributes', methods=['GET'])
 @login_required
+@require_group_member(admin=True, message='Only admins can access player attributes', json=True)
 def get_player_attributes(group_id, user_id):
-    group = Group.query.get_or_404(group_id)
-    
-    admin_membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=group_id,
-        is_admin=True
-    ).first()
-    
-    if not admin_membership:
-        return jsonify({'error': 'Only admins can access player attributes'}), 403
+    group = g.group
     
     # Check if the user is a member of the group
     target_membership = GroupMembership.query.filter_by(
@@ -287,17 +256,9 @@ def get_player_attributes(group_id, user_id):
 
 @groups_bp.route('/<int:group_id>/players/<int:user_id>/attributes', methods=['POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can update player attributes', json=True)
 def update_player_attributes(group_id, user_id):
-    group = Group.query.get_or_404(group_id)
-    
-    admin_membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=group_id,
-        is_admin=True
-    ).first()
-    
-    if not admin_membership:
-        return jsonify({'error': 'Only admins can update player attributes'}), 403
+    group = g.group
     
     # Check if the user is a member of the group
     target_membership = GroupMembership.query.filter_by(
@@ -400,12 +361,39 @@ def update_player_attributes(group_id, user_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to update player attributes'}), 500
 
+@groups_bp.route('/<int:group_id>/players/<int:user_id>/partnerships', methods=['GET'])
+@read_only
+@login_required
+@require_group_member(json=True)
+def player_partnerships(group_id, user_id):
+    target_membership = GroupMembership.query.filter_by(
+        user_id=user_id,
+        group_id=group_id
+    ).first()
+    
+    if not target_membership:
+        return jsonify({'error': 'User is not a member of this group'}), 404
+    
+    partnerships = get_player_partnerships(group_id, user_id)
+    partnerships['user_id'] = user_id
+    
+    return jsonify(partnerships)
+
 def calculate_leaderboard(group_id):
     """Calculate leaderboard data for all group members"""
     leaderboard = []
     
     # Get all finished games for this group
     finished_games = Game.query.filter_by(group_id=group_id, status='finished').all()
+    attach_scores(finished_games)
+    
+    # Each player's team in each finished game, in one query
+    teams = {
+        (assignment.game_id, assignment.user_id): assignment.team
+        for assignment in TeamAssignment.query.filter(
+            TeamAssignment.game_id.in_([game.id for game in finished_games])
+        )
+    }
     
     # Get all group members
     group_members = User.query.join(GroupMembership).filter(
@@ -455,17 +443,14 @@ def calculate_leaderboard(group_id):
         # Calculate wins, draws, losses, points
         for game in finished_games:
             # Check if player was assigned to a team
-            team_assignment = TeamAssignment.query.filter_by(
-                game_id=game.id,
-                user_id=member.id
-            ).first()
+            team = teams.get((game.id, member.id))
             
-            if team_assignment:
+            if team:
                 player_stats['games_played'] += 1
                 score = game.get_score()
                 
                 # Determine result based on team assignment
-                if team_assignment.team == 'A':
+                if team == 'A':
                     if score['team_a'] > score['team_b']:
                         player_stats['wins'] += 1
                         player_stats['points'] += 3
@@ -583,17 +568,10 @@ def calculate_group_statistics(group_id):
 
 @groups_bp.route('/<int:group_id>/activity')
 @login_required
+@require_group_member()
 def activity(group_id):
-    group = Group.query.get_or_404(group_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=group_id
-    ).first()
-    
-    if not membership:
-        flash('You are not a member of this group')
-        return redirect(url_for('main.dashboard'))
+    group = g.group
+    membership = g.membership
     
     # Get all feed items for this group (paginated)
     page = request.args.get('page', 1, type=int)
@@ -1,8 +1,8 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, g
 from flask_login import login_required, current_user
 from models import Group, GroupMembership, User
 from database import db
-import qrcode
+from routes.access import require_group_member
 import io
 import base64
 
@@ -12,9 +12,6 @@ invites_bp = Blueprint('invites', __name__)
 def join_preview(invite_code):
     group = Group.query.filter_by(invite_code=invite_code).first_or_404()
     
-    # Auto-update game statuses
-    group.update_game_statuses()
-    
     if current_user.is_authenticated:
         existing_membership = GroupMembership.query.filter_by(
             user_id=current_user.id,
@@ -101,22 +98,14 @@ def join_group(invite_code):
 
 @invites_bp.route('/groups/<int:group_id>/invite')
 @login_required
+@require_group_member(admin=True, message='Only admins can manage invites')
 def manage_invite(group_id):
-    group = Group.query.get_or_404(group_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=group_id,
-        is_admin=True
-    ).first()
-    
-    if not membership:
-        flash('Only admins can manage invites')
-        return redirect(url_for('groups.view', group_id=group_id))
+    group = g.group
     
     invite_url = url_for('invites.join_preview', invite_code=group.invite_code, _external=True)
     
-    # Generate QR code
+    # Generate QR code; qrcode is only imported when an admin opens this page
+    import qrcode
     qr = qrcode.QRCode(version=1, box_size=10, border=5)
     qr.add_data(invite_url)
     qr.make(fit=True)
@@ -135,18 +124,9 @@ def manage_invite(group_id):
 
 @invites_bp.route('/groups/<int:group_id>/invite/regenerate', methods=['POST'])
 @login_required
+@require_group_member(admin=True, message='Only admins can regenerate invites')
 def regenerate_invite(group_id):
-    group = Group.query.get_or_404(group_id)
-    
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=group_id,
-        is_admin=True
-    ).first()
-    
-    if not membership:
-        flash('Only admins can regenerate invites')
-        return redirect(url_for('groups.view', group_id=group_id))
+    group = g.group
     
     group.invite_code = group.generate_invite_code()
     db.session.commit()
@@ -1,9 +1,13 @@
-from flask import Blueprint, render_template, redirect, url_for, request, flash
+from flask import Blueprint, render_template, redirect, url_for, request, flash, jsonify
 from flask_login import login_required, current_user
-from models import Group, GroupMembership, User, MatchEvent, POTMVote
+from models import Group, GroupMembership, User
 from database import db
 from flask_bcrypt import check_password_hash, generate_password_hash
 from sqlalchemy import func
+from services.dashboard import load_dashboard
+from services.game_history import load_history_page
+from services.player_stats import get_user_stats
+from services.db_routing import read_only
 
 main_bp = Blueprint('main', __name__)
 
@@ -16,37 +20,53 @@ def index():
 @main_bp.route('/dashboard')
 @login_required
 def dashboard():
-    user_groups = Group.query.join(GroupMembership).filter(
-        GroupMembership.user_id == current_user.id
-    ).all()
-    
-    # Auto-update game statuses for all user groups
-    for group in user_groups:
-        group.update_game_statuses()
+    # Groups, next/last games, member counts and scores in a fixed number of queries
+    dashboard = load_dashboard(current_user.id)
+    user_groups = dashboard['groups']
     
     # Calculate stats for template
-    upcoming_games = [group.get_next_game() for group in user_groups if group.get_next_game()]
-    total_members = sum(len(group.get_members()) for group in user_groups)
+    upcoming_games = [dashboard['next_games'][group.id] for group in user_groups if group.id in dashboard['next_games']]
+    total_members = sum(dashboard['member_counts'].values())
     
     return render_template('dashboard.html', 
                          groups=user_groups,
                          upcoming_games=upcoming_games,
+                         next_games=dashboard['next_games'],
+                         last_games=dashboard['last_games'],
+                         member_counts=dashboard['member_counts'],
+                         admin_group_ids=dashboard['admin_group_ids'],
                          total_members=total_members)
 
 @main_bp.route('/history')
+@read_only
 @login_required
 def game_history():
-    """Show all games for the user"""
-    from models import Game, GroupMembership
+    """Show the first page of games for the user; later pages load on scroll"""
+    page = load_history_page(current_user.id)
     
-    # Get all games for user's groups (both upcoming and finished)
-    user_group_ids = [membership.group_id for membership in GroupMembership.query.filter_by(user_id=current_user.id).all()]
+    return render_template('game_history.html', 
+                         games=page['games'],
+                         response_counts=page['response_counts'],
+                         next_cursor=page['next_cursor'])
+
+@main_bp.route('/history/page')
+@read_only
+@login_required
+def game_history_page():
+    """Next page of game history as rendered rows plus the cursor after it"""
+    cursor = request.args.get('cursor', '')
     
-    all_games = Game.query.filter(
-        Game.group_id.in_(user_group_ids)
-    ).order_by(Game.datetime.desc()).all()
+    try:
+        page = load_history_page(current_user.id, cursor=cursor)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
     
-    return render_template('game_history.html', all_games=all_games)
+    return jsonify({
+        'html': render_template('game_history_rows.html',
+                                games=page['games'],
+                                response_counts=page['response_counts']),
+        'next_cursor': page['next_cursor']
+    })
 
 @main_bp.route('/join', methods=['GET', 'POST'])
 @login_required
@@ -88,43 +108,24 @@ def join_group():
     return render_template('join_group.html')
 
 @main_bp.route('/profile')
+@read_only
 @login_required
 def profile():
-    # Get user's groups and admin roles
-    user_groups = Group.query.join(GroupMembership).filter(
-        GroupMembership.user_id == current_user.id
-    ).all()
-    
-    admin_groups = Group.query.join(GroupMembership).filter(
-        GroupMembership.user_id == current_user.id,
-        GroupMembership.is_admin == True
-    ).all()
-    
-    # Get user's match statistics
-    total_goals = MatchEvent.query.filter_by(
-        scorer_id=current_user.id,
-        event_type='goal'
-    ).count()
-    
-    total_assists = MatchEvent.query.filter_by(
-        assist_id=current_user.id
-    ).count()
-    
-    total_own_goals = MatchEvent.query.filter_by(
-        scorer_id=current_user.id,
-        event_type='own_goal'
-    ).count()
+    # Per-group and total match statistics, cached per user
+    stats = get_user_stats(current_user.id)
+    totals = stats['totals']
     
-    # Get POTM wins
-    potm_wins = POTMVote.query.filter_by(voted_for_id=current_user.id).count()
+    user_groups = stats['groups']
+    admin_groups = [group for group in user_groups if group['is_admin']]
     
     return render_template('profile.html',
                          user_groups=user_groups,
                          admin_groups=admin_groups,
-                         total_goals=total_goals,
-                         total_assists=total_assists,
-                         total_own_goals=total_own_goals,
-                         potm_wins=potm_wins)
+                         total_goals=totals['goals'],
+                         total_assists=totals['assists'],
+                         total_own_goals=totals['own_goals'],
+                         potm_wins=totals['potm_awards'],
+                         totals=totals)
 
 @main_bp.route('/settings', methods=['GET', 'POST'])
 @login_required
@@ -140,7 +141,7 @@ def settings():
             elif len(display_name) > 100:
                 flash('Display name must be 100 characters or less', 'error')
             else:
-                current_user.display_name = display_name
+                current_user.orm.display_name = display_name
                 db.session.commit()
                 flash('Profile updated successfully', 'success')
         
@@ -158,7 +159,7 @@ def settings():
             elif len(new_password) < 6:
                 flash('New password must be at least 6 characters', 'error')
             else:
-                current_user.password_hash = generate_password_hash(new_password)
+                current_user.orm.password_hash = generate_password_hash(new_password)
                 db.session.commit()
                 flash('Password changed successfully', 'success')
         
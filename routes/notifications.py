@@ -3,20 +3,38 @@ from flask_login import login_required, current_user
 from models import Notification, User, Group, Game
 from database import db
 from datetime import datetime, timezone
-from sqlalchemy import desc
+from sqlalchemy import case, desc, func
+from routes.conditional import make_etag, not_modified, with_etag
+from services.sharding import use_shard
 
 notifications_bp = Blueprint('notifications', __name__)
 
+def notifications_version(user_id):
+    """
+    Fingerprint of a user's notifications: changes when one is added,
+    deleted or marked read. One query on the user's notification index.
+    """
+    return tuple(db.session.query(
+        func.count(Notification.id),
+        func.max(Notification.id),
+        func.sum(case((Notification.is_read, 1), else_=0))
+    ).filter(Notification.user_id == user_id).one())
+
 @notifications_bp.route('/count', methods=['GET'])
 @login_required
 def get_notification_count():
     """Get the count of unread notifications for the current user"""
+    etag = make_etag('count', current_user.id, *notifications_version(current_user.id))
+    response = not_modified(etag)
+    if response:
+        return response
+    
     count = Notification.query.filter_by(
         user_id=current_user.id,
         is_read=False
     ).count()
     
-    return jsonify({'count': count})
+    return with_etag(jsonify({'count': count}), etag)
 
 @notifications_bp.route('', methods=['GET'])
 @login_required
@@ -24,13 +42,18 @@ def get_notifications():
     """Get recent notifications for the current user"""
     limit = request.args.get('limit', 20, type=int)
     
+    etag = make_etag('list', current_user.id, limit, *notifications_version(current_user.id))
+    response = not_modified(etag)
+    if response:
+        return response
+    
     notifications = Notification.query.filter_by(
         user_id=current_user.id
     ).order_by(desc(Notification.created_at)).limit(limit).all()
     
-    return jsonify({
+    return with_etag(jsonify({
         'notifications': [notification.to_dict() for notification in notifications]
-    })
+    }), etag)
 
 @notifications_bp.route('/<int:notification_id>/read', methods=['POST'])
 @login_required
@@ -44,7 +67,9 @@ def mark_notification_read(notification_id):
     if not notification:
         return jsonify({'error': 'Notification not found'}), 404
     
-    notification.mark_as_read()
+    # Notifications live on their group's shard
+    with use_shard(notification.group_id):
+        notification.mark_as_read()
     
     return jsonify({'success': True})
 
@@ -52,18 +77,27 @@ def mark_notification_read(notification_id):
 @login_required
 def mark_all_notifications_read():
     """Mark all notifications as read for the current user"""
-    notifications = Notification.query.filter_by(
+    group_ids = db.session.query(Notification.group_id).filter_by(
         user_id=current_user.id,
         is_read=False
-    ).all()
-    
-    for notification in notifications:
-        notification.is_read = True
-        notification.read_at = datetime.now(timezone.utc)
+    ).distinct().all()
+    
+    # One update per group, on the group's shard
+    marked_count = 0
+    for (group_id,) in group_ids:
+        with use_shard(group_id):
+            marked_count += Notification.query.filter_by(
+                user_id=current_user.id,
+                group_id=group_id,
+                is_read=False
+            ).update({
+                Notification.is_read: True,
+                Notification.read_at: datetime.now(timezone.utc)
+            }, synchronize_session=False)
     
     db.session.commit()
     
-    return jsonify({'success': True, 'marked_count': len(notifications)})
+    return jsonify({'success': True, 'marked_count': marked_count})
 
 def create_notification(user_id, notification_type, title, message, group_id=None, game_id=None, related_user_id=None):
     """
@@ -74,7 +108,7 @@ def create_notification(user_id, notification_type, title, message, group_id=Non
         notification_type: Type of notification (e.g., 'game_created', 'member_joined')
         title: Short title for the notification
         message: Detailed message
-        group_id: Optional group ID
+        group_id: Optional group ID (required with DB_SHARDS: the notification goes to the group's shard)
         game_id: Optional game ID
         related_user_id: Optional ID of related user
     """
@@ -88,8 +122,9 @@ def create_notification(user_id, notification_type, title, message, group_id=Non
         related_user_id=related_user_id
     )
     
-    db.session.add(notification)
-    db.session.commit()
+    with use_shard(group_id):
+        db.session.add(notification)
+        db.session.commit()
     
     return notification
 
@@ -111,20 +146,24 @@ def notify_group_members(group_id, notification_type, title, message, exclude_us
     # Get all group members
     memberships = GroupMembership.query.filter_by(group_id=group_id).all()
     
-    notifications_created = 0
-    for membership in memberships:
-        if exclude_user_id and membership.user_id == exclude_user_id:
-            continue
-            
-        create_notification(
+    notifications = [
+        Notification(
             user_id=membership.user_id,
-            notification_type=notification_type,
+            group_id=group_id,
+            type=notification_type,
             title=title,
             message=message,
-            group_id=group_id,
             game_id=game_id,
             related_user_id=related_user_id
         )
-        notifications_created += 1
+        for membership in memberships
+        if not (exclude_user_id and membership.user_id == exclude_user_id)
+    ]
+    
+    # One short write transaction for the whole fan-out, on the group's
+    # shard when sharded: it doesn't wait for the directory's write lock
+    with use_shard(group_id):
+        db.session.add_all(notifications)
+        db.session.commit()
     
-    return notifications_created
\ No newline at end of file
+    return len(notifications)
\ No newline at end of file
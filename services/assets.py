@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+from flask import current_app, request, send_from_directory, url_for
+from werkzeug.security import safe_join
+
+# Under the static folder: sources are edited in src/js and src/css,
+# `flask assets build` writes content-hashed and precompressed copies to dist/
+SOURCE_DIR = 'src'
+ASSET_DIRS = ('js', 'css')
+OUTPUT_DIR = 'dist'
+
+# Hashed names never change content, so clients may keep them for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Preferred first
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _sources(source_dir):
+    for asset_dir in ASSET_DIRS:
+        for root, _, files in os.walk(os.path.join(source_dir, asset_dir)):
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                yield os.path.relpath(path, source_dir).replace(os.sep, '/'), path
+
+
+def build_assets(static_folder):
+    """
+    Write every file under static/src/js and static/src/css to static/dist/ as
+    name.<hash>.ext plus .gz and (with the brotli package) .br copies, and
+    the manifest mapping source names to hashed ones. Files from earlier
+    builds are kept for pages rendered before a deploy.
+    Returns [(name, hashed name, sizes by encoding)].
+    """
+    source_dir = os.path.join(static_folder, SOURCE_DIR)
+    output_dir = os.path.join(static_folder, OUTPUT_DIR)
+    brotli = _brotli()
+
+    manifest, built = {}, []
+    for name, path in _sources(source_dir):
+        with open(path, 'rb') as f:
+            content = f.read()
+        stem, ext = os.path.splitext(name)
+        hashed = f'{stem}.{hashlib.sha256(content).hexdigest()[:12]}{ext}'
+        target = os.path.join(output_dir, hashed)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        variants = {'identity': content, 'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['br'] = brotli.compress(content, quality=11)
+
+        with open(target, 'wb') as f:
+            f.write(content)
+        for encoding, suffix in ENCODINGS:
+            if encoding in variants:
+                with open(target + suffix, 'wb') as f:
+                    f.write(variants[encoding])
+
+        manifest[name] = hashed
+        built.append((name, hashed, {encoding: len(data) for encoding, data in variants.items()}))
+
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return built
+
+
+def asset_url(name):
+    """
+    URL of static/src/<name>: its hashed build from the manifest, or the
+    source file itself in debug mode and before the first build.
+    """
+    hashed = current_app.extensions['assets'].get(name)
+    if hashed is None or current_app.debug:
+        return url_for('static', filename=f'{SOURCE_DIR}/{name}')
+    return url_for('assets', filename=hashed)
+
+
+def assets_version():
+    return current_app.extensions['assets_version']
+
+
+def serve_asset(filename):
+    """A built asset, precompressed when the client accepts it, cached forever"""
+    directory = os.path.join(current_app.static_folder, OUTPUT_DIR)
+    mimetype = mimetypes.guess_type(filename)[0]
+
+    for encoding, suffix in ENCODINGS:
+        path = safe_join(directory, filename + suffix)
+        if request.accept_encodings[encoding] and path is not None and os.path.isfile(path):
+            response = send_from_directory(directory, filename + suffix, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(directory, filename, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+
+    response.vary.add('Accept-Encoding')
+    response.cache_control.immutable = True
+    return response
+
+
+def init_assets(app):
+    """Load the asset manifest, serve /assets/ and add asset_url() to templates"""
+    manifest_path = os.path.join(app.static_folder, OUTPUT_DIR, 'manifest.json')
+    manifest = {}
+    if os.path.isfile(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    app.extensions['assets'] = manifest
+    # Changes with every build that changes an asset; part of page ETags
+    app.extensions['assets_version'] = hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()[:12]
+
+    app.add_url_rule('/assets/<path:filename>', 'assets', serve_asset)
+    app.jinja_env.globals['asset_url'] = asset_url
@@ -0,0 +1,168 @@
+import zlib
+
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml'
+)
+
+# Statuses without a body, or with a partial one that must not be re-encoded
+SKIP_STATUSES = {'204', '206', '304'}
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+class GzipCompressor:
+    def __init__(self, level):
+        # wbits 16 + MAX_WBITS: gzip header and trailer instead of raw zlib
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, brotli, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def make_compressor(encoding, gzip_level=6, brotli_quality=4):
+    if encoding == 'br':
+        return BrotliCompressor(_brotli(), brotli_quality)
+    return GzipCompressor(gzip_level)
+
+
+def choose_encoding(accept_encoding, brotli_available=True):
+    """'br', 'gzip' or None for an Accept-Encoding header value"""
+    accepted = parse_accept_header(accept_encoding or '')
+    if brotli_available and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _vary_on_encoding(headers):
+    """Compressible responses differ by Accept-Encoding, compressed or not"""
+    if not headers.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+        return
+    vary = headers.get('Vary')
+    if not vary:
+        headers['Vary'] = 'Accept-Encoding'
+    elif 'accept-encoding' not in vary.lower():
+        headers['Vary'] = f'{vary}, Accept-Encoding'
+
+
+class CompressionMiddleware:
+    """
+    Compresses text responses of at least `min_size` bytes with brotli
+    (when installed) or gzip, whichever the client prefers to accept.
+    Responses that already have a Content-Encoding, carry no Content-Length
+    (streamed), are event streams, ranges, HEAD requests or marked
+    `Cache-Control: no-transform` pass through untouched. The body is
+    compressed chunk by chunk as the application yields it.
+    """
+
+    def __init__(self, app, min_size=1024, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli_available = _brotli() is not None
+
+    def _should_compress(self, environ, status, headers):
+        if environ['REQUEST_METHOD'] == 'HEAD' or 'HTTP_RANGE' in environ:
+            return False
+        if status.split(' ', 1)[0] in SKIP_STATUSES or 'Content-Encoding' in headers:
+            return False
+
+        content_type = headers.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_TYPES) or content_type.startswith('text/event-stream'):
+            return False
+        if 'no-transform' in headers.get('Cache-Control', ''):
+            return False
+
+        length = headers.get('Content-Length')
+        return length is not None and int(length) >= self.min_size
+
+    def __call__(self, environ, start_response):
+        encoding = choose_encoding(environ.get('HTTP_ACCEPT_ENCODING'), self.brotli_available)
+        if encoding is None:
+            return self._vary(environ, start_response)
+
+        state = {'returned': False}
+
+        def compressing_start_response(status, response_headers, exc_info=None):
+            headers = Headers(response_headers)
+            # Only while the app is being called: a later start_response
+            # belongs to an iterable that is already passed through as is
+            if not state['returned'] and self._should_compress(environ, status, headers):
+                state['compressor'] = make_compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers['Content-Encoding'] = encoding
+                headers.remove('Content-Length')
+                # The encoded body is a different representation
+                etag = headers.get('ETag')
+                if etag and not etag.startswith('W/'):
+                    headers['ETag'] = 'W/' + etag
+            _vary_on_encoding(headers)
+            return start_response(status, headers.to_wsgi_list(), exc_info)
+
+        app_iter = self.app(environ, compressing_start_response)
+        state['returned'] = True
+        if 'compressor' not in state:
+            return app_iter
+        return self._compress(app_iter, state['compressor'])
+
+    def _vary(self, environ, start_response):
+        def vary_start_response(status, response_headers, exc_info=None):
+            headers = Headers(response_headers)
+            _vary_on_encoding(headers)
+            return start_response(status, headers.to_wsgi_list(), exc_info)
+
+        return self.app(environ, vary_start_response)
+
+    @staticmethod
+    def _compress(app_iter, compressor):
+        try:
+            for chunk in app_iter:
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+            yield compressor.finish()
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+
+def init_compression(app):
+    """Wrap the app in CompressionMiddleware unless COMPRESSION_ENABLED is off"""
+    app.config.setdefault('COMPRESSION_ENABLED', True)
+    app.config.setdefault('COMPRESSION_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESSION_GZIP_LEVEL', 6)
+    app.config.setdefault('COMPRESSION_BROTLI_QUALITY', 4)
+
+    if not app.config['COMPRESSION_ENABLED']:
+        return
+
+    app.wsgi_app = CompressionMiddleware(
+        app.wsgi_app,
+        min_size=app.config['COMPRESSION_MIN_SIZE'],
+        gzip_level=app.config['COMPRESSION_GZIP_LEVEL'],
+        brotli_quality=app.config['COMPRESSION_BROTLI_QUALITY'],
+    )
@@ -0,0 +1,85 @@
+from database import db
+from models import Game, Group, GroupMembership
+from services.scores import attach_scores
+from sqlalchemy import func
+
+
+def load_dashboard(user_id):
+    """
+    Load everything the dashboard shows for a user's groups with a fixed
+    number of set-based queries, however many groups the user is in.
+
+    Returns:
+        {
+            'groups': [Group], 'admin_group_ids': set of group IDs,
+            'next_games': {group_id: Game}, 'last_games': {group_id: Game},
+            'member_counts': {group_id: int}
+        }
+    """
+    rows = db.session.query(Group, GroupMembership.is_admin).join(
+        GroupMembership, GroupMembership.group_id == Group.id
+    ).filter(
+        GroupMembership.user_id == user_id
+    ).order_by(Group.id).all()
+
+    groups = [group for group, _ in rows]
+    group_ids = [group.id for group in groups]
+
+    dashboard = {
+        'groups': groups,
+        'admin_group_ids': {group.id for group, is_admin in rows if is_admin},
+        'next_games': {},
+        'last_games': {},
+        'member_counts': {}
+    }
+    if not group_ids:
+        return dashboard
+
+    dashboard['next_games'] = _first_game_per_group(
+        group_ids,
+        Game.next_game_clause(),
+        Game.datetime.asc()
+    )
+    dashboard['last_games'] = _first_game_per_group(
+        group_ids,
+        Game.status == 'finished',
+        Game.datetime.desc()
+    )
+    attach_scores(dashboard['last_games'].values())
+
+    dashboard['member_counts'] = dict(
+        db.session.query(
+            GroupMembership.group_id,
+            func.count(GroupMembership.id)
+        ).filter(
+            GroupMembership.group_id.in_(group_ids)
+        ).group_by(GroupMembership.group_id).all()
+    )
+
+    return dashboard
+
+
+def _first_game_per_group(group_ids, condition, order):
+    """
+    The first matching game of each group under `order`, picked with a
+    ROW_NUMBER() window in one query.
+
+    Returns:
+        Dict mapping group ID to Game; groups without a match are absent
+    """
+    ranked = db.session.query(
+        Game.id.label('game_id'),
+        func.row_number().over(
+            partition_by=Game.group_id,
+            order_by=(order, Game.id)
+        ).label('position')
+    ).filter(
+        Game.group_id.in_(group_ids),
+        condition
+    ).subquery()
+
+    games = Game.query.join(
+        ranked, Game.id == ranked.c.game_id
+    ).filter(ranked.c.position == 1).all()
+
+    return {game.group_id: game for game in games}
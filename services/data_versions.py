@@ -0,0 +1,134 @@
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database import db
+from models import (AvailabilityVote, DataVersion, FeedItem, Game, Group, GroupMembership, MatchEvent,
+                    PlayerAttributes, POTMVote, TeamAssignment, User)
+
+
+def bump_versions(connection, game_ids=(), group_ids=(), cascade_group_ids=()):
+    """
+    Increment Game.data_version and Group.data_version in the current
+    transaction. Games also bump their group; `cascade_group_ids` bumps a
+    group together with every one of its games.
+    """
+    game_ids = set(game_ids)
+    group_ids = set(group_ids) | set(cascade_group_ids)
+
+    if game_ids:
+        group_ids.update(connection.execute(
+            select(Game.group_id).where(Game.id.in_(game_ids))
+        ).scalars())
+        connection.execute(
+            update(Game).where(Game.id.in_(game_ids)).values(data_version=Game.data_version + 1)
+        )
+    if cascade_group_ids:
+        connection.execute(
+            update(Game).where(Game.group_id.in_(set(cascade_group_ids)))
+            .values(data_version=Game.data_version + 1)
+        )
+    if group_ids:
+        connection.execute(
+            update(Group).where(Group.id.in_(group_ids)).values(data_version=Group.data_version + 1)
+        )
+
+
+def bump_data_versions(connection, game_ids=(), group_ids=()):
+    """
+    Increment the DataVersion counters of games and groups in the current
+    transaction; games also bump their group. Run it on the connection
+    that writes the data, the group's shard when sharded.
+    """
+    keys = {(group_id, 0) for group_id in group_ids}
+    if game_ids:
+        for game_id, group_id in connection.execute(
+            select(Game.id, Game.group_id).where(Game.id.in_(set(game_ids)))
+        ):
+            keys.update({(group_id, game_id), (group_id, 0)})
+    if not keys:
+        return
+
+    dialect = postgresql if connection.dialect.name == 'postgresql' else sqlite
+    statement = dialect.insert(DataVersion).values([
+        {'group_id': group_id, 'game_id': game_id, 'version': 1} for group_id, game_id in sorted(keys)
+    ])
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[DataVersion.group_id, DataVersion.game_id],
+        set_={'version': DataVersion.version + 1}
+    ))
+
+
+def data_version(group_id, game_id=0):
+    """A DataVersion counter, 0 before the first change"""
+    return db.session.execute(select(DataVersion.version).where(
+        DataVersion.group_id == group_id, DataVersion.game_id == game_id
+    )).scalar() or 0
+
+
+def game_version(game):
+    """Changes with the game row and with the game's votes, teams and events"""
+    return f'{game.data_version}.{data_version(game.group_id, game.id)}'
+
+
+def group_version(group):
+    """Changes with the group, its members and games, and with its group-scoped data"""
+    return f'{group.data_version}.{data_version(group.id)}'
+
+
+def _attribute_values(obj, attr):
+    """Current and previous (pre-flush) values of an attribute"""
+    history = inspect(obj).attrs[attr].history
+    values = set(history.added) | set(history.unchanged) | set(history.deleted)
+    values.add(getattr(obj, attr))
+    return {value for value in values if value is not None}
+
+
+def _bump_changed_versions(session, flush_context):
+    """
+    Bump the versions of the games and groups a flush changed: the row
+    versions for the directory's data, DataVersion for the group-scoped
+    data, each in the transaction that writes the data.
+    """
+    game_ids = set()
+    group_ids = set()
+    cascade_group_ids = set()
+    data_game_ids = set()
+    data_group_ids = set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Game):
+            game_ids.add(obj.id)
+            group_ids |= _attribute_values(obj, 'group_id')
+        elif isinstance(obj, (MatchEvent, TeamAssignment, AvailabilityVote, POTMVote)):
+            data_game_ids |= _attribute_values(obj, 'game_id')
+        elif isinstance(obj, (FeedItem, PlayerAttributes)):
+            data_group_ids |= _attribute_values(obj, 'group_id')
+        elif isinstance(obj, Group):
+            cascade_group_ids.add(obj.id)
+        elif isinstance(obj, GroupMembership):
+            # Member lists and admin controls appear on every game page
+            cascade_group_ids |= _attribute_values(obj, 'group_id')
+        elif isinstance(obj, User) and inspect(obj).attrs.display_name.history.has_changes():
+            # Names appear on every page of every group the user is in
+            cascade_group_ids.update(session.connection().execute(
+                select(GroupMembership.group_id).where(GroupMembership.user_id == obj.id)
+            ).scalars())
+
+    if game_ids or group_ids or cascade_group_ids:
+        # A write to the games table, which stays in the directory when sharded
+        connection = session.connection(bind_arguments={'mapper': inspect(Game)})
+        bump_versions(connection, game_ids, group_ids, cascade_group_ids)
+    if data_game_ids or data_group_ids:
+        # On the group's shard when sharded, so match-day writes never take the directory's lock
+        connection = session.connection(bind_arguments={'mapper': inspect(DataVersion)})
+        bump_data_versions(connection, data_game_ids, data_group_ids)
+
+
+def init_data_versions(app):
+    """
+    Bump Game.data_version, Group.data_version and DataVersion in every
+    flush that changes them, so ETags and cached fragments follow the data.
+    """
+    if not event.contains(Session, 'after_flush', _bump_changed_versions):
+        event.listen(Session, 'after_flush', _bump_changed_versions)
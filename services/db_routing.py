@@ -0,0 +1,108 @@
+import os
+import time
+
+from flask import current_app, g, has_request_context, request, session
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.orm import Session
+
+from services.sqlite_profile import configure_sqlite_engine
+
+
+def read_only(view):
+    """
+    Mark a view as read-only: its queries go to the read replica unless
+    the user wrote something in the last DB_READ_YOUR_WRITES_SECONDS.
+    Writing from a read-only view fails on a SQLite replica.
+    """
+    view.read_only = True
+    return view
+
+
+def _sqlite_replica(app, primary):
+    """A read-only connection pool on the primary SQLite file"""
+    path = primary.url.database
+    pragmas = {name: value for name, value in app.config['SQLITE_PRAGMAS'].items()
+               if name not in ('journal_mode', 'synchronous')}
+    pragmas['query_only'] = 'ON'
+
+    engine = create_engine(
+        f'sqlite:///file:{path}?mode=ro&uri=true',
+        **app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    )
+    configure_sqlite_engine(engine, pragmas, immediate_writes=False)
+    return engine
+
+
+def _replica_url(app):
+    """DATABASE_REPLICA_URL, with a relative SQLite path resolved against instance/ like the primary's"""
+    url = make_url(app.config['DATABASE_REPLICA_URL'])
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return url
+    # sqlite:///file:path?uri=true names the file after the file: prefix
+    prefix = 'file:' if url.query.get('uri') and url.database.startswith('file:') else ''
+    path = url.database[len(prefix):]
+    if os.path.isabs(path):
+        return url
+    return url.set(database=prefix + os.path.join(app.instance_path, path))
+
+
+def replica_engine():
+    return current_app.extensions.get('db_replica')
+
+
+def _recently_wrote():
+    last_write = session.get('_last_write_at')
+    return last_write is not None and time.time() - last_write < current_app.config['DB_READ_YOUR_WRITES_SECONDS']
+
+
+def init_db_routing(app, db):
+    """
+    Route read-only endpoints to DATABASE_REPLICA_URL or, for a SQLite
+    primary, to a read-only connection on the same file. Call after
+    init_sqlite_profile().
+    """
+    app.config.setdefault('DATABASE_REPLICA_URL', None)
+    app.config.setdefault('DB_READ_ONLY_ROUTING', True)
+    app.config.setdefault('DB_READ_YOUR_WRITES_SECONDS', 10)
+
+    if not app.config['DB_READ_ONLY_ROUTING']:
+        return
+
+    with app.app_context():
+        primary = db.engine
+        if app.config['DATABASE_REPLICA_URL']:
+            engine = create_engine(_replica_url(app), **app.config['SQLALCHEMY_ENGINE_OPTIONS'])
+        elif primary.dialect.name == 'sqlite' and primary.url.database not in (None, '', ':memory:'):
+            engine = _sqlite_replica(app, primary)
+        else:
+            return
+    app.extensions['db_replica'] = engine
+
+    @app.before_request
+    def route_reads():
+        view = app.view_functions.get(request.endpoint)
+        if getattr(view, 'read_only', False) and not _recently_wrote():
+            g.db_replica = engine
+
+    @app.after_request
+    def remember_write(response):
+        if g.pop('db_wrote', False):
+            session['_last_write_at'] = time.time()
+        return response
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_flush(db_session, flush_context):
+    db_session.info['db_wrote'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _note_write(db_session):
+    # Start the user's read-your-writes window once the write is committed
+    if db_session.info.pop('db_wrote', False) and has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_write(db_session, previous_transaction):
+    db_session.info.pop('db_wrote', None)
@@ -0,0 +1,87 @@
+from flask import current_app
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from services.cache import TTLCache
+
+
+class LocalBackend:
+    """Per-process LRU"""
+
+    def __init__(self, maxsize=512):
+        self._cache = TTLCache(maxsize=maxsize)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, timeout=None):
+        self._cache.set(key, value, ttl=timeout)
+
+
+class RedisBackend:
+    """Shared between workers, so a fragment is rendered once per key"""
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError('FRAGMENT_CACHE_URL points at Redis but the redis package is not installed') from e
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(key)
+        return value.decode() if value is not None else None
+
+    def set(self, key, value, timeout=None):
+        self._client.set(key, str(value), ex=timeout)
+
+
+def _backend():
+    return current_app.extensions['fragment_cache']
+
+
+class FragmentCacheExtension(Extension):
+    """
+    {% cache 'name', key_part, ..., version %} ... {% endcache %}
+
+    Renders the body once per distinct key and serves the stored HTML
+    until it expires (FRAGMENT_CACHE_TIMEOUT seconds) or the key changes.
+    Anything the body computes is skipped on a hit.
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_render', [nodes.List(parts)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render(self, parts, caller):
+        key = 'fragment:' + ':'.join(str(part) for part in parts)
+        html = _backend().get(key)
+        if html is None:
+            html = caller()
+            _backend().set(key, str(html), timeout=current_app.config['FRAGMENT_CACHE_TIMEOUT'])
+        return Markup(html)
+
+
+def init_fragment_cache(app):
+    app.config.setdefault('FRAGMENT_CACHE_URL', None)
+    app.config.setdefault('FRAGMENT_CACHE_TIMEOUT', 60)
+
+    url = app.config['FRAGMENT_CACHE_URL']
+    if url and url.startswith(('redis://', 'rediss://')):
+        app.extensions['fragment_cache'] = RedisBackend(url)
+    else:
+        app.extensions['fragment_cache'] = LocalBackend()
+
+    app.jinja_env.add_extension(FragmentCacheExtension)
+
@@ -0,0 +1,92 @@
+import base64
+import binascii
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import joinedload
+
+from database import db
+from models import AvailabilityVote, Game, GroupMembership
+from services.scores import attach_scores
+
+PAGE_SIZE = 20
+
+
+def encode_cursor(game):
+    """Opaque cursor for the position just after `game` in history order"""
+    raw = f'{game.datetime.isoformat()}|{game.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Returns:
+        (datetime, game_id) tuple
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp, game_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(timestamp), int(game_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def load_history_page(user_id, cursor=None, limit=PAGE_SIZE):
+    """
+    One page of the games in a user's groups, newest first, keyset
+    paginated on (datetime, id). Groups are joined in, scores and
+    availability counts are loaded in bulk for the page.
+
+    Returns:
+        {'games': [Game], 'response_counts': {game_id: {'in', 'out', 'maybe'}},
+         'next_cursor': str or None}
+    """
+    group_ids = db.session.query(GroupMembership.group_id).filter(
+        GroupMembership.user_id == user_id
+    )
+
+    query = Game.query.options(
+        joinedload(Game.group)
+    ).filter(Game.group_id.in_(group_ids))
+
+    if cursor:
+        before_datetime, before_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            Game.datetime < before_datetime,
+            and_(Game.datetime == before_datetime, Game.id < before_id)
+        ))
+
+    # One extra row tells us whether another page exists
+    games = query.order_by(Game.datetime.desc(), Game.id.desc()).limit(limit + 1).all()
+    has_more = len(games) > limit
+    games = games[:limit]
+
+    attach_scores([game for game in games if game.status == 'finished'])
+
+    return {
+        'games': games,
+        'response_counts': _load_response_counts([game.id for game in games if game.status == 'upcoming']),
+        'next_cursor': encode_cursor(games[-1]) if has_more else None
+    }
+
+
+def _load_response_counts(game_ids):
+    counts = {game_id: {'in': 0, 'out': 0, 'maybe': 0} for game_id in game_ids}
+    if not game_ids:
+        return counts
+
+    rows = db.session.query(
+        AvailabilityVote.game_id,
+        AvailabilityVote.status,
+        func.count(AvailabilityVote.id)
+    ).filter(
+        AvailabilityVote.game_id.in_(game_ids)
+    ).group_by(AvailabilityVote.game_id, AvailabilityVote.status).all()
+
+    for game_id, status, count in rows:
+        if status in counts[game_id]:
+            counts[game_id][status] = count
+    return counts
@@ -0,0 +1,93 @@
+import logging
+import threading
+from datetime import datetime, timezone
+from itertools import groupby
+
+from sqlalchemy import select
+
+from database import db
+from models import Game, TeamAssignment
+from services.data_versions import bump_versions
+from services.match_stats import record_finished_game
+from services.sharding import use_shard
+
+logger = logging.getLogger(__name__)
+
+
+def expire_past_games(now=None):
+    """
+    Mark every upcoming game whose kick-off has passed as finished, across
+    all groups, with a single bulk UPDATE, then fold the ones that had
+    teams into the materialized stats. Commits and returns the number of
+    games updated.
+    """
+    now = now or datetime.now(timezone.utc)
+
+    expired = db.session.query(Game).filter(
+        Game.status == 'upcoming',
+        Game.datetime < now
+    )
+
+    try:
+        # Bulk updates skip the session events, so versions are bumped here
+        game_ids = [game_id for (game_id,) in expired.with_entities(Game.id)]
+        updated = expired.update({Game.status: 'finished'}, synchronize_session=False)
+        if game_ids:
+            bump_versions(db.session.connection(), game_ids=game_ids)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if game_ids:
+        _record_swept_games(game_ids)
+    return updated
+
+
+def _record_swept_games(game_ids):
+    """
+    Add finished games to the pair index, recent form and the ledger, as
+    ending a match does. Committed per group, on the group's shard when
+    sharded. Games without teams have nothing to record.
+    """
+    games = db.session.query(Game).filter(
+        Game.id.in_(game_ids),
+        Game.id.in_(select(TeamAssignment.game_id))
+    ).order_by(Game.group_id, Game.datetime, Game.id).all()
+
+    for group_id, group_games in groupby(games, key=lambda game: game.group_id):
+        with use_shard(group_id):
+            try:
+                for game in group_games:
+                    record_finished_game(game)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+
+def start_game_sweeper(app, interval):
+    """
+    Run expire_past_games() every `interval` seconds on a daemon thread,
+    so request handlers never have to write game statuses themselves.
+
+    Returns the thread's stop event.
+    """
+    stop = threading.Event()
+
+    def run():
+        while True:
+            with app.app_context():
+                try:
+                    updated = expire_past_games()
+                    if updated:
+                        logger.info('Marked %d past game(s) as finished', updated)
+                except Exception:
+                    logger.exception('Game status sweep failed')
+                finally:
+                    db.session.remove()
+            if stop.wait(interval):
+                return
+
+    threading.Thread(target=run, name='game-sweeper', daemon=True).start()
+    return stop
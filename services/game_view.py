@@ -0,0 +1,145 @@
+from collections import namedtuple
+
+from sqlalchemy.orm import joinedload
+
+from models import AvailabilityVote, GroupMembership, MatchEvent, POTMVote, TeamAssignment, User
+from services.scores import score_from_events
+from services.sql_instrumentation import query_budget
+
+# Votes, team assignments, events, POTM votes and unvoted members
+QUERY_BUDGET = 5
+
+POTMResult = namedtuple('POTMResult', ['display_name', 'votes'])
+
+
+class GameViewModel:
+    """
+    Everything games/view.html needs, loaded with at most QUERY_BUDGET
+    queries. Each table is read once and partitioned in Python; counts and
+    the score are derived from the same rows.
+    """
+
+    def __init__(self, game, membership, user):
+        self.game = game
+        self.membership = membership
+        self.user = user
+
+        self.user_vote = None
+        self.in_players = []
+        self.maybe_players = []
+        self.out_players = []
+        self.availability_counts = {'in': 0, 'out': 0, 'maybe': 0}
+
+        self.team_a_players = []
+        self.team_b_players = []
+        self.teams_formed = False
+
+        self.events = []
+        self.score = {'team_a': 0, 'team_b': 0}
+
+        self.user_potm_vote = None
+        self.potm_results = []
+        self.unvoted_members = []
+
+    @classmethod
+    def build(cls, game, membership, user):
+        view = cls(game, membership, user)
+        with query_budget(QUERY_BUDGET):
+            view._load_votes()
+            view._load_teams()
+            view._load_events()
+            view._load_potm()
+            view._load_unvoted_members()
+        return view
+
+    def _load_votes(self):
+        votes = AvailabilityVote.query.options(
+            joinedload(AvailabilityVote.user)
+        ).filter_by(game_id=self.game.id).order_by(AvailabilityVote.id).all()
+
+        players = {'in': self.in_players, 'maybe': self.maybe_players, 'out': self.out_players}
+        for vote in votes:
+            if vote.user_id == self.user.id:
+                self.user_vote = vote
+            if vote.status in players:
+                players[vote.status].append(vote.user)
+                self.availability_counts[vote.status] += 1
+
+        self._voted_user_ids = {vote.user_id for vote in votes}
+
+    def _load_teams(self):
+        assignments = TeamAssignment.query.options(
+            joinedload(TeamAssignment.user)
+        ).filter_by(game_id=self.game.id).order_by(TeamAssignment.id).all()
+
+        for assignment in assignments:
+            if assignment.team == 'A':
+                self.team_a_players.append(assignment.user)
+            elif assignment.team == 'B':
+                self.team_b_players.append(assignment.user)
+
+        self.teams_formed = len(assignments) > 0
+        self._teams = {assignment.user_id: assignment.team for assignment in assignments}
+
+    def _load_events(self):
+        self.events = MatchEvent.query.options(
+            joinedload(MatchEvent.scorer),
+            joinedload(MatchEvent.assist)
+        ).filter_by(game_id=self.game.id).order_by(MatchEvent.minute).all()
+
+        if self.teams_formed or self.game.status == 'finished':
+            score = score_from_events(
+                self._teams,
+                ((e.event_type, e.scorer_id, e.assist_id) for e in self.events)
+            )
+            self.score = {'team_a': score['A'], 'team_b': score['B']}
+
+    def _load_potm(self):
+        if not (self.teams_formed or self.game.status == 'finished'):
+            return
+
+        votes = POTMVote.query.options(
+            joinedload(POTMVote.voted_for)
+        ).filter_by(game_id=self.game.id).order_by(POTMVote.id).all()
+
+        tallies = {}
+        for vote in votes:
+            if vote.voter_id == self.user.id:
+                self.user_potm_vote = vote
+            if vote.voted_for_id not in tallies:
+                tallies[vote.voted_for_id] = [vote.voted_for.display_name, 0]
+            tallies[vote.voted_for_id][1] += 1
+
+        if self.game.status == 'finished':
+            self.potm_results = sorted(
+                (POTMResult(name, votes) for name, votes in tallies.values()),
+                key=lambda result: -result.votes
+            )
+
+    def _load_unvoted_members(self):
+        if not (self.membership.is_admin and self.game.status == 'upcoming'
+                and not self.game.is_poll_locked()):
+            return
+
+        members = User.query.join(GroupMembership).filter(
+            GroupMembership.group_id == self.game.group_id
+        ).all()
+        self.unvoted_members = [member for member in members if member.id not in self._voted_user_ids]
+
+    def template_context(self):
+        return {
+            'game': self.game,
+            'membership': self.membership,
+            'user_vote': self.user_vote,
+            'availability_counts': self.availability_counts,
+            'in_players': self.in_players,
+            'maybe_players': self.maybe_players,
+            'out_players': self.out_players,
+            'team_a_players': self.team_a_players,
+            'team_b_players': self.team_b_players,
+            'user_potm_vote': self.user_potm_vote,
+            'potm_results': self.potm_results,
+            'events': self.events,
+            'score': self.score,
+            'unvoted_members': self.unvoted_members
+        }
@@ -0,0 +1,97 @@
+from database import db, UTCDateTime
+from models import Game, MatchEvent, StatsAppliedGame, TeamAssignment
+from services.pair_stats import record_game_pairs, replace_game_pairs
+from services.recent_form import record_game_form, refresh_player_forms
+from datetime import datetime, timezone
+from sqlalchemy import delete, insert, literal, select
+
+
+def load_game_lines(game_id):
+    """
+    A game's (assignments, events): (user_id, team) and
+    (event_type, scorer_id, assist_id) tuples
+    """
+    assignments = db.session.query(
+        TeamAssignment.user_id, TeamAssignment.team
+    ).filter(TeamAssignment.game_id == game_id).order_by(TeamAssignment.id).all()
+    
+    events = db.session.query(
+        MatchEvent.event_type, MatchEvent.scorer_id, MatchEvent.assist_id
+    ).filter(MatchEvent.game_id == game_id).order_by(MatchEvent.id).all()
+    
+    return assignments, events
+
+
+def lines_before_edit(game):
+    """
+    Call before changing a game's teams or events: what update_finished_game
+    needs to take the game's old contribution out of the stats. None for
+    games that are not finished, which are not in the stats.
+    """
+    return load_game_lines(game.id) if game.status == 'finished' else None
+
+
+def record_finished_game(game):
+    """
+    Fold a finished game into every materialized stat (pair index, recent form).
+
+    Each game is counted once; later calls for the same game are ignored.
+    The caller commits.
+
+    Returns:
+        True if the game was recorded
+    """
+    if StatsAppliedGame.query.filter_by(game_id=game.id).first():
+        return False
+    
+    assignments, events = load_game_lines(game.id)
+    
+    db.session.add(StatsAppliedGame(game_id=game.id))
+    record_game_pairs(game, assignments, events)
+    record_game_form(game, assignments, events)
+    return True
+
+
+def update_finished_game(game, previous):
+    """
+    Bring the materialized stats up to date after a finished game's teams
+    or events were corrected. `previous` is what lines_before_edit()
+    returned before the change: the game's old contribution is taken out
+    and its current one added. A finished game that was never recorded
+    (e.g. finished by the sweeper) is recorded now. The caller commits.
+
+    Returns:
+        True if the stats changed
+    """
+    if previous is None:
+        return False
+    if not StatsAppliedGame.query.filter_by(game_id=game.id).first():
+        return record_finished_game(game)
+    
+    current = load_game_lines(game.id)
+    replace_game_pairs(game, previous, current)
+    # A corrected game may sit anywhere in a player's buffer: recompute the buffers of everyone in it
+    players = {user_id for user_id, _ in previous[0]} | {user_id for user_id, _ in current[0]}
+    refresh_player_forms(game.group_id, sorted(players))
+    return True
+
+
+def replace_applied_games(group_id, last_game_id):
+    """
+    Reset a group's ledger after a rebuild to the finished games it streamed,
+    i.e. those with an id up to last_game_id. The caller commits.
+    """
+    group_game_ids = select(Game.id).where(Game.group_id == group_id)
+    db.session.execute(delete(StatsAppliedGame).where(StatsAppliedGame.game_id.in_(group_game_ids)))
+    
+    if last_game_id is None:
+        return
+    
+    db.session.execute(insert(StatsAppliedGame).from_select(
+        ['game_id', 'applied_at'],
+        select(Game.id, literal(datetime.now(timezone.utc), UTCDateTime)).where(
+            Game.group_id == group_id,
+            Game.status == 'finished',
+            Game.id <= last_game_id
+        )
+    ))
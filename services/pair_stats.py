@@ -0,0 +1,222 @@
+from database import db
+from models import PlayerPairStat, User
+from services.scores import score_from_events
+from datetime import datetime, timezone
+from collections import defaultdict
+
+PAIR_FIELDS = [
+    'games_together', 'wins_together', 'goals_together', 'assists_together', 'assists_to',
+    'games_against', 'wins_against', 'losses_against'
+]
+
+
+def compute_game_pair_deltas(assignments, events):
+    """
+    Work out what one finished game adds to every ordered pair of players.
+
+    Args:
+        assignments: Iterable of (user_id, team) tuples for the game
+        events: Iterable of (event_type, scorer_id, assist_id) tuples for the game
+
+    Returns:
+        Dict mapping (player_id, other_player_id) to a dict of counter deltas
+    """
+    teams = dict(assignments)
+    score = score_from_events(teams, events)
+    goals = defaultdict(int)
+    assists = defaultdict(int)
+    links = defaultdict(int)
+    
+    for event_type, scorer_id, assist_id in events:
+        if event_type == 'goal':
+            goals[scorer_id] += 1
+            if assist_id:
+                links[(assist_id, scorer_id)] += 1
+        if assist_id:
+            assists[assist_id] += 1
+    
+    deltas = {}
+    for player_id, team in teams.items():
+        other_team = 'B' if team == 'A' else 'A'
+        won = score[team] > score[other_team]
+        lost = score[team] < score[other_team]
+        
+        for other_player_id, other_team_of_pair in teams.items():
+            if other_player_id == player_id:
+                continue
+            
+            delta = dict.fromkeys(PAIR_FIELDS, 0)
+            if other_team_of_pair == team:
+                delta['games_together'] = 1
+                delta['wins_together'] = int(won)
+                delta['goals_together'] = goals[player_id] + goals[other_player_id]
+                delta['assists_together'] = assists[player_id] + assists[other_player_id]
+                delta['assists_to'] = links[(player_id, other_player_id)]
+            else:
+                delta['games_against'] = 1
+                delta['wins_against'] = int(won)
+                delta['losses_against'] = int(lost)
+            deltas[(player_id, other_player_id)] = delta
+    
+    return deltas
+
+
+def apply_pair_deltas(group_id, deltas, played_at=None):
+    """Add counter deltas to the stored pair rows, creating missing rows"""
+    if not deltas:
+        return
+    
+    player_ids = {player_id for player_id, _ in deltas}
+    existing = {
+        (row.player_id, row.other_player_id): row
+        for row in PlayerPairStat.query.filter(
+            PlayerPairStat.group_id == group_id,
+            PlayerPairStat.player_id.in_(player_ids),
+            PlayerPairStat.other_player_id.in_(player_ids)
+        )
+    }
+    
+    now = datetime.now(timezone.utc)
+    for (player_id, other_player_id), delta in deltas.items():
+        row = existing.get((player_id, other_player_id))
+        if not row:
+            row = PlayerPairStat(
+                group_id=group_id,
+                player_id=player_id,
+                other_player_id=other_player_id,
+                **dict.fromkeys(PAIR_FIELDS, 0)
+            )
+            db.session.add(row)
+        
+        for field, value in delta.items():
+            setattr(row, field, getattr(row, field) + value)
+        if played_at and (not row.last_played_at or played_at > row.last_played_at):
+            row.last_played_at = played_at
+        row.updated_at = now
+
+
+def record_game_pairs(game, assignments, events):
+    """Fold a finished game into the pair statistics index. The caller commits."""
+    apply_pair_deltas(game.group_id, compute_game_pair_deltas(assignments, events), game.datetime)
+
+
+def replace_game_pairs(game, previous, current):
+    """
+    Swap a recorded game's contribution to the pair index from `previous`
+    to `current`, each an (assignments, events) tuple. The caller commits.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(PAIR_FIELDS, 0))
+    for sign, (assignments, events) in ((-1, previous), (1, current)):
+        for pair, delta in compute_game_pair_deltas(assignments, events).items():
+            for field, value in delta.items():
+                deltas[pair][field] += sign * value
+    apply_pair_deltas(game.group_id, deltas, game.datetime)
+
+
+def get_pair_stats(group_id, player_ids):
+    """
+    Load stored pair statistics among a set of players with one query.
+
+    Returns:
+        Dict mapping (player_id, other_player_id) to PlayerPairStat
+    """
+    player_ids = list(player_ids)
+    if not player_ids:
+        return {}
+    
+    rows = PlayerPairStat.query.filter(
+        PlayerPairStat.group_id == group_id,
+        PlayerPairStat.player_id.in_(player_ids),
+        PlayerPairStat.other_player_id.in_(player_ids)
+    ).all()
+    
+    return {(row.player_id, row.other_player_id): row for row in rows}
+
+
+def get_player_partnerships(group_id, user_id):
+    """Partnership and head-to-head summary for one player in a group"""
+    rows = db.session.query(PlayerPairStat, User.display_name).join(
+        User, User.id == PlayerPairStat.other_player_id
+    ).filter(
+        PlayerPairStat.group_id == group_id,
+        PlayerPairStat.player_id == user_id
+    ).all()
+    
+    pairs = []
+    for row, display_name in rows:
+        pair = row.to_dict()
+        pair['other_player_name'] = display_name
+        pair['win_rate_together'] = round(row.wins_together / row.games_together, 3) if row.games_together else 0.0
+        pairs.append(pair)
+    
+    with_partners = [pair for pair in pairs if pair['games_together'] > 0]
+    with_assists = [pair for pair in pairs if pair['assists_to'] > 0]
+    
+    best_partner = max(
+        with_partners,
+        key=lambda pair: (pair['win_rate_together'], pair['games_together']),
+        default=None
+    )
+    most_assists_to = max(with_assists, key=lambda pair: pair['assists_to'], default=None)
+    
+    records_against = sorted(
+        [pair for pair in pairs if pair['games_against'] > 0],
+        key=lambda pair: pair['games_against'],
+        reverse=True
+    )
+    
+    return {
+        'best_partner': best_partner,
+        'most_assists_to': most_assists_to,
+        'records_against': records_against,
+        'pairs': pairs
+    }
+
+
+class PairStatsRebuilder:
+    """
+    Recompute the pair statistics index for one group from scratch.
+
+    Games are fed in with add_game(); only the per-pair totals are kept in
+    memory, so memory use is bounded by the square of the group's roster
+    rather than by the length of its history.
+    """
+    
+    name = 'pair stats'
+    
+    def __init__(self, group_id):
+        self.group_id = group_id
+        self.totals = defaultdict(lambda: dict.fromkeys(PAIR_FIELDS, 0))
+        self.last_played_at = {}
+    
+    def add_game(self, game, assignments, events):
+        deltas = compute_game_pair_deltas(assignments, events)
+        for pair, delta in deltas.items():
+            totals = self.totals[pair]
+            for field, value in delta.items():
+                totals[field] += value
+            self.last_played_at[pair] = game.datetime
+    
+    def write(self, connection=None):
+        """Replace the group's stored pair rows in bulk, through `connection` or the session. The caller commits."""
+        from sqlalchemy import delete, insert
+        
+        execute = (connection or db.session).execute
+        execute(delete(PlayerPairStat).where(PlayerPairStat.group_id == self.group_id))
+        
+        now = datetime.now(timezone.utc)
+        pair_rows = [
+            dict(
+                totals,
+                group_id=self.group_id,
+                player_id=player_id,
+                other_player_id=other_player_id,
+                last_played_at=self.last_played_at.get((player_id, other_player_id)),
+                updated_at=now
+            )
+            for (player_id, other_player_id), totals in self.totals.items()
+        ]
+        if pair_rows:
+            execute(insert(PlayerPairStat), pair_rows)
+        
+        return len(pair_rows)
@@ -0,0 +1,225 @@
+from database import db
+from models import Game, Group, GroupMembership, MatchEvent, POTMVote, TeamAssignment
+from services.cache import TTLCache
+from sqlalchemy import and_, case, event, func, inspect, or_, select
+from sqlalchemy.orm import Session, aliased
+
+# Per-user profile stats, keyed by user ID
+_stats_cache = TTLCache(maxsize=2048, ttl=300)
+
+STAT_FIELDS = [
+    'games_played', 'wins', 'draws', 'losses',
+    'goals', 'assists', 'own_goals', 'potm_awards'
+]
+
+
+def get_user_stats(user_id):
+    """
+    Get a user's match statistics for each of their groups plus the totals.
+
+    Results are cached per user and invalidated whenever a write touches
+    that user's events, team assignments, POTM votes or groups.
+
+    Returns:
+        {'groups': [per-group stats dicts], 'totals': totals dict}
+    """
+    stats = _stats_cache.get(user_id)
+    if stats is None:
+        stats = _load_user_stats(user_id)
+        _stats_cache.set(user_id, stats)
+    return stats
+
+
+def invalidate_user_stats(*user_ids):
+    """Drop cached stats for the given users"""
+    _stats_cache.delete(*user_ids)
+
+
+def _load_user_stats(user_id):
+    """Compute per-group stats for one user with a single aggregate query"""
+    user_team = aliased(TeamAssignment)
+    scorer_team = aliased(TeamAssignment)
+    
+    # The user's games, each with the user's team and the goal difference
+    # from Team A's point of view; goals by unassigned scorers don't count
+    user_games = select(
+        user_team.game_id,
+        user_team.team,
+        func.sum(case(
+            (and_(MatchEvent.event_type == 'goal', scorer_team.team == 'A'), 1),
+            (and_(MatchEvent.event_type == 'own_goal', scorer_team.team == 'B'), 1),
+            (scorer_team.team.is_(None), 0),
+            else_=-1
+        )).label('diff')
+    ).select_from(user_team).outerjoin(
+        MatchEvent,
+        (MatchEvent.game_id == user_team.game_id) &
+        MatchEvent.event_type.in_(['goal', 'own_goal'])
+    ).outerjoin(
+        scorer_team,
+        (MatchEvent.scorer_id == scorer_team.user_id) &
+        (MatchEvent.game_id == scorer_team.game_id)
+    ).where(
+        user_team.user_id == user_id
+    ).group_by(user_team.game_id, user_team.team).subquery()
+    
+    user_diff = case((user_games.c.team == 'A', user_games.c.diff), else_=-user_games.c.diff)
+    
+    results = select(
+        Game.group_id,
+        func.count().label('games_played'),
+        func.sum(case((user_diff > 0, 1), else_=0)).label('wins'),
+        func.sum(case((user_diff == 0, 1), else_=0)).label('draws'),
+        func.sum(case((user_diff < 0, 1), else_=0)).label('losses')
+    ).select_from(user_games).join(
+        Game, Game.id == user_games.c.game_id
+    ).where(
+        Game.status == 'finished'
+    ).group_by(Game.group_id).subquery()
+    
+    contributions = select(
+        Game.group_id,
+        func.sum(case(
+            (and_(MatchEvent.scorer_id == user_id, MatchEvent.event_type == 'goal'), 1),
+            else_=0
+        )).label('goals'),
+        func.sum(case((MatchEvent.assist_id == user_id, 1), else_=0)).label('assists'),
+        func.sum(case(
+            (and_(MatchEvent.scorer_id == user_id, MatchEvent.event_type == 'own_goal'), 1),
+            else_=0
+        )).label('own_goals')
+    ).select_from(MatchEvent).join(
+        Game, Game.id == MatchEvent.game_id
+    ).where(
+        or_(MatchEvent.scorer_id == user_id, MatchEvent.assist_id == user_id)
+    ).group_by(Game.group_id).subquery()
+    
+    potm = select(
+        Game.group_id,
+        func.count(POTMVote.id).label('potm_awards')
+    ).select_from(POTMVote).join(
+        Game, Game.id == POTMVote.game_id
+    ).where(
+        POTMVote.voted_for_id == user_id
+    ).group_by(Game.group_id).subquery()
+    
+    user_group_ids = select(GroupMembership.group_id).where(
+        GroupMembership.user_id == user_id
+    )
+    member_counts = select(
+        GroupMembership.group_id,
+        func.count().label('member_count')
+    ).where(
+        GroupMembership.group_id.in_(user_group_ids)
+    ).group_by(GroupMembership.group_id).subquery()
+    
+    query = select(
+        GroupMembership.id,
+        Group.id,
+        Group.name,
+        Group.emoji,
+        GroupMembership.is_admin,
+        member_counts.c.member_count,
+        func.coalesce(results.c.games_played, 0),
+        func.coalesce(results.c.wins, 0),
+        func.coalesce(results.c.draws, 0),
+        func.coalesce(results.c.losses, 0),
+        func.coalesce(contributions.c.goals, 0),
+        func.coalesce(contributions.c.assists, 0),
+        func.coalesce(contributions.c.own_goals, 0),
+        func.coalesce(potm.c.potm_awards, 0)
+    ).select_from(GroupMembership).join(
+        Group, Group.id == GroupMembership.group_id
+    ).join(
+        member_counts, member_counts.c.group_id == Group.id
+    ).outerjoin(
+        results, results.c.group_id == Group.id
+    ).outerjoin(
+        contributions, contributions.c.group_id == Group.id
+    ).outerjoin(
+        potm, potm.c.group_id == Group.id
+    ).where(
+        GroupMembership.user_id == user_id
+    )
+    
+    groups = []
+    totals = {field: 0 for field in STAT_FIELDS}
+    
+    # Sorted here: ORDER BY membership id makes SQLite scan every membership for it
+    for row in sorted(db.session.execute(query), key=lambda row: row[0]):
+        group_id, name, emoji, is_admin, member_count = row[1:6]
+        group_stats = {
+            'id': group_id,
+            'name': name,
+            'emoji': emoji,
+            'is_admin': bool(is_admin),
+            'member_count': member_count
+        }
+        for field, value in zip(STAT_FIELDS, row[6:]):
+            group_stats[field] = int(value)
+            totals[field] += int(value)
+        groups.append(group_stats)
+    
+    return {'groups': groups, 'totals': totals}
+
+
+def _attribute_values(obj, attr):
+    """Current and previous (pre-flush) values of an attribute"""
+    history = inspect(obj).attrs[attr].history
+    values = set(history.added) | set(history.unchanged) | set(history.deleted)
+    values.add(getattr(obj, attr))
+    return {value for value in values if value is not None}
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_stats_invalidations(session, flush_context):
+    """Work out which users' cached stats a flush made stale"""
+    user_ids = set()
+    game_ids = set()
+    group_ids = set()
+    
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, MatchEvent):
+            # A goal moves the score, so everyone in the game is affected
+            game_ids |= _attribute_values(obj, 'game_id')
+            user_ids |= _attribute_values(obj, 'scorer_id')
+            user_ids |= _attribute_values(obj, 'assist_id')
+        elif isinstance(obj, TeamAssignment):
+            game_ids |= _attribute_values(obj, 'game_id')
+            user_ids |= _attribute_values(obj, 'user_id')
+        elif isinstance(obj, POTMVote):
+            user_ids |= _attribute_values(obj, 'voted_for_id')
+        elif isinstance(obj, Game):
+            if inspect(obj).attrs.status.history.has_changes():
+                game_ids.add(obj.id)
+        elif isinstance(obj, GroupMembership):
+            # Member counts change for everyone in the group
+            group_ids |= _attribute_values(obj, 'group_id')
+            user_ids |= _attribute_values(obj, 'user_id')
+    
+    if not (user_ids or game_ids or group_ids):
+        return
+    
+    connection = session.connection()
+    if game_ids:
+        user_ids.update(connection.execute(
+            select(TeamAssignment.user_id).where(TeamAssignment.game_id.in_(game_ids))
+        ).scalars())
+    if group_ids:
+        user_ids.update(connection.execute(
+            select(GroupMembership.user_id).where(GroupMembership.group_id.in_(group_ids))
+        ).scalars())
+    
+    session.info.setdefault('stale_user_stats', set()).update(user_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_stats_invalidations(session):
+    user_ids = session.info.pop('stale_user_stats', None)
+    if user_ids:
+        invalidate_user_stats(*user_ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_stats_invalidations(session, previous_transaction):
+    session.info.pop('stale_user_stats', None)
@@ -0,0 +1,213 @@
+from database import db
+from models import Game, MatchEvent, PlayerForm, StatsAppliedGame, TeamAssignment
+from services.scores import score_from_events
+from collections import defaultdict
+from datetime import datetime, timezone
+from sqlalchemy import and_, delete, func, insert, or_, select
+
+
+def compute_player_results(assignments, events):
+    """
+    Per-player line for one finished game.
+
+    Args:
+        assignments: Iterable of (user_id, team) tuples for the game
+        events: Iterable of (event_type, scorer_id, assist_id) tuples for the game
+
+    Returns:
+        Dict mapping user ID to (goals, assists, result) where result is
+        1 for a win, 0 for a draw and -1 for a loss
+    """
+    teams = dict(assignments)
+    score = score_from_events(teams, events)
+    goals = defaultdict(int)
+    assists = defaultdict(int)
+    
+    for event_type, scorer_id, assist_id in events:
+        if event_type == 'goal':
+            goals[scorer_id] += 1
+        if assist_id:
+            assists[assist_id] += 1
+    
+    results = {}
+    for user_id, team in teams.items():
+        other_team = 'B' if team == 'A' else 'A'
+        if score[team] > score[other_team]:
+            result = 1
+        elif score[team] < score[other_team]:
+            result = -1
+        else:
+            result = 0
+        results[user_id] = (goals[user_id], assists[user_id], result)
+    
+    return results
+
+
+def record_game_form(game, assignments, events):
+    """
+    Push a finished game onto each player's recent-form buffer. The game
+    must already be in the StatsAppliedGame ledger. The caller commits.
+    """
+    results = compute_player_results(assignments, events)
+    if not results:
+        return
+    
+    # A game finished after a later-dated one (e.g. ended late) does not go on
+    # top: recompute the buffers in (datetime, id) order as the rebuild does
+    later_game = db.session.query(Game.id).join(
+        StatsAppliedGame, StatsAppliedGame.game_id == Game.id
+    ).join(TeamAssignment, TeamAssignment.game_id == Game.id).filter(
+        Game.group_id == game.group_id,
+        Game.status == 'finished',
+        TeamAssignment.user_id.in_(results.keys()),
+        or_(Game.datetime > game.datetime, and_(Game.datetime == game.datetime, Game.id > game.id))
+    ).first()
+    if later_game:
+        refresh_player_forms(game.group_id, sorted(results))
+        return
+    
+    forms = {
+        form.user_id: form
+        for form in PlayerForm.query.filter(
+            PlayerForm.group_id == game.group_id,
+            PlayerForm.user_id.in_(results.keys())
+        )
+    }
+    
+    for user_id, (goals, assists, result) in results.items():
+        form = forms.get(user_id)
+        if not form:
+            form = PlayerForm(user_id=user_id, group_id=game.group_id, results=b'')
+            db.session.add(form)
+        form.push(goals, assists, result)
+
+
+def refresh_player_forms(group_id, player_ids):
+    """
+    Recompute some players' buffers from their last WINDOW recorded games
+    in the group, newest first as `flask stats rebuild` orders them, e.g.
+    after a finished game's teams or events were corrected. The caller
+    commits.
+    """
+    player_ids = list(player_ids)
+    if not player_ids:
+        return
+    
+    # Each player's recorded games, numbered from the newest
+    ranked = select(
+        TeamAssignment.user_id,
+        TeamAssignment.game_id,
+        func.row_number().over(
+            partition_by=TeamAssignment.user_id,
+            order_by=(Game.datetime.desc(), Game.id.desc())
+        ).label('position')
+    ).join(Game, Game.id == TeamAssignment.game_id).join(
+        StatsAppliedGame, StatsAppliedGame.game_id == Game.id
+    ).where(
+        Game.group_id == group_id,
+        Game.status == 'finished',
+        TeamAssignment.user_id.in_(player_ids)
+    ).subquery()
+    recent = db.session.execute(
+        select(ranked.c.user_id, ranked.c.game_id).where(
+            ranked.c.position <= PlayerForm.WINDOW
+        ).order_by(ranked.c.user_id, ranked.c.position)
+    ).all()
+    
+    game_ids = {game_id for _, game_id in recent}
+    assignments = defaultdict(list)
+    events = defaultdict(list)
+    if game_ids:
+        for game_id, user_id, team in db.session.query(
+            TeamAssignment.game_id, TeamAssignment.user_id, TeamAssignment.team
+        ).filter(TeamAssignment.game_id.in_(game_ids)):
+            assignments[game_id].append((user_id, team))
+        for game_id, event_type, scorer_id, assist_id in db.session.query(
+            MatchEvent.game_id, MatchEvent.event_type, MatchEvent.scorer_id, MatchEvent.assist_id
+        ).filter(MatchEvent.game_id.in_(game_ids)):
+            events[game_id].append((event_type, scorer_id, assist_id))
+    results = {game_id: compute_player_results(assignments[game_id], events[game_id]) for game_id in game_ids}
+    
+    entries = defaultdict(list)
+    for user_id, game_id in recent:
+        entries[user_id].append(results[game_id][user_id])
+    
+    forms = {
+        form.user_id: form
+        for form in PlayerForm.query.filter(
+            PlayerForm.group_id == group_id,
+            PlayerForm.user_id.in_(player_ids)
+        )
+    }
+    now = datetime.now(timezone.utc)
+    for user_id in player_ids:
+        form = forms.get(user_id)
+        if not form:
+            if not entries[user_id]:
+                continue
+            form = PlayerForm(user_id=user_id, group_id=group_id)
+            db.session.add(form)
+        form.results = PlayerForm.pack(entries[user_id])
+        form.updated_at = now
+
+
+def get_recent_form(group_id, player_ids, n=PlayerForm.WINDOW):
+    """
+    Load the last n results for several players with one query.
+
+    Returns:
+        Dict mapping user ID to a list of (goals, assists, result) tuples,
+        newest first; players without history map to an empty list
+    """
+    player_ids = list(player_ids)
+    recent_form = {player_id: [] for player_id in player_ids}
+    if not player_ids:
+        return recent_form
+    
+    for form in PlayerForm.query.filter(
+        PlayerForm.group_id == group_id,
+        PlayerForm.user_id.in_(player_ids)
+    ):
+        recent_form[form.user_id] = form.get_recent(n)
+    
+    return recent_form
+
+
+class RecentFormRebuilder:
+    """Recompute every player's recent-form buffer in one group"""
+    
+    name = 'recent form'
+    
+    def __init__(self, group_id):
+        self.group_id = group_id
+        # Per player, at most WINDOW ((datetime, game_id), entry) pairs
+        self.entries = defaultdict(list)
+    
+    def add_game(self, game, assignments, events):
+        sort_key = (game.datetime, game.id)
+        for user_id, entry in compute_player_results(assignments, events).items():
+            entries = self.entries[user_id]
+            entries.append((sort_key, entry))
+            if len(entries) > PlayerForm.WINDOW:
+                entries.sort(key=lambda item: item[0], reverse=True)
+                del entries[PlayerForm.WINDOW:]
+    
+    def write(self, connection=None):
+        """Replace the group's stored buffers in bulk, through `connection` or the session. The caller commits."""
+        execute = (connection or db.session).execute
+        execute(delete(PlayerForm).where(PlayerForm.group_id == self.group_id))
+        
+        now = datetime.now(timezone.utc)
+        rows = []
+        for user_id, entries in self.entries.items():
+            entries.sort(key=lambda item: item[0], reverse=True)
+            rows.append({
+                'user_id': user_id,
+                'group_id': self.group_id,
+                'results': PlayerForm.pack([entry for _, entry in entries]),
+                'updated_at': now
+            })
+        if rows:
+            execute(insert(PlayerForm), rows)
+        
+        return len(rows)
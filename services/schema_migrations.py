@@ -0,0 +1,455 @@
+"""
+Versioned schema migrations.
+
+Migrations are numbered files in migrations/ (`NNNN_name.py`) applied in
+order and recorded in the `schema_version` table. Each defines
+
+    upgrade(op)       schema changes through `Operations`, run in one
+                      transaction together with its version row
+    backfill(batches) data changes through `Backfill`, run after the
+                      schema change in short batched transactions
+
+and may leave out either one.
+
+Backfills are tracked separately (`schema_version.backfilled_at`), so an
+interrupted backfill is resumed by the next run; their statements must
+skip rows that are already done.
+
+A sharded database (see services.sharding) runs every migration once per
+file, each run limited to the tables that file holds.
+"""
+
+import importlib.util
+import os
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from sqlalchemy import (CheckConstraint, Column, ForeignKeyConstraint, MetaData, Table,
+                        UniqueConstraint, event, inspect, text)
+from sqlalchemy.schema import CreateColumn, CreateTable
+
+MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def discover_migrations(directory):
+    """Migration files as (version, name, path), in version order"""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    return sorted(migrations)
+
+
+def load_migration(version, path):
+    spec = importlib.util.spec_from_file_location(f'migrations.m{version:04d}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def ensure_version_table(connection):
+    connection.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_version ('
+        'version INTEGER PRIMARY KEY, name VARCHAR(200) NOT NULL, applied_at VARCHAR(40) NOT NULL, '
+        'backfilled_at VARCHAR(40))'
+    ))
+    columns = {column['name'] for column in inspect(connection).get_columns('schema_version')}
+    if 'backfilled_at' not in columns:
+        # Tables from before backfills were tracked: everything recorded is done
+        connection.execute(text('ALTER TABLE schema_version ADD COLUMN backfilled_at VARCHAR(40)'))
+        connection.execute(text('UPDATE schema_version SET backfilled_at = applied_at'))
+
+
+def applied_versions(connection):
+    """{version: backfilled_at} for every recorded migration"""
+    ensure_version_table(connection)
+    return dict(connection.execute(text('SELECT version, backfilled_at FROM schema_version')).all())
+
+
+def record_version(connection, version, name, backfilled=True):
+    now = datetime.now(timezone.utc).isoformat()
+    connection.execute(
+        text('INSERT INTO schema_version (version, name, applied_at, backfilled_at) '
+             'VALUES (:version, :name, :applied_at, :backfilled_at)'),
+        {'version': version, 'name': name, 'applied_at': now, 'backfilled_at': now if backfilled else None}
+    )
+
+
+def record_backfilled(connection, version):
+    connection.execute(
+        text('UPDATE schema_version SET backfilled_at = :now WHERE version = :version'),
+        {'now': datetime.now(timezone.utc).isoformat(), 'version': version}
+    )
+
+
+def _default_sql(server_default):
+    """A server default as an SQL expression"""
+    if server_default is None:
+        return None
+    if isinstance(server_default.arg, str):
+        return "'" + server_default.arg.replace("'", "''") + "'"
+    return server_default.arg.text
+
+
+class Operations:
+    """
+    Schema changes for one migration. Every change is skipped when the
+    schema already has it, or when `tables` is given and the table is not
+    in it. On SQLite, changes ALTER TABLE cannot make are done by
+    rebuilding the table: create a copy with the new definition, copy the
+    rows, drop the old table and rename the copy.
+    """
+
+    def __init__(self, connection, tables=None):
+        self.connection = connection
+        self.dialect = connection.dialect
+        self.is_sqlite = connection.dialect.name == 'sqlite'
+        self.tables = tables
+
+    def in_scope(self, table):
+        return self.tables is None or table in self.tables
+
+    def quote(self, name):
+        return self.dialect.identifier_preparer.quote(name)
+
+    def execute(self, sql, params=None):
+        return self.connection.execute(text(sql), params or {})
+
+    def _inspector(self):
+        # Fresh each time; cached reflection goes stale after our own changes
+        return inspect(self.connection)
+
+    def has_table(self, table):
+        return self._inspector().has_table(table)
+
+    def has_column(self, table, column):
+        return column in {c['name'] for c in self._inspector().get_columns(table)}
+
+    def has_index(self, table, name):
+        return name in {index['name'] for index in self._inspector().get_indexes(table)}
+
+    def create_table(self, table):
+        """Create a `Table` with its indexes"""
+        if self.in_scope(table.name) and not self.has_table(table.name):
+            table.create(self.connection)
+
+    def create_index(self, name, table, columns, unique=False):
+        if not self.in_scope(table):
+            return
+        self.execute(
+            f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS {self.quote(name)} '
+            f'ON {self.quote(table)} ({", ".join(self.quote(column) for column in columns)})'
+        )
+
+    def drop_index(self, name):
+        self.execute(f'DROP INDEX IF EXISTS {self.quote(name)}')
+
+    def add_column(self, table, column):
+        """Add a `Column`; existing rows get its server_default"""
+        if not self.in_scope(table) or self.has_column(table, column.name):
+            return
+
+        needs_rebuild = column.primary_key or column.unique or (
+            not column.nullable and column.server_default is None
+        )
+        if self.is_sqlite and needs_rebuild:
+            self.rebuild_table(table, add=[column])
+        else:
+            ddl = CreateColumn(column).compile(dialect=self.dialect)
+            self.execute(f'ALTER TABLE {self.quote(table)} ADD COLUMN {ddl}')
+
+    def drop_column(self, table, column):
+        if not self.in_scope(table) or not self.has_column(table, column):
+            return
+
+        if self.is_sqlite:
+            self.rebuild_table(table, drop=[column])
+        else:
+            self.execute(f'ALTER TABLE {self.quote(table)} DROP COLUMN {self.quote(column)}')
+
+    def alter_column(self, table, column, type_=None, nullable=None, server_default=None):
+        """
+        Change a column's type, nullability or server default (an SQL
+        expression). With nullable=False and a server_default, existing
+        NULLs get the default.
+        """
+        if not self.in_scope(table):
+            return
+        if self.is_sqlite:
+            self.rebuild_table(table, alter={column: dict(type_=type_, nullable=nullable, server_default=server_default)})
+            return
+
+        target = f'ALTER TABLE {self.quote(table)} ALTER COLUMN {self.quote(column)}'
+        if type_ is not None:
+            self.execute(f'{target} TYPE {type_.compile(dialect=self.dialect)}')
+        if server_default is not None:
+            self.execute(f'{target} SET DEFAULT {server_default}')
+            if nullable is False:
+                self.execute(f'UPDATE {self.quote(table)} SET {self.quote(column)} = {server_default} '
+                             f'WHERE {self.quote(column)} IS NULL')
+        if nullable is not None:
+            self.execute(f'{target} {"DROP" if nullable else "SET"} NOT NULL')
+
+    def rebuild_table(self, table, add=(), drop=(), alter=None):
+        """
+        SQLite's procedure for schema changes ALTER TABLE cannot make. The
+        runner turns foreign key enforcement off around the migration and
+        runs PRAGMA foreign_key_check before committing.
+        """
+        alter = alter or {}
+        metadata = MetaData()
+        # Also reflects the tables it references, for the foreign keys below
+        old = Table(table, metadata, autoload_with=self.connection)
+        new_name = f'_new_{table}'
+
+        columns, sources = [], []
+        for column in old.columns:
+            if column.name in drop:
+                continue
+            changes = alter.get(column.name, {})
+            default = changes.get('server_default') or _default_sql(column.server_default)
+            nullable = column.nullable if changes.get('nullable') is None else changes['nullable']
+            columns.append(Column(
+                column.name,
+                changes.get('type_') or column.type,
+                primary_key=column.primary_key,
+                nullable=nullable,
+                server_default=text(default) if default is not None else None,
+            ))
+            source = self.quote(column.name)
+            if not nullable and default is not None:
+                source = f'COALESCE({source}, {default})'
+            sources.append((column.name, source))
+        for column in add:
+            columns.append(column)
+            if column.server_default is not None:
+                sources.append((column.name, _default_sql(column.server_default)))
+
+        kept = {column.name for column in columns}
+        constraints = []
+        for constraint in old.constraints:
+            if isinstance(constraint, ForeignKeyConstraint):
+                if set(constraint.column_keys) <= kept:
+                    constraints.append(ForeignKeyConstraint(
+                        constraint.column_keys,
+                        [element.target_fullname for element in constraint.elements],
+                        name=constraint.name
+                    ))
+            elif isinstance(constraint, UniqueConstraint):
+                names = [column.name for column in constraint.columns]
+                if set(names) <= kept:
+                    constraints.append(UniqueConstraint(*names, name=constraint.name))
+            elif isinstance(constraint, CheckConstraint):
+                constraints.append(CheckConstraint(constraint.sqltext.text, name=constraint.name))
+        indexes = [
+            (index.name, [column.name for column in index.columns], index.unique)
+            for index in old.indexes
+            if index.columns and {column.name for column in index.columns} <= kept
+        ]
+
+        rebuilt = Table(new_name, metadata, *columns, *constraints)
+        self.connection.execute(CreateTable(rebuilt))
+        self.execute(
+            f'INSERT INTO {self.quote(new_name)} ({", ".join(self.quote(name) for name, _ in sources)}) '
+            f'SELECT {", ".join(source for _, source in sources)} FROM {self.quote(table)}'
+        )
+        self.execute(f'DROP TABLE {self.quote(table)}')
+        self.execute(f'ALTER TABLE {self.quote(new_name)} RENAME TO {self.quote(table)}')
+        for name, index_columns, unique in indexes:
+            self.create_index(name, table, index_columns, unique=unique)
+
+
+class Backfill:
+    """
+    Runs data changes over a table in primary key ranges, one short
+    transaction per batch, so the app keeps writing between batches.
+    Statements select their rows with `:start` and `:end`:
+    `WHERE id > :start AND id <= :end`.
+
+    In a dry run every statement runs once, for the first batch, on the
+    migration's (rolled back) connection. With `tables`, runs over other
+    tables are skipped.
+    """
+
+    def __init__(self, engine, batch_size=DEFAULT_BATCH_SIZE, pause=0.0, echo=print, dry_run_connection=None,
+                 tables=None):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.pause = pause
+        self.echo = echo
+        self.dry_run_connection = dry_run_connection
+        self.tables = tables
+
+    def _batches(self, connection, table, key):
+        """(start, end) key ranges of at most batch_size rows"""
+        quoted_table = connection.dialect.identifier_preparer.quote(table)
+        start = connection.execute(text(f'SELECT MIN({key}) - 1 FROM {quoted_table}')).scalar()
+        while start is not None:
+            end = connection.execute(
+                text(f'SELECT {key} FROM {quoted_table} WHERE {key} > :start ORDER BY {key} '
+                     f'LIMIT 1 OFFSET :offset'),
+                {'start': start, 'offset': self.batch_size - 1}
+            ).scalar()
+            if end is None:
+                end = connection.execute(
+                    text(f'SELECT MAX({key}) FROM {quoted_table} WHERE {key} > :start'), {'start': start}
+                ).scalar()
+                if end is None:
+                    return
+            yield start, end
+            start = end
+
+    def run(self, table, *statements, key='id', params=None):
+        if self.tables is not None and table not in self.tables:
+            return
+        params = params or {}
+        if self.dry_run_connection is not None:
+            connection = self.dry_run_connection
+            batch = next(self._batches(connection, table, key), None)
+            total = connection.execute(
+                text(f'SELECT COUNT(*) FROM {connection.dialect.identifier_preparer.quote(table)}')
+            ).scalar()
+            if batch is not None:
+                for statement in statements:
+                    result = connection.execute(text(statement), dict(params, start=batch[0], end=batch[1]))
+                    self.echo(f'  first batch: {max(result.rowcount, 0)} row(s) changed')
+            self.echo(f'  backfill over {total} {table} row(s) in batches of {self.batch_size}')
+            return
+
+        changed = batches = 0
+        with self.engine.connect() as connection:
+            ranges = list(self._batches(connection, table, key))
+        for start, end in ranges:
+            with self.engine.begin() as connection:
+                for statement in statements:
+                    result = connection.execute(text(statement), dict(params, start=start, end=end))
+                    changed += max(result.rowcount, 0)
+            batches += 1
+            if self.pause:
+                # Let queued writers in before taking the write lock again
+                time.sleep(self.pause)
+        self.echo(f'  backfilled {table}: {changed} row(s) changed in {batches} batch(es)')
+
+
+@contextmanager
+def _foreign_keys_off(connection):
+    """
+    Outside a transaction: PRAGMA foreign_keys is a no-op inside one.
+    Yields whether enforcement was on; it is put back as it was.
+    """
+    if connection.dialect.name != 'sqlite':
+        yield True
+        return
+    driver_connection = connection.connection.driver_connection
+    enabled = driver_connection.execute('PRAGMA foreign_keys').fetchone()[0]
+    driver_connection.execute('PRAGMA foreign_keys = OFF')
+    try:
+        yield bool(enabled)
+    finally:
+        driver_connection.execute(f'PRAGMA foreign_keys = {"ON" if enabled else "OFF"}')
+
+
+def _check_foreign_keys(connection):
+    if connection.dialect.name != 'sqlite':
+        return
+    problems = connection.execute(text('PRAGMA foreign_key_check')).all()
+    if problems:
+        raise RuntimeError(f'Foreign key violations after migration: {problems[:5]}')
+
+
+def _apply(connection, version, name, module, tables=None, check_foreign_keys=True):
+    """Run a migration's upgrade() and record it, in the caller's transaction"""
+    if hasattr(module, 'upgrade'):
+        module.upgrade(Operations(connection, tables))
+    if check_foreign_keys:
+        # Shard files don't enforce theirs: the referenced tables are in the directory
+        _check_foreign_keys(connection)
+    record_version(connection, version, name, backfilled=not hasattr(module, 'backfill'))
+
+
+def _dry_run(engine, pending, batch_size, echo, tables):
+    """Apply `pending` in one transaction, show the SQL and roll it all back"""
+    with engine.connect() as connection:
+        statements = []
+
+        @event.listens_for(connection, 'before_cursor_execute')
+        def show(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with _foreign_keys_off(connection) as check_foreign_keys:
+            with connection.begin() as transaction:
+                for version, name, module, applied in pending:
+                    echo(f'Would {"backfill" if applied else "apply"} {version:04d}_{name}')
+                    del statements[:]
+                    if not applied:
+                        _apply(connection, version, name, module, tables, check_foreign_keys)
+                    for statement in statements:
+                        # Leave out reflection queries and the version bookkeeping
+                        if not statement.lstrip().upper().startswith(('PRAGMA', 'SELECT', 'INSERT INTO SCHEMA_VERSION')):
+                            echo(f'  {statement.strip()}')
+                    if hasattr(module, 'backfill'):
+                        module.backfill(Backfill(engine, batch_size, echo=echo, dry_run_connection=connection,
+                                                 tables=tables))
+                transaction.rollback()
+
+
+def upgrade_database(engine, metadata, directory, dry_run=False, batch_size=DEFAULT_BATCH_SIZE,
+                     pause=0.0, echo=print, tables=None):
+    """
+    Apply pending migrations and finish interrupted backfills, limited to
+    `tables` if given. An empty database gets the current schema from
+    `metadata` and every migration recorded as applied. Returns whether
+    anything was (or, in a dry run, would be) changed.
+    """
+    migrations = discover_migrations(directory)
+
+    with engine.connect() as connection:
+        empty = not [name for name in inspect(connection).get_table_names() if name != 'schema_version']
+    if empty:
+        if dry_run:
+            echo(f'Would create {len(metadata.sorted_tables)} tables and record {len(migrations)} migrations')
+            return True
+        with engine.begin() as connection:
+            metadata.create_all(connection)
+            ensure_version_table(connection)
+            for version, name, path in migrations:
+                record_version(connection, version, name)
+        echo('Created the database schema')
+        return True
+
+    with engine.begin() as connection:
+        applied = applied_versions(connection)
+
+    # Unapplied migrations and applied ones whose backfill did not finish
+    pending = [
+        (version, name, load_migration(version, path), version in applied)
+        for version, name, path in migrations
+        if applied.get(version) is None
+    ]
+    if not pending:
+        echo('Database is up to date')
+        return False
+    if dry_run:
+        _dry_run(engine, pending, batch_size, echo, tables)
+        return True
+
+    for version, name, module, already_applied in pending:
+        if not already_applied:
+            echo(f'Applying {version:04d}_{name}')
+            with engine.connect() as connection:
+                # One transaction per migration, recorded together with its changes
+                with _foreign_keys_off(connection) as check_foreign_keys:
+                    with connection.begin():
+                        _apply(connection, version, name, module, tables, check_foreign_keys)
+
+        if hasattr(module, 'backfill'):
+            echo(f'Backfilling {version:04d}_{name}')
+            module.backfill(Backfill(engine, batch_size, pause, echo, tables=tables))
+            with engine.begin() as connection:
+                record_backfilled(connection, version)
+    return True
@@ -0,0 +1,89 @@
+from database import db
+from models import MatchEvent, TeamAssignment
+from sqlalchemy import func
+
+
+def load_scores(game_ids):
+    """
+    Load the score of many games with a single grouped query.
+
+    Goals are credited to the scorer's team and own goals to the opposing
+    team, matching Game.get_score(). Games without events score 0 - 0.
+
+    Args:
+        game_ids: Iterable of game IDs
+
+    Returns:
+        Dict mapping game ID to {'team_a': int, 'team_b': int}
+    """
+    game_ids = list({game_id for game_id in game_ids if game_id is not None})
+    scores = {game_id: {'team_a': 0, 'team_b': 0} for game_id in game_ids}
+
+    if not game_ids:
+        return scores
+
+    rows = db.session.query(
+        MatchEvent.game_id,
+        TeamAssignment.team,
+        MatchEvent.event_type,
+        func.count(MatchEvent.id)
+    ).join(
+        TeamAssignment,
+        (MatchEvent.scorer_id == TeamAssignment.user_id) &
+        (MatchEvent.game_id == TeamAssignment.game_id)
+    ).filter(
+        MatchEvent.game_id.in_(game_ids),
+        MatchEvent.event_type.in_(['goal', 'own_goal'])
+    ).group_by(
+        MatchEvent.game_id,
+        TeamAssignment.team,
+        MatchEvent.event_type
+    ).all()
+
+    for game_id, team, event_type, count in rows:
+        # Own goals add to the opponent's score
+        if event_type == 'own_goal':
+            team = 'B' if team == 'A' else 'A'
+        key = 'team_a' if team == 'A' else 'team_b'
+        scores[game_id][key] += count
+
+    return scores
+
+
+def attach_scores(games):
+    """
+    Batch-load scores for a list of games and attach them to each game so
+    that Game.get_score() in templates does not hit the database per row.
+
+    Returns the games list for convenient chaining.
+    """
+    games = [game for game in games if game is not None]
+    scores = load_scores(game.id for game in games)
+
+    for game in games:
+        game._loaded_score = scores[game.id]
+
+    return games
+
+
+def score_from_events(teams, events):
+    """
+    Compute a game's score from rows already in memory.
+
+    Args:
+        teams: Dict mapping user ID to team ('A' or 'B')
+        events: Iterable of (event_type, scorer_id, assist_id) tuples
+
+    Returns:
+        Dict mapping team to goals, e.g. {'A': 2, 'B': 1}
+    """
+    score = {'A': 0, 'B': 0}
+    for event_type, scorer_id, _ in events:
+        scorer_team = teams.get(scorer_id)
+        if not scorer_team:
+            continue
+        if event_type == 'goal':
+            score[scorer_team] += 1
+        elif event_type == 'own_goal':
+            score['B' if scorer_team == 'A' else 'A'] += 1
+    return score
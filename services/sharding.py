@@ -0,0 +1,387 @@
+"""
+Optional sharding of the group-scoped tables over DB_SHARDS SQLite files.
+
+Users, groups, memberships and games stay in the main database file (the
+directory). Votes, team assignments, match events, feed items,
+notifications, the per-group stats tables and the version counters of that
+data (DataVersion) move to instance/shards/shard-<n>.db, chosen by
+group_id % DB_SHARDS. Each shard has its own write lock, so one group's
+match-day writes and notifications don't queue behind another group's, nor
+behind the directory's.
+
+- Requests for a /groups/<group_id>/ or /games/<game_id>/ URL, and code in
+  `use_shard(group_id)`, run their statements on that group's shard. Its
+  connections ATTACH the directory read-only, so joins with users and
+  games keep working. Writes to directory tables go to the directory.
+- Everything else runs on the directory, whose connections ATTACH every
+  shard and see each sharded table as a read-only TEMP view over all of
+  them (profile, dashboard and history pages span groups).
+
+SQLite attaches at most 10 databases to a connection, hence MAX_SHARDS.
+Foreign keys from shard tables to directory tables are not enforced. IDs
+are unique per shard only, except in AUTOINCREMENT tables (notifications,
+which users address by ID): there each shard takes IDs from its own range.
+`flask db split-shards` moves an existing database into this layout, and
+`flask db upgrade` migrates the directory and every shard, each recording
+its own schema_version.
+"""
+import os
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import quote
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.util import find_tables
+
+from services.cache import TTLCache
+from services.schema_migrations import ensure_version_table
+from services.sqlite_profile import configure_sqlite_engine
+
+SHARDED_TABLES = {
+    'availability_vote', 'team_assignment', 'match_event', 'potm_vote', 'feed_item',
+    'admin_player_rating', 'player_attributes', 'player_pair_stat', 'player_form', 'stats_applied_game',
+    'notification', 'data_version'
+}
+
+# The directory plus nine shards fill SQLite's default limit of 10 attached databases
+MAX_SHARDS = 9
+
+# IDs per shard in AUTOINCREMENT tables
+ID_RANGE = 2 ** 40
+
+# In the directory (shard NULL) and in every shard; records the layout the files were split into
+LAYOUT_TABLE = 'shard_layout'
+
+# Takes the main database's write lock only; see sqlite_profile.configure_sqlite_engine
+WRITE_LOCK = f'DELETE FROM main.{LAYOUT_TABLE} WHERE 0'
+
+_current_shard = ContextVar('current_shard', default=None)
+
+
+class ShardError(Exception):
+    pass
+
+
+def shard_for_group(group_id, shard_count):
+    return group_id % shard_count
+
+
+def shard_path(directory, shard):
+    return os.path.join(directory, f'shard-{shard}.db')
+
+
+def _uri(path, mode):
+    return f'file:{quote(path)}?mode={mode}'
+
+
+def reserve_ids(execute, schema, table, last_id, shard):
+    """
+    Continue the AUTOINCREMENT IDs of `table` in the shard attached as
+    `schema` from the shard's own range above `last_id`, the highest ID
+    before the split. `execute` runs SQL with ? parameters.
+    """
+    execute(f'DELETE FROM {schema}.sqlite_sequence WHERE name = ?', (table,))
+    execute(f'INSERT INTO {schema}.sqlite_sequence (name, seq) VALUES (?, ?)', (table, last_id + shard * ID_RANGE))
+
+
+def _check_layout(dbapi_connection, schema, shard, shard_count):
+    try:
+        row = dbapi_connection.execute(f'SELECT shard, shard_count FROM {schema}.{LAYOUT_TABLE}').fetchone()
+    except Exception:
+        row = None
+    if row != (shard, shard_count):
+        raise ShardError(
+            f'{schema} is not {"the directory" if shard is None else f"shard {shard}"} of a '
+            f'{shard_count}-shard layout; run `flask db split-shards`'
+        )
+
+
+def _attach_shards(engine, paths, read_only):
+    """Directory connections: every shard ATTACHed, sharded tables as TEMP views over all of them"""
+    shard_count = len(paths)
+
+    @event.listens_for(engine, 'connect')
+    def attach_shards(dbapi_connection, connection_record):
+        _check_layout(dbapi_connection, 'main', None, shard_count)
+        for shard, path in enumerate(paths):
+            if not os.path.isfile(path):
+                raise ShardError(f'{path} is missing; run `flask db split-shards`')
+            dbapi_connection.execute(
+                f'ATTACH DATABASE ? AS shard_{shard}', (_uri(path, 'ro') if read_only else path,)
+            )
+            _check_layout(dbapi_connection, f'shard_{shard}', shard, shard_count)
+
+        # Replica connections are query_only, which also forbids TEMP views
+        query_only = dbapi_connection.execute('PRAGMA query_only').fetchone()[0]
+        dbapi_connection.execute('PRAGMA query_only = OFF')
+        for table in sorted(SHARDED_TABLES):
+            union = ' UNION ALL '.join(f'SELECT * FROM shard_{shard}."{table}"' for shard in range(shard_count))
+            dbapi_connection.execute(f'CREATE TEMP VIEW "{table}" AS {union}')
+        dbapi_connection.execute(f'PRAGMA query_only = {query_only}')
+
+        connection_record.info['write_lock'] = WRITE_LOCK
+
+
+def _shard_engine(app, directory_path, path, shard, shard_count):
+    """Connections on one shard file with the directory ATTACHed read-only"""
+    # Referenced users, games and groups live in the directory, out of reach of SQLite's checks
+    pragmas = dict(app.config['SQLITE_PRAGMAS'], foreign_keys='OFF')
+
+    engine = create_engine(f'sqlite:///file:{quote(path)}?uri=true', **app.config['SQLALCHEMY_ENGINE_OPTIONS'])
+    configure_sqlite_engine(engine, pragmas, app.config['SQLITE_IMMEDIATE_WRITES'])
+
+    @event.listens_for(engine, 'connect')
+    def attach_directory(dbapi_connection, connection_record):
+        _check_layout(dbapi_connection, 'main', shard, shard_count)
+        dbapi_connection.execute('ATTACH DATABASE ? AS directory', (_uri(directory_path, 'ro'),))
+        connection_record.info['write_lock'] = WRITE_LOCK
+
+    return engine
+
+
+def current_shard():
+    """Shard index for the current use_shard() block or request, or None"""
+    shard = _current_shard.get()
+    if shard is None and has_request_context():
+        return g.get('db_shard')
+    return shard
+
+
+class ShardRouter:
+    """Picks the engine for each statement of a session; see RoutingSession.get_bind"""
+
+    def __init__(self, directory, engines):
+        self.directory = directory
+        self.engines = engines
+        # game_id -> group_id; a game never changes group
+        self._game_groups = TTLCache(maxsize=10000, ttl=3600)
+
+    @property
+    def shard_count(self):
+        return len(self.engines)
+
+    def shard_for_group(self, group_id):
+        return shard_for_group(group_id, self.shard_count)
+
+    def game_group(self, game_id):
+        group_id = self._game_groups.get(game_id)
+        if group_id is None:
+            from models import Game
+
+            with self.directory.connect().execution_options(read_only=True) as connection:
+                group_id = connection.execute(select(Game.group_id).where(Game.id == game_id)).scalar()
+            if group_id is not None:
+                self._game_groups.set(game_id, group_id)
+        return group_id
+
+    def route(self, session, mapper, clause):
+        """
+        The shard engine, or None for the directory. A flush passes only a
+        mapper; other writes pass an INSERT, UPDATE or DELETE clause.
+        """
+        if clause is not None:
+            tables = {table.name for table in find_tables(clause, include_crud=True)}
+            is_write = getattr(clause, 'is_dml', False)
+        else:
+            tables = {table.name for table in mapper.tables} if mapper is not None else set()
+            is_write = mapper is not None
+        sharded = tables & SHARDED_TABLES
+
+        shard = current_shard()
+        if shard is None:
+            if sharded and is_write:
+                raise ShardError(f'No shard selected for writing {", ".join(sorted(sharded))}; use use_shard(group_id)')
+            return None
+
+        if is_write:
+            if sharded:
+                return self.engines[shard]
+            # The shard's copy of the directory is read-only
+            session.info['wrote_directory'] = True
+            return None
+        if clause is not None and not sharded and session.info.get('wrote_directory'):
+            # Read the directory writes of this transaction back from the directory
+            return None
+        return self.engines[shard]
+
+
+@event.listens_for(Session, 'after_commit')
+def _end_directory_writes(db_session):
+    db_session.info.pop('wrote_directory', None)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_directory_writes(db_session, previous_transaction):
+    db_session.info.pop('wrote_directory', None)
+
+
+def track_shard_versions(engine):
+    """
+    Give a shard engine's file its own schema_version. Shards split before
+    they had one start from the directory's: they were split from it.
+    """
+    with engine.begin() as connection:
+        if connection.execute(text("SELECT 1 FROM main.sqlite_master WHERE name = 'schema_version'")).first():
+            return
+        ensure_version_table(connection)
+        if connection.execute(text("SELECT 1 FROM directory.sqlite_master WHERE name = 'schema_version'")).first():
+            connection.execute(text(
+                'INSERT INTO main.schema_version (version, name, applied_at, backfilled_at) '
+                'SELECT version, name, applied_at, backfilled_at FROM directory.schema_version'
+            ))
+
+
+@contextmanager
+def use_shard(group_id):
+    """
+    Run the statements in the block on the shard of `group_id` (outside
+    requests, or for another group than the request's). A None group_id
+    selects no shard.
+    """
+    router = current_app.extensions.get('db_shards')
+    shard = router.shard_for_group(group_id) if router is not None and group_id is not None else None
+    token = _current_shard.set(shard)
+    try:
+        yield
+    finally:
+        _current_shard.reset(token)
+
+
+def init_sharding(app, db):
+    """
+    Split group-scoped tables over DB_SHARDS files in SHARD_DIR (default
+    instance/shards); 0 keeps everything in one database. Call after
+    init_db_routing().
+    """
+    app.config.setdefault('DB_SHARDS', 0)
+    app.config.setdefault('SHARD_DIR', os.path.join(app.instance_path, 'shards'))
+
+    shard_count = app.config['DB_SHARDS']
+    if not shard_count:
+        return
+    if not 1 <= shard_count <= MAX_SHARDS:
+        raise ShardError(f'DB_SHARDS must be between 1 and {MAX_SHARDS}')
+
+    with app.app_context():
+        directory = db.engine
+    if directory.dialect.name != 'sqlite' or directory.url.database in (None, '', ':memory:'):
+        raise ShardError('DB_SHARDS needs a SQLite database file')
+
+    paths = [shard_path(app.config['SHARD_DIR'], shard) for shard in range(shard_count)]
+    _attach_shards(directory, paths, read_only=False)
+
+    replica = app.extensions.get('db_replica')
+    if replica is not None and replica.dialect.name == 'sqlite':
+        _attach_shards(replica, paths, read_only=True)
+
+    router = ShardRouter(directory, [
+        _shard_engine(app, directory.url.database, path, shard, shard_count)
+        for shard, path in enumerate(paths)
+    ])
+    app.extensions['db_shards'] = router
+
+    @app.before_request
+    def choose_shard():
+        args = request.view_args or {}
+        if 'group_id' in args:
+            g.db_shard = router.shard_for_group(args['group_id'])
+        elif 'game_id' in args:
+            group_id = router.game_group(args['game_id'])
+            if group_id is not None:
+                g.db_shard = router.shard_for_group(group_id)
+
+
+def split_database(path, directory, shard_count, metadata, echo=print):
+    """
+    Move the sharded tables of the SQLite file `path` into `shard_count`
+    new shard files in `directory`, in one transaction. Rows go to the
+    shard of their group, or of their game's group. Run with the app
+    stopped. Returns {table: [rows per shard]}.
+    """
+    if not 1 <= shard_count <= MAX_SHARDS:
+        raise ShardError(f'The shard count must be between 1 and {MAX_SHARDS}')
+
+    paths = [shard_path(directory, shard) for shard in range(shard_count)]
+    existing = [p for p in paths if os.path.exists(p)]
+    if existing:
+        raise ShardError(f'{existing[0]} already exists')
+
+    connection = sqlite3.connect(path, isolation_level=None)
+    connection.execute('PRAGMA busy_timeout = 5000')
+    # Rows of the sharded tables leave the file that holds their parents
+    connection.execute('PRAGMA foreign_keys = OFF')
+
+    if connection.execute('SELECT 1 FROM sqlite_master WHERE name = ?', (LAYOUT_TABLE,)).fetchone():
+        connection.close()
+        raise ShardError(f'{path} is already split into shards')
+
+    tables = [metadata.tables[name] for name in sorted(SHARDED_TABLES)]
+    for table in tables:
+        columns = {row[1] for row in connection.execute(f'PRAGMA table_info("{table.name}")')}
+        if columns != set(table.columns.keys()):
+            connection.close()
+            raise ShardError(f'{table.name} does not match the models; run `flask db upgrade` first')
+
+    os.makedirs(directory, exist_ok=True)
+    counts = {}
+    try:
+        for shard, shard_file in enumerate(paths):
+            engine = create_engine(f'sqlite:///{shard_file}')
+            with engine.connect() as shard_connection:
+                shard_connection.exec_driver_sql('PRAGMA journal_mode = WAL')
+            metadata.create_all(engine, tables=tables)
+            engine.dispose()
+            connection.execute(f'ATTACH DATABASE ? AS shard_{shard}', (shard_file,))
+            connection.execute(f'CREATE TABLE shard_{shard}.{LAYOUT_TABLE} (shard INTEGER, shard_count INTEGER NOT NULL)')
+            connection.execute(f'INSERT INTO shard_{shard}.{LAYOUT_TABLE} VALUES (?, ?)', (shard, shard_count))
+
+        connection.execute('BEGIN IMMEDIATE')
+        for table in tables:
+            columns = ', '.join(f'"{name}"' for name in table.columns.keys())
+            selected = ', '.join(f't."{name}"' for name in table.columns.keys())
+            if 'group_id' in table.columns:
+                group_id = 't.group_id'
+            else:
+                group_id = '(SELECT game.group_id FROM main.game AS game WHERE game.id = t.game_id)'
+
+            total = connection.execute(f'SELECT count(*) FROM main."{table.name}"').fetchone()[0]
+            counts[table.name] = []
+            for shard in range(shard_count):
+                cursor = connection.execute(
+                    f'INSERT INTO shard_{shard}."{table.name}" ({columns}) '
+                    f'SELECT {selected} FROM main."{table.name}" AS t WHERE {group_id} % ? = ?',
+                    (shard_count, shard)
+                )
+                counts[table.name].append(cursor.rowcount)
+            if sum(counts[table.name]) != total:
+                raise ShardError(f'{table.name}: {total - sum(counts[table.name])} rows have no group')
+            if table.dialect_options['sqlite']['autoincrement']:
+                last_id = connection.execute(f'SELECT coalesce(max(id), 0) FROM main."{table.name}"').fetchone()[0]
+                for shard in range(shard_count):
+                    reserve_ids(connection.execute, f'shard_{shard}', table.name, last_id, shard)
+
+            connection.execute(f'DROP TABLE main."{table.name}"')
+            echo(f'{table.name}: ' + ', '.join(f'shard {shard} {rows}' for shard, rows in enumerate(counts[table.name])))
+
+        connection.execute(f'CREATE TABLE main.{LAYOUT_TABLE} (shard INTEGER, shard_count INTEGER NOT NULL)')
+        connection.execute(f'INSERT INTO main.{LAYOUT_TABLE} VALUES (NULL, ?)', (shard_count,))
+        connection.execute('COMMIT')
+    except BaseException:
+        if connection.in_transaction:
+            connection.execute('ROLLBACK')
+        connection.close()
+        for shard_file in paths:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(shard_file + suffix):
+                    os.remove(shard_file + suffix)
+        raise
+
+    for shard in range(shard_count):
+        connection.execute(f'DETACH DATABASE shard_{shard}')
+    # Give the moved tables' pages back to the file system
+    connection.execute('VACUUM')
+    connection.close()
+    return counts
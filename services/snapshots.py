@@ -0,0 +1,207 @@
+"""
+Online SQLite snapshots.
+
+The backup API copies the live database a few pages at a time. Each step
+holds a read transaction only briefly, and it sleeps between steps, so
+request handlers keep writing while a snapshot runs. Under WAL readers
+never block writers anyway; the short steps also keep checkpoints from
+being held back. When another connection writes between two steps, SQLite
+restarts the copy from the first page; after `max_restarts` of those the
+rest is copied in a single step. Under WAL that step still doesn't block
+writers, it only holds back checkpoints until it is done.
+
+A sharded database is snapshotted file by file under one timestamp:
+footmob-<time>.db.gz for the directory and footmob-<time>.shard-<n>.db.gz
+for each shard. The files are copied one after another, so they are not
+one consistent point in time across files.
+"""
+import gzip
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+SNAPSHOT_PREFIX = 'footmob-'
+TIMESTAMP_FORMAT = '%Y%m%dT%H%M%SZ'
+SUFFIXES = ('.db.gz', '.db')
+
+DEFAULT_PAGES = 256
+DEFAULT_PAUSE = 0.05
+DEFAULT_MAX_RESTARTS = 3
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def shard_snapshot_path(path, shard):
+    """The file holding shard `shard` of the snapshot `path`"""
+    for suffix in SUFFIXES:
+        if path.endswith(suffix):
+            return f'{path[:-len(suffix)]}.shard-{shard}{suffix}'
+    raise SnapshotError(f'{path} is not a snapshot')
+
+
+def snapshot_files(path):
+    """The snapshot `path` and the shard files taken with it"""
+    files = [path]
+    while os.path.exists(shard_snapshot_path(path, len(files) - 1)):
+        files.append(shard_snapshot_path(path, len(files) - 1))
+    return files
+
+
+def _snapshot_time(filename):
+    if not filename.startswith(SNAPSHOT_PREFIX):
+        return None
+    for suffix in SUFFIXES:
+        if filename.endswith(suffix):
+            stamp = filename[len(SNAPSHOT_PREFIX):-len(suffix)]
+            try:
+                return datetime.strptime(stamp, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+            except ValueError:
+                return None
+    return None
+
+
+def list_snapshots(directory):
+    """[(taken at, path)] of the snapshots in `directory`, newest first; shard files are left out"""
+    if not os.path.isdir(directory):
+        return []
+    snapshots = []
+    for filename in os.listdir(directory):
+        taken_at = _snapshot_time(filename)
+        if taken_at is not None:
+            snapshots.append((taken_at, os.path.join(directory, filename)))
+    return sorted(snapshots, reverse=True)
+
+
+def verify_snapshot(path):
+    """Run PRAGMA integrity_check on a snapshot file; raises SnapshotError if it fails"""
+    connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        problems = [row[0] for row in connection.execute('PRAGMA integrity_check')]
+    finally:
+        connection.close()
+    if problems != ['ok']:
+        raise SnapshotError(f'integrity check failed for {path}: ' + '; '.join(problems[:5]))
+
+
+def _compress(path, target):
+    with open(path, 'rb') as source, gzip.open(target, 'wb', compresslevel=6) as compressed:
+        shutil.copyfileobj(source, compressed, 1024 * 1024)
+
+
+def _backup(database, partial, pages, pause, max_restarts, stats):
+    """Copy `database` to `partial` in steps, adding to `stats`"""
+    last_remaining = None
+    total_pages = restarts = 0
+
+    def progress(status, remaining, total):
+        nonlocal last_remaining, total_pages, restarts
+        # A restarted copy redoes the first step, so `remaining` does not go down
+        if last_remaining is not None and remaining >= last_remaining:
+            restarts += 1
+            stats['restarts'] += 1
+            if restarts > max_restarts:
+                raise _TooManyRestarts()
+        last_remaining = remaining
+        total_pages = total
+        # backup()'s own `sleep` only applies after SQLITE_BUSY; pause after every step
+        if remaining:
+            time.sleep(pause)
+
+    source = sqlite3.connect(f'file:{database}?mode=ro', uri=True)
+    destination = sqlite3.connect(partial)
+    try:
+        try:
+            source.backup(destination, pages=pages, progress=progress)
+        except _TooManyRestarts:
+            # Writes keep landing between steps: copy everything in one step
+            stats['single_step'] = True
+            source.backup(destination, pages=-1)
+        # A self-contained file: no -wal or -shm next to the snapshot
+        destination.execute('PRAGMA journal_mode=DELETE')
+    finally:
+        source.close()
+        destination.close()
+    stats['pages'] += total_pages
+    verify_snapshot(partial)
+
+
+def take_snapshot(database, directory, pages=DEFAULT_PAGES, pause=DEFAULT_PAUSE, compress=True,
+                  max_restarts=DEFAULT_MAX_RESTARTS, now=None, shards=()):
+    """
+    Copy the SQLite file `database`, and the shard files `shards` if it is
+    sharded, into `directory` with the online backup API, `pages` pages per
+    step and `pause` seconds between steps. Each copy is checked with
+    PRAGMA integrity_check and, with `compress`, gzipped. Returns
+    (path, {'pages', 'restarts', 'single_step', 'seconds', 'size'}), with
+    the totals over all files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    now = now or datetime.now(timezone.utc)
+    name = SNAPSHOT_PREFIX + now.strftime(TIMESTAMP_FORMAT)
+    target = os.path.join(directory, name + ('.db.gz' if compress else '.db'))
+    targets = [target] + [shard_snapshot_path(target, shard) for shard in range(len(shards))]
+    for path in targets:
+        if os.path.exists(path):
+            raise SnapshotError(f'{path} already exists')
+
+    # Written under temporary names so a half-written file is never taken for a snapshot
+    partials = [os.path.join(directory, f'.{os.path.basename(path)}.partial') for path in targets]
+    stats = {'pages': 0, 'restarts': 0, 'single_step': False}
+
+    started = time.perf_counter()
+    try:
+        for source, partial in zip([database, *shards], partials):
+            _backup(source, partial, pages, pause, max_restarts, stats)
+            if compress:
+                _compress(partial, partial + '.gz')
+                os.replace(partial + '.gz', partial)
+        # The directory file last: list_snapshots() only sees complete snapshots
+        for partial, path in reversed(list(zip(partials, targets))):
+            os.replace(partial, path)
+    finally:
+        for partial in partials:
+            for leftover in (partial, partial + '.gz'):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+
+    stats['seconds'] = time.perf_counter() - started
+    stats['size'] = sum(os.path.getsize(path) for path in targets)
+    return target, stats
+
+
+def prune_snapshots(directory, keep_last=7, keep_daily=14, keep_weekly=8, now=None):
+    """
+    Rotate snapshots: keep the newest `keep_last`, plus the newest of each
+    of the last `keep_daily` days and `keep_weekly` ISO weeks; delete the
+    rest, with their shard files. Returns the deleted paths.
+    """
+    now = now or datetime.now(timezone.utc)
+    snapshots = list_snapshots(directory)
+
+    keep = {path for _, path in snapshots[:keep_last]}
+    days, weeks = set(), set()
+    for taken_at, path in snapshots:
+        day = taken_at.date()
+        if now - taken_at < timedelta(days=keep_daily) and day not in days:
+            days.add(day)
+            keep.add(path)
+        week = taken_at.isocalendar()[:2]
+        if now - taken_at < timedelta(weeks=keep_weekly) and week not in weeks:
+            weeks.add(week)
+            keep.add(path)
+
+    deleted = []
+    for _, path in snapshots:
+        if path not in keep:
+            for file in snapshot_files(path):
+                os.remove(file)
+                deleted.append(file)
+    return deleted
@@ -0,0 +1,185 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Maximum queries per endpoint, checked on every request in debug and testing
+QUERY_BUDGETS = {
+    'main.dashboard': 6,
+    'main.game_history': 5,
+    'main.game_history_page': 5,
+    'main.profile': 4,
+    'games.view': 7
+}
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*\?\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    """Statements executed during one request (or one count_queries block)"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []
+        self.shapes = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.statements.append((duration, statement))
+        self.shapes[normalize_statement(statement)] += 1
+
+    def slowest(self, n=3):
+        return sorted(self.statements, key=lambda item: item[0], reverse=True)[:n]
+
+    def repeated(self, threshold):
+        """Normalized statements that ran more than `threshold` times"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+def normalize_statement(statement):
+    """Reduce a statement to its shape so repeated lookups compare equal"""
+    statement = _STRING_LITERAL.sub('?', statement)
+    statement = _NUMBER_LITERAL.sub('?', statement)
+    statement = _IN_LIST.sub('IN (...)', statement)
+    return _WHITESPACE.sub(' ', statement).strip()
+
+
+# count_queries() blocks active in this thread (or task); the per-request collector lives on g.sql_stats
+_collectors = ContextVar('sql_collectors', default=())
+
+
+def _active_stats():
+    stats = list(_collectors.get())
+    if has_request_context() and 'sql_stats' in g:
+        stats.append(g.sql_stats)
+    return stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # On the statement's execution context, so a statement that fails leaves nothing behind
+    context.query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - context.query_start
+    for stats in _active_stats():
+        stats.record(statement, duration)
+
+
+@contextmanager
+def count_queries():
+    """
+    Collect the statements executed inside the block, e.g. in tests:
+
+        with count_queries() as stats:
+            client.get('/dashboard')
+        assert stats.count <= 6
+    """
+    stats = QueryStats()
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+@contextmanager
+def query_budget(limit):
+    """
+    Fail if the block executes more than `limit` statements: raise
+    QueryBudgetExceeded under testing, log an error in debug, and skip the
+    check otherwise.
+    """
+    if not (current_app.debug or current_app.testing):
+        yield
+        return
+
+    with count_queries() as stats:
+        yield
+    _enforce_budget(stats, limit, 'block')
+
+
+def assert_query_budget(client, url, limit, method='get', **kwargs):
+    """Request `url` with a test client and fail if it exceeds `limit` queries"""
+    with count_queries() as stats:
+        response = getattr(client, method)(url, **kwargs)
+    _check_budget(stats, limit, url)
+    return response
+
+
+def _check_budget(stats, limit, label='block'):
+    if stats.count > limit:
+        raise QueryBudgetExceeded(
+            f'{label}: {stats.count} queries executed, budget is {limit}:\n'
+            + '\n'.join(statement for _, statement in stats.statements)
+        )
+
+
+def _enforce_budget(stats, limit, label):
+    try:
+        _check_budget(stats, limit, label)
+    except QueryBudgetExceeded:
+        if current_app.testing:
+            raise
+        current_app.logger.exception('Query budget exceeded')
+
+
+def init_sql_instrumentation(app):
+    """
+    Record statement count, DB time and the slowest statements for every
+    request. Adds a Server-Timing header, warns about statements repeated
+    more than SQL_N_PLUS_ONE_THRESHOLD times, checks QUERY_BUDGETS in debug
+    and testing (see query_budget), and logs a summary line per request
+    when SQL_DEBUG_LOG is set.
+    """
+    app.config.setdefault('SQL_N_PLUS_ONE_THRESHOLD', 10)
+    app.config.setdefault('SQL_DEBUG_LOG', False)
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_sql_stats():
+        g.sql_stats = QueryStats()
+
+    @app.after_request
+    def report_sql_stats(response):
+        stats = g.pop('sql_stats', None)
+        if stats is None:
+            return response
+
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+        )
+
+        threshold = app.config['SQL_N_PLUS_ONE_THRESHOLD']
+        for shape, count in stats.repeated(threshold):
+            app.logger.warning('Possible N+1 on %s: %d x %s', request.endpoint, count, shape)
+
+        if app.config['SQL_DEBUG_LOG']:
+            slowest = '; '.join(f'{duration * 1000:.1f}ms {_WHITESPACE.sub(" ", statement)[:120]}'
+                                for duration, statement in stats.slowest())
+            app.logger.info('%s %s: %d queries in %.1fms | slowest: %s',
+                        request.method, request.path, stats.count, stats.duration * 1000, slowest)
+
+        budget = QUERY_BUDGETS.get(request.endpoint)
+        if budget is not None and (app.debug or app.testing):
+            _enforce_budget(stats, budget, request.endpoint)
+
+        return response
@@ -0,0 +1,88 @@
+from flask import has_request_context, request
+from sqlalchemy import event
+
+# Applied to every new SQLite connection; override with app.config['SQLITE_PRAGMAS']
+DEFAULT_PRAGMAS = {
+    # Wait this many milliseconds for a lock instead of failing; first, so
+    # the pragmas below wait too
+    'busy_timeout': 5000,
+    # Readers never block the writer and the writer never blocks readers
+    'journal_mode': 'WAL',
+    # Safe with WAL: a power loss can drop the last commits but not corrupt
+    'synchronous': 'NORMAL',
+    # Negative sizes are in KiB: 20 MB page cache per connection
+    'cache_size': -20000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+
+READ_ONLY_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+def is_write_transaction(connection=None):
+    """
+    Requests that may write take the write lock when they begin.
+    Connections with the `read_only` execution option never do.
+    """
+    if connection is not None and connection.get_execution_options().get('read_only'):
+        return False
+    if has_request_context():
+        return request.method not in READ_ONLY_METHODS
+    # CLI commands and the sweeper thread
+    return True
+
+
+def configure_sqlite_engine(engine, pragmas=None, immediate_writes=True):
+    """
+    Apply `pragmas` on every new connection of a SQLite engine. With
+    `immediate_writes`, transactions are begun explicitly (so each one reads
+    a single snapshot) and those that may write start with BEGIN IMMEDIATE:
+    they queue on busy_timeout for the write lock up front, where upgrading
+    a read snapshot to a write would fail with "database is locked" as soon
+    as another connection had committed. Connections with other databases
+    ATTACHed, which BEGIN IMMEDIATE would lock as well, put a statement
+    that locks only their main database in connection_record.info['write_lock'].
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        if immediate_writes:
+            # Let the begin hook below issue BEGIN instead of pysqlite
+            dbapi_connection.isolation_level = None
+
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+    if immediate_writes:
+        @event.listens_for(engine, 'begin')
+        def begin(connection):
+            # On the raw connection so it is not counted as a query
+            driver_connection = connection.connection.driver_connection
+            write_lock = connection.connection.info.get('write_lock')
+            if not is_write_transaction(connection):
+                driver_connection.execute('BEGIN')
+            elif write_lock:
+                driver_connection.execute('BEGIN')
+                driver_connection.execute(write_lock)
+            else:
+                driver_connection.execute('BEGIN IMMEDIATE')
+
+
+def init_sqlite_profile(app, db):
+    """Configure the app's engine; call after db.init_app(app)"""
+    app.config.setdefault('SQLITE_PRAGMAS', DEFAULT_PRAGMAS)
+    app.config.setdefault('SQLITE_IMMEDIATE_WRITES', True)
+
+    with app.app_context():
+        configure_sqlite_engine(
+            db.engine,
+            app.config['SQLITE_PRAGMAS'],
+            app.config['SQLITE_IMMEDIATE_WRITES']
+        )
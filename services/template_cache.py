@@ -0,0 +1,29 @@
+import os
+
+from jinja2 import FileSystemBytecodeCache
+
+
+def init_template_cache(app):
+    """
+    Keep compiled templates in TEMPLATE_CACHE_DIR (default
+    instance/jinja_cache), so new worker processes load bytecode instead of
+    parsing and compiling every template on its first render. Entries are
+    checked against the template source, so edited templates recompile.
+    An empty TEMPLATE_CACHE_DIR disables the cache.
+    """
+    app.config.setdefault('TEMPLATE_CACHE_DIR', os.path.join(app.instance_path, 'jinja_cache'))
+
+    directory = app.config['TEMPLATE_CACHE_DIR']
+    if not directory:
+        return
+
+    os.makedirs(directory, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+def precompile_templates(app):
+    """Compile every template into the bytecode cache; returns their names"""
+    names = [name for name in app.jinja_env.list_templates() if name.endswith('.html')]
+    for name in names:
+        app.jinja_env.get_template(name)
+    return names
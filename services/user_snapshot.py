@@ -0,0 +1,105 @@
+import hashlib
+
+from flask import g, has_request_context
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database import db
+from models import User
+from services.cache import TTLCache
+
+# Snapshots for Flask-Login, keyed by user ID
+_snapshot_cache = TTLCache(maxsize=4096, ttl=300)
+
+
+class UserSnapshot(UserMixin):
+    """
+    Immutable copy of the identity fields of a User, used as current_user.
+
+    Requests that only need the id or names (notification polling, most
+    templates) never touch the database for identity. Any other attribute
+    is read from the full User row, loaded once per request on first use;
+    writes must go through `.orm`.
+    """
+
+    FIELDS = ('id', 'username', 'display_name', 'created_at', 'version')
+
+    def __init__(self, id, username, display_name, created_at, version):
+        object.__setattr__(self, 'id', id)
+        object.__setattr__(self, 'username', username)
+        object.__setattr__(self, 'display_name', display_name)
+        object.__setattr__(self, 'created_at', created_at)
+        object.__setattr__(self, 'version', version)
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.display_name, user.created_at, user_version(user))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'UserSnapshot is read-only; set {name} on current_user.orm instead')
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.username} v{self.version}>'
+
+    @property
+    def orm(self):
+        """The full User row, loaded once per request"""
+        if not has_request_context():
+            return db.session.get(User, self.id)
+
+        users = g.setdefault('orm_users', {})
+        if self.id not in users:
+            users[self.id] = db.session.get(User, self.id)
+        return users[self.id]
+
+    def __getattr__(self, name):
+        # Only reached for attributes the snapshot does not carry
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.orm, name)
+
+
+def user_version(user):
+    """Changes whenever the username, display name or password changes"""
+    raw = f'{user.username}\0{user.display_name}\0{user.password_hash}'
+    return hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+
+
+def load_user_snapshot(user_id):
+    """Cached snapshot for a user ID, or None if the user does not exist"""
+    snapshot = _snapshot_cache.get(user_id)
+    if snapshot is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot.from_user(user)
+        _snapshot_cache.set(user_id, snapshot)
+    return snapshot
+
+
+def invalidate_user_snapshots(*user_ids):
+    _snapshot_cache.delete(*user_ids)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault('stale_user_snapshots', set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session):
+    changed = session.info.pop('stale_user_snapshots', None)
+    if changed:
+        invalidate_user_snapshots(*changed)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_changed_users(session, previous_transaction):
+    session.info.pop('stale_user_snapshots', None)
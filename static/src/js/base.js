@@ -0,0 +1,435 @@
+// Global toast function
+function showToast(message, type = 'success') {
+    const container = document.getElementById('toast-container');
+
+    if (!container) {
+        console.error('Toast container not found');
+        return;
+    }
+
+    // Create toast element with proper Tailwind classes
+    const toast = document.createElement('div');
+    toast.className = 'toast-item bg-white rounded-lg shadow-lg border border-gray-200 p-4 toast-slide-in';
+
+    let iconClass, iconColor, iconBg, title;
+    if (type === 'error') {
+        iconClass = 'fas fa-exclamation';
+        iconColor = 'text-red-600';
+        iconBg = 'bg-red-100';
+        title = 'Error';
+    } else if (type === 'success') {
+        iconClass = 'fas fa-check';
+        iconColor = 'text-green-600';
+        iconBg = 'bg-green-100';
+        title = 'Success';
+    } else {
+        iconClass = 'fas fa-info';
+        iconColor = 'text-blue-600';
+        iconBg = 'bg-blue-100';
+        title = 'Notice';
+    }
+
+    toast.innerHTML = `
+        <div class="flex items-start">
+            <div class="flex-shrink-0">
+                <div class="h-6 w-6 ${iconBg} rounded-full flex items-center justify-center">
+                    <i class="${iconClass} ${iconColor} text-xs"></i>
+                </div>
+            </div>
+            <div class="ml-3 flex-1">
+                <p class="text-sm font-medium text-gray-900">${title}</p>
+                <p class="mt-1 text-sm text-gray-500">${message}</p>
+            </div>
+            <div class="ml-4 flex-shrink-0">
+                <button type="button" class="bg-white rounded-md inline-flex text-gray-400 hover:text-gray-500 focus:outline-none" onclick="removeToast(this)">
+                    <i class="fas fa-times text-xs"></i>
+                </button>
+            </div>
+        </div>
+    `;
+
+    // Add to container
+    container.appendChild(toast);
+
+    // Auto-remove after 5 seconds
+    setTimeout(() => {
+        removeToast(toast.querySelector('button'));
+    }, 5000);
+}
+
+// Global toast removal function
+function removeToast(button) {
+    const toast = button.closest('.toast-item');
+    toast.classList.add('toast-slide-out');
+    setTimeout(() => {
+        if (toast.parentNode) {
+            toast.remove();
+        }
+    }, 300);
+}
+
+// Global confirm function using toast-style modal
+function confirmAction(message, callback) {
+    const modal = document.createElement('div');
+    modal.className = 'fixed inset-0 bg-gray-600 bg-opacity-50 z-50 flex items-center justify-center p-4';
+    modal.innerHTML = `
+        <div class="bg-white rounded-lg shadow-xl max-w-md w-full">
+            <div class="p-6">
+                <div class="flex items-center mb-4">
+                    <div class="h-10 w-10 bg-yellow-100 rounded-full flex items-center justify-center mr-3">
+                        <i class="fas fa-question text-yellow-600"></i>
+                    </div>
+                    <h3 class="text-lg font-semibold text-gray-900">Confirm Action</h3>
+                </div>
+                <p class="text-gray-600 mb-6">${message}</p>
+                <div class="flex space-x-3 justify-end">
+                    <button type="button" onclick="this.closest('.fixed').remove()" class="px-4 py-2 border border-gray-300 text-sm font-medium rounded-md text-gray-700 bg-white hover:bg-gray-50">
+                        Cancel
+                    </button>
+                    <button type="button" onclick="this.closest('.fixed').remove(); (${callback})();" class="px-4 py-2 border border-transparent text-sm font-medium rounded-md text-white bg-red-600 hover:bg-red-700">
+                        Confirm
+                    </button>
+                </div>
+            </div>
+        </div>
+    `;
+    document.body.appendChild(modal);
+}
+
+// Auto-hide existing flash messages after 6 seconds
+setTimeout(() => {
+    const toasts = document.querySelectorAll('#toast-container .toast-item');
+    toasts.forEach(toast => {
+        const button = toast.querySelector('button');
+        if (button) removeToast(button);
+    });
+}, 6000);
+
+// Initialize all functionality when DOM is loaded
+document.addEventListener('DOMContentLoaded', function() {
+    // Initialize notification system
+    initializeNotifications();
+
+    // Initialize user menu dropdown
+    initializeUserMenu();
+});
+
+// Notification System
+function initializeNotifications() {
+    const notificationBell = document.getElementById('notification-bell');
+    const notificationDropdown = document.getElementById('notification-dropdown');
+    const markAllReadBtn = document.getElementById('mark-all-read');
+
+    if (notificationBell && notificationDropdown) {
+        // Toggle notification dropdown
+        notificationBell.addEventListener('click', function(e) {
+            e.stopPropagation();
+            notificationDropdown.classList.toggle('hidden');
+
+            // Load notifications when opening
+            if (!notificationDropdown.classList.contains('hidden')) {
+                loadNotifications();
+            }
+        });
+
+        // Close dropdown when clicking outside
+        document.addEventListener('click', function(event) {
+            if (!notificationBell.contains(event.target) && !notificationDropdown.contains(event.target)) {
+                notificationDropdown.classList.add('hidden');
+            }
+        });
+
+        // Mark all as read
+        if (markAllReadBtn) {
+            markAllReadBtn.addEventListener('click', function() {
+                markAllNotificationsAsRead();
+            });
+        }
+
+        // Load initial notification count
+        updateNotificationCount();
+
+        // Set up polling for new notifications (every 30 seconds)
+        setInterval(updateNotificationCount, 30000);
+    }
+}
+
+function updateNotificationCount() {
+    fetch('/api/notifications/count')
+        .then(response => response.json())
+        .then(data => {
+            const countElement = document.getElementById('notification-count');
+            if (data.count > 0) {
+                countElement.textContent = data.count > 99 ? '99+' : data.count;
+                countElement.classList.remove('hidden');
+            } else {
+                countElement.classList.add('hidden');
+            }
+        })
+        .catch(error => console.error('Error fetching notification count:', error));
+}
+
+function loadNotifications() {
+    const notificationList = document.getElementById('notification-list');
+
+    // Show loading state
+    notificationList.innerHTML = '<div class="p-4 text-center text-gray-500">' +
+        '<i class="fas fa-spinner fa-spin text-2xl mb-2"></i>' +
+        '<p>Loading notifications...</p>' +
+        '</div>';
+
+    fetch('/api/notifications')
+        .then(response => response.json())
+        .then(data => {
+            if (data.notifications && data.notifications.length > 0) {
+                notificationList.innerHTML = data.notifications.map(function(notification) {
+                    return '<div class="notification-item p-4 border-b border-gray-100 hover:bg-gray-50 cursor-pointer ' + (notification.is_read ? 'opacity-75' : '') + '"' +
+                        ' data-notification-id="' + notification.id + '"' +
+                        ' onclick="markNotificationAsRead(' + notification.id + ')">' +
+                        '<div class="flex items-start space-x-3">' +
+                            '<div class="flex-shrink-0">' +
+                                '<div class="h-8 w-8 bg-indigo-100 rounded-full flex items-center justify-center">' +
+                                    '<i class="fas ' + getNotificationIcon(notification.type) + ' text-indigo-600 text-sm"></i>' +
+                                '</div>' +
+                            '</div>' +
+                            '<div class="flex-1 min-w-0">' +
+                                '<p class="text-sm font-medium text-gray-900 ' + (notification.is_read ? '' : 'font-semibold') + '">' + notification.title + '</p>' +
+                                '<p class="text-sm text-gray-500 mt-1">' + notification.message + '</p>' +
+                                '<p class="text-xs text-gray-400 mt-1">' + formatTimestamp(notification.created_at) + '</p>' +
+                            '</div>' +
+                            (notification.is_read ? '' : '<div class="flex-shrink-0"><div class="h-2 w-2 bg-indigo-600 rounded-full"></div></div>') +
+                        '</div>' +
+                    '</div>';
+                }).join('');
+            } else {
+                notificationList.innerHTML = '<div class="p-4 text-center text-gray-500">' +
+                    '<i class="fas fa-bell-slash text-2xl mb-2"></i>' +
+                    '<p>No notifications</p>' +
+                    '</div>';
+            }
+        })
+        .catch(error => {
+            console.error('Error loading notifications:', error);
+            notificationList.innerHTML = '<div class="p-4 text-center text-red-500">' +
+                '<i class="fas fa-exclamation-triangle text-2xl mb-2"></i>' +
+                '<p>Error loading notifications</p>' +
+                '</div>';
+        });
+}
+
+function markNotificationAsRead(notificationId) {
+    fetch('/api/notifications/' + notificationId + '/read', {
+        method: 'POST'
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            // Update UI
+            const notificationElement = document.querySelector('[data-notification-id="' + notificationId + '"]');
+            if (notificationElement) {
+                notificationElement.classList.add('opacity-75');
+                const unreadDot = notificationElement.querySelector('.bg-indigo-600');
+                if (unreadDot) {
+                    unreadDot.remove();
+                }
+            }
+
+            // Update count
+            updateNotificationCount();
+        }
+    })
+    .catch(error => console.error('Error marking notification as read:', error));
+}
+
+function markAllNotificationsAsRead() {
+    fetch('/api/notifications/mark-all-read', {
+        method: 'POST'
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            // Reload notifications
+            loadNotifications();
+            updateNotificationCount();
+            showToast('All notifications marked as read', 'success');
+        }
+    })
+    .catch(error => console.error('Error marking all notifications as read:', error));
+}
+
+function getNotificationIcon(type) {
+    const icons = {
+        'game_created': 'fa-calendar-plus',
+        'member_joined': 'fa-user-plus',
+        'teams_published': 'fa-users',
+        'goal_scored': 'fa-futbol',
+        'match_finished': 'fa-flag-checkered',
+        'potm_announced': 'fa-trophy',
+        'poll_locked': 'fa-lock',
+        'game_reminder': 'fa-clock',
+        'default': 'fa-bell'
+    };
+    return icons[type] || icons['default'];
+}
+
+function formatTimestamp(timestamp) {
+    const now = new Date();
+    const time = new Date(timestamp);
+    const diffInSeconds = Math.floor((now - time) / 1000);
+
+    if (diffInSeconds < 60) {
+        return 'Just now';
+    } else if (diffInSeconds < 3600) {
+        const minutes = Math.floor(diffInSeconds / 60);
+        return minutes + 'm ago';
+    } else if (diffInSeconds < 86400) {
+        const hours = Math.floor(diffInSeconds / 3600);
+        return hours + 'h ago';
+    } else {
+        const days = Math.floor(diffInSeconds / 86400);
+        return days + 'd ago';
+    }
+}
+
+// User menu dropdown functionality
+function initializeUserMenu() {
+    const userMenuButton = document.getElementById('user-menu-button');
+    const userMenuDropdown = document.getElementById('user-menu-dropdown');
+
+    if (userMenuButton && userMenuDropdown) {
+        console.log('Initializing user menu dropdown');
+
+        userMenuButton.addEventListener('click', function(e) {
+            e.preventDefault();
+            e.stopPropagation();
+
+            console.log('User menu button clicked');
+
+            // Toggle dropdown
+            userMenuDropdown.classList.toggle('hidden');
+
+            // Update aria attributes
+            const isExpanded = !userMenuDropdown.classList.contains('hidden');
+            userMenuButton.setAttribute('aria-expanded', isExpanded);
+
+            console.log('Dropdown is now:', isExpanded ? 'open' : 'closed');
+        });
+
+        // Close dropdown when clicking outside
+        document.addEventListener('click', function(e) {
+            if (!userMenuButton.contains(e.target) && !userMenuDropdown.contains(e.target)) {
+                userMenuDropdown.classList.add('hidden');
+                userMenuButton.setAttribute('aria-expanded', 'false');
+            }
+        });
+
+        // Close dropdown on escape key
+        document.addEventListener('keydown', function(e) {
+            if (e.key === 'Escape' && !userMenuDropdown.classList.contains('hidden')) {
+                userMenuDropdown.classList.add('hidden');
+                userMenuButton.setAttribute('aria-expanded', 'false');
+                userMenuButton.focus();
+            }
+        });
+    } else {
+        console.error('User menu elements not found:', {
+            button: !!userMenuButton,
+            dropdown: !!userMenuDropdown
+        });
+    }
+}
+
+// Mobile navigation functionality
+function initializeMobileNavigation() {
+    const mobileMenuButton = document.getElementById('mobile-menu-button');
+    const mobileMenu = document.getElementById('mobile-menu');
+    const mobileMenuTrigger = document.getElementById('mobile-menu-trigger');
+    const menuIcon = document.getElementById('menu-icon');
+
+    // Toggle mobile menu from header button
+    if (mobileMenuButton && mobileMenu) {
+        mobileMenuButton.addEventListener('click', function() {
+            const isHidden = mobileMenu.classList.contains('hidden');
+            if (isHidden) {
+                mobileMenu.classList.remove('hidden');
+                menuIcon.classList.remove('fa-bars');
+                menuIcon.classList.add('fa-times');
+            } else {
+                mobileMenu.classList.add('hidden');
+                menuIcon.classList.remove('fa-times');
+                menuIcon.classList.add('fa-bars');
+            }
+        });
+    }
+
+    // Toggle mobile menu from bottom navigation
+    if (mobileMenuTrigger && mobileMenu) {
+        mobileMenuTrigger.addEventListener('click', function() {
+            const isHidden = mobileMenu.classList.contains('hidden');
+            if (isHidden) {
+                mobileMenu.classList.remove('hidden');
+            } else {
+                mobileMenu.classList.add('hidden');
+            }
+        });
+    }
+
+    // Sync mobile notifications with desktop
+    const mobileNotificationBell = document.getElementById('mobile-notification-bell');
+    const mobileNotificationCount = document.getElementById('mobile-notification-count');
+    const desktopNotificationCount = document.getElementById('notification-count');
+
+    if (mobileNotificationBell) {
+        mobileNotificationBell.addEventListener('click', function() {
+            // You can add mobile-specific notification handling here
+            const notificationBell = document.getElementById('notification-bell');
+            if (notificationBell) {
+                notificationBell.click();
+            }
+        });
+    }
+
+    // Sync notification counts
+    if (mobileNotificationCount && desktopNotificationCount) {
+        const observer = new MutationObserver(function(mutations) {
+            mutations.forEach(function(mutation) {
+                if (mutation.type === 'childList' || mutation.type === 'characterData') {
+                    mobileNotificationCount.textContent = desktopNotificationCount.textContent;
+                    if (desktopNotificationCount.classList.contains('hidden')) {
+                        mobileNotificationCount.classList.add('hidden');
+                    } else {
+                        mobileNotificationCount.classList.remove('hidden');
+                    }
+                }
+            });
+        });
+
+        observer.observe(desktopNotificationCount, {
+            childList: true,
+            characterData: true,
+            subtree: true
+        });
+    }
+
+    // Close mobile menu when clicking outside
+    document.addEventListener('click', function(event) {
+        if (mobileMenu && !mobileMenu.classList.contains('hidden')) {
+            const isClickInsideMenu = mobileMenu.contains(event.target);
+            const isClickOnTrigger = mobileMenuButton?.contains(event.target) || mobileMenuTrigger?.contains(event.target);
+
+            if (!isClickInsideMenu && !isClickOnTrigger) {
+                mobileMenu.classList.add('hidden');
+                if (menuIcon) {
+                    menuIcon.classList.remove('fa-times');
+                    menuIcon.classList.add('fa-bars');
+                }
+            }
+        }
+    });
+}
+
+// Initialize all avatars on page load
+document.addEventListener('DOMContentLoaded', function() {
+    initializeAvatars();
+    initializeMobileNavigation();
+});
@@ -0,0 +1,449 @@
+// Values from the page: data-* attributes of this script's tag
+const gamePage = document.currentScript.dataset;
+
+// Enhanced team roster functionality
+function addGoal(playerId) {
+    console.log('Adding goal for player:', playerId);
+    try {
+        // Create form and submit
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = gamePage.addEventUrl;
+
+        // Add hidden fields
+        const fields = [
+            {name: 'event_type', value: 'goal'},
+            {name: 'scorer_id', value: playerId},
+            {name: 'minute', value: 0}
+        ];
+
+        fields.forEach(field => {
+            const input = document.createElement('input');
+            input.type = 'hidden';
+            input.name = field.name;
+            input.value = field.value;
+            form.appendChild(input);
+        });
+
+        console.log('Submitting goal form:', form.action);
+        document.body.appendChild(form);
+        form.submit();
+    } catch (error) {
+        console.error('Error adding goal:', error);
+        showToast('Error adding goal. Please try again.', 'error');
+    }
+}
+
+function removeGoal(playerId) {
+    console.log('Removing goal for player:', playerId);
+    try {
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = gamePage.removeEventUrl;
+
+        const fields = [
+            {name: 'action', value: 'remove_goal'},
+            {name: 'player_id', value: playerId}
+        ];
+
+        fields.forEach(field => {
+            const input = document.createElement('input');
+            input.type = 'hidden';
+            input.name = field.name;
+            input.value = field.value;
+            form.appendChild(input);
+        });
+
+        console.log('Submitting remove goal form:', form.action);
+        document.body.appendChild(form);
+        form.submit();
+    } catch (error) {
+        console.error('Error removing goal:', error);
+        showToast('Error removing goal. Please try again.', 'error');
+    }
+}
+
+function addAssist(playerId) {
+    console.log('Adding assist for player:', playerId);
+    try {
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = gamePage.addAssistUrl;
+
+        const input = document.createElement('input');
+        input.type = 'hidden';
+        input.name = 'assist_player_id';
+        input.value = playerId;
+        form.appendChild(input);
+
+        console.log('Submitting assist form:', form.action);
+        document.body.appendChild(form);
+        form.submit();
+    } catch (error) {
+        console.error('Error adding assist:', error);
+        showToast('Error adding assist. Please try again.', 'error');
+    }
+}
+
+function removeAssist(playerId) {
+    console.log('Removing assist for player:', playerId);
+    try {
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = gamePage.removeEventUrl;
+
+        const fields = [
+            {name: 'action', value: 'remove_assist'},
+            {name: 'player_id', value: playerId}
+        ];
+
+        fields.forEach(field => {
+            const input = document.createElement('input');
+            input.type = 'hidden';
+            input.name = field.name;
+            input.value = field.value;
+            form.appendChild(input);
+        });
+
+        console.log('Submitting remove assist form:', form.action);
+        document.body.appendChild(form);
+        form.submit();
+    } catch (error) {
+        console.error('Error removing assist:', error);
+        showToast('Error removing assist. Please try again.', 'error');
+    }
+}
+
+function addOwnGoal(playerId) {
+    console.log('Adding own goal for player:', playerId);
+    try {
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = gamePage.addEventUrl;
+
+        const fields = [
+            {name: 'event_type', value: 'own_goal'},
+            {name: 'scorer_id', value: playerId},
+            {name: 'minute', value: 0}
+        ];
+
+        fields.forEach(field => {
+            const input = document.createElement('input');
+            input.type = 'hidden';
+            input.name = field.name;
+            input.value = field.value;
+            form.appendChild(input);
+        });
+
+        console.log('Submitting own goal form:', form.action);
+        document.body.appendChild(form);
+        form.submit();
+    } catch (error) {
+        console.error('Error adding own goal:', error);
+        showToast('Error adding own goal. Please try again.', 'error');
+    }
+}
+
+function removeOwnGoal(playerId) {
+    console.log('Removing own goal for player:', playerId);
+    try {
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = gamePage.removeEventUrl;
+
+        const fields = [
+            {name: 'action', value: 'remove_goal'},
+            {name: 'player_id', value: playerId}
+        ];
+
+        fields.forEach(field => {
+            const input = document.createElement('input');
+            input.type = 'hidden';
+            input.name = field.name;
+            input.value = field.value;
+            form.appendChild(input);
+        });
+
+        console.log('Submitting remove own goal form:', form.action);
+        document.body.appendChild(form);
+        form.submit();
+    } catch (error) {
+        console.error('Error removing own goal:', error);
+        showToast('Error removing own goal. Please try again.', 'error');
+    }
+}
+
+function votePOTM(playerId) {
+    // Create form and submit POTM vote
+    const form = document.createElement('form');
+    form.method = 'POST';
+    form.action = gamePage.votePotmUrl;
+
+    const input = document.createElement('input');
+    input.type = 'hidden';
+    input.name = 'voted_for_id';
+    input.value = playerId;
+    form.appendChild(input);
+
+    document.body.appendChild(form);
+    form.submit();
+}
+
+// Team tab switching functionality
+function switchTeamTab(teamId) {
+    // Hide all team content
+    const contents = document.querySelectorAll('.team-tab-content');
+    contents.forEach(content => content.classList.add('hidden'));
+
+    // Show selected team content
+    document.getElementById(teamId + '-content').classList.remove('hidden');
+
+    // Update tab button styles
+    const buttons = document.querySelectorAll('.team-tab-button');
+    buttons.forEach(button => {
+        button.classList.remove('text-blue-600', 'border-blue-500', 'bg-blue-50', 'text-red-600', 'border-red-500', 'bg-red-50');
+        button.classList.add('text-gray-600', 'border-transparent');
+        // Update badge colors
+        const badge = button.querySelector('span:last-child');
+        if (badge) {
+            badge.classList.remove('bg-blue-100', 'text-blue-800', 'bg-red-100', 'text-red-800');
+            badge.classList.add('bg-gray-100', 'text-gray-600');
+        }
+    });
+
+    // Highlight active tab
+    const activeButton = document.getElementById(teamId + '-tab');
+    const badge = activeButton.querySelector('span:last-child');
+
+    if (teamId === 'team-a') {
+        activeButton.classList.remove('text-gray-600', 'border-transparent');
+        activeButton.classList.add('text-blue-600', 'border-blue-500', 'bg-blue-50');
+        if (badge) {
+            badge.classList.remove('bg-gray-100', 'text-gray-600');
+            badge.classList.add('bg-blue-100', 'text-blue-800');
+        }
+    } else {
+        activeButton.classList.remove('text-gray-600', 'border-transparent');
+        activeButton.classList.add('text-red-600', 'border-red-500', 'bg-red-50');
+        if (badge) {
+            badge.classList.remove('bg-gray-100', 'text-gray-600');
+            badge.classList.add('bg-red-100', 'text-red-800');
+        }
+    }
+}
+
+// Game deletion functionality
+function confirmDeleteGame(gameId, gameDate) {
+    const message = `Are you sure you want to delete the game scheduled for ${gameDate}?\n\nThis action cannot be undone and will:\n• Remove all player availability votes\n• Delete any team assignments\n• Clear all game statistics\n• Cancel any notifications`;
+
+    if (confirm(message)) {
+        // Create form and submit deletion request
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = `/games/${gameId}/delete`;
+
+        document.body.appendChild(form);
+        form.submit();
+    }
+}
+
+// Add player to poll functionality (Admin only)
+function addPlayerAsIn(playerId, playerName) {
+    const searchInput = document.getElementById('playerSearch');
+    const resultsDiv = document.getElementById('playerResults');
+
+    // Hide search results and clear input
+    resultsDiv.classList.add('hidden');
+    searchInput.value = 'Adding...';
+    searchInput.disabled = true;
+
+    fetch(`/games/${gamePage.gameId}/add-player`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            player_id: playerId,
+            status: 'in'
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            // Show success message
+            showToast(`${playerName} added as IN`, 'success');
+            // Reload the page to update the UI
+            setTimeout(() => {
+                location.reload();
+            }, 1000);
+        } else {
+            showToast(data.error || 'Failed to add player', 'error');
+            searchInput.disabled = false;
+            searchInput.value = '';
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        showToast('Network error occurred', 'error');
+        searchInput.disabled = false;
+        searchInput.value = '';
+    });
+}
+
+// Remove player from poll functionality (Admin only)
+let playerToRemove = null;
+
+function removePlayerFromPoll(playerId, playerName) {
+    // Store the player data for the confirmation
+    playerToRemove = { id: playerId, name: playerName };
+
+    // Show player name in modal
+    document.getElementById('playerNameToRemove').textContent = playerName;
+
+    // Show the modal
+    document.getElementById('removePlayerModal').classList.remove('hidden');
+}
+
+function closeRemovePlayerModal() {
+    document.getElementById('removePlayerModal').classList.add('hidden');
+    playerToRemove = null;
+}
+
+function confirmRemovePlayer() {
+    if (!playerToRemove) return;
+
+    const playerId = playerToRemove.id;
+    const playerName = playerToRemove.name;
+
+    // Close modal
+    closeRemovePlayerModal();
+
+    // Perform the removal
+    fetch(`/games/${gamePage.gameId}/remove-player`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            player_id: playerId
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showToast(`${playerName} removed from poll`, 'success');
+            // Reload the page to update the UI
+            setTimeout(() => {
+                location.reload();
+            }, 1000);
+        } else {
+            showToast(data.error || 'Failed to remove player', 'error');
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        showToast('Network error occurred', 'error');
+    });
+}
+
+// Add event listener for the confirm button
+document.addEventListener('DOMContentLoaded', function() {
+    const confirmButton = document.getElementById('confirmRemovePlayer');
+    if (confirmButton) {
+        confirmButton.addEventListener('click', confirmRemovePlayer);
+    }
+
+    // Close modal when clicking outside
+    const modal = document.getElementById('removePlayerModal');
+    if (modal) {
+        modal.addEventListener('click', function(event) {
+            if (event.target === modal) {
+                closeRemovePlayerModal();
+            }
+        });
+    }
+});
+
+// Search functionality for unvoted players
+function filterPlayers(searchTerm) {
+    const resultsDiv = document.getElementById('playerResults');
+    const playerOptions = resultsDiv.querySelectorAll('.player-option');
+
+    if (searchTerm.trim() === '') {
+        resultsDiv.classList.add('hidden');
+        return;
+    }
+
+    const searchLower = searchTerm.toLowerCase();
+    let hasVisibleResults = false;
+
+    playerOptions.forEach(option => {
+        const playerName = option.getAttribute('data-player-name').toLowerCase();
+        if (playerName.includes(searchLower)) {
+            option.style.display = 'block';
+            hasVisibleResults = true;
+        } else {
+            option.style.display = 'none';
+        }
+    });
+
+    if (hasVisibleResults) {
+        resultsDiv.classList.remove('hidden');
+    } else {
+        resultsDiv.classList.add('hidden');
+    }
+}
+
+// Close search results when clicking outside
+document.addEventListener('click', function(event) {
+    const searchInput = document.getElementById('playerSearch');
+    const resultsDiv = document.getElementById('playerResults');
+
+    if (searchInput && resultsDiv && !searchInput.contains(event.target) && !resultsDiv.contains(event.target)) {
+        resultsDiv.classList.add('hidden');
+    }
+});
+
+// Add player to poll functionality (Admin only) - Legacy function for backward compatibility
+function addPlayerToPoll(playerId, status, playerName) {
+    // This function is kept for backward compatibility but redirects to the new simplified function
+    if (status === 'in') {
+        addPlayerAsIn(playerId, playerName);
+    } else {
+        // For non-IN statuses, use the original implementation if needed
+        const button = event.target;
+        const originalText = button.textContent;
+        button.disabled = true;
+        button.textContent = 'Adding...';
+
+        fetch(`/games/${gamePage.gameId}/add-player`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                player_id: playerId,
+                status: status
+            })
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showToast(`${playerName} added as ${status.toUpperCase()}`, 'success');
+                setTimeout(() => {
+                    location.reload();
+                }, 1000);
+            } else {
+                showToast(data.error || 'Failed to add player', 'error');
+                button.disabled = false;
+                button.textContent = originalText;
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            showToast('Network error occurred', 'error');
+            button.disabled = false;
+            button.textContent = originalText;
+        });
+    }
+}
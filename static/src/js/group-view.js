@@ -0,0 +1,949 @@
+// Values from the page: data-* attributes of this script's tag
+const groupPage = document.currentScript.dataset;
+
+function showTab(tabName) {
+    // Hide all tab contents
+    const contents = document.querySelectorAll('.tab-content');
+    contents.forEach(content => content.classList.add('hidden'));
+
+    // Show selected tab content
+    const targetContent = document.getElementById(tabName + '-content');
+    if (targetContent) {
+        targetContent.classList.remove('hidden');
+    }
+
+    // Update desktop tab button styles
+    const buttons = document.querySelectorAll('.tab-button');
+    buttons.forEach(button => {
+        // Remove active styles
+        button.classList.remove('bg-blue-600', 'text-white', 'shadow-sm');
+        // Add inactive styles
+        button.classList.add('text-gray-600', 'hover:text-gray-900', 'hover:bg-white', 'hover:shadow-sm');
+    });
+
+    // Highlight active tab
+    const activeButton = document.getElementById(tabName + '-tab');
+    if (activeButton) {
+        // Remove inactive styles
+        activeButton.classList.remove('text-gray-600', 'hover:text-gray-900', 'hover:bg-white', 'hover:shadow-sm');
+        // Add active styles
+        activeButton.classList.add('bg-blue-600', 'text-white', 'shadow-sm');
+    }
+
+    // Update mobile selector
+    const mobileSelector = document.getElementById('mobile-tab-selector');
+    if (mobileSelector) {
+        mobileSelector.value = tabName;
+    }
+}
+
+// Handle mobile tab selector change
+document.addEventListener('DOMContentLoaded', function() {
+    const mobileSelector = document.getElementById('mobile-tab-selector');
+    if (mobileSelector) {
+        mobileSelector.addEventListener('change', function() {
+            showTab(this.value);
+        });
+    }
+});
+
+// Initialize with appropriate tab based on URL hash or default to overview
+document.addEventListener('DOMContentLoaded', function() {
+    const hash = window.location.hash;
+    const tabName = hash ? hash.substring(1) : 'overview';
+
+    // Check if the tab exists, otherwise default to overview
+    const validTabs = ['overview', 'games', 'members', 'leaderboard', 'stats', 'attributes'];
+    const targetTab = validTabs.includes(tabName) ? tabName : 'overview';
+
+    showTab(targetTab);
+});
+
+// Add click event listeners for tabs (backup in case onclick fails)
+document.addEventListener('DOMContentLoaded', function() {
+    const tabButtons = document.querySelectorAll('.tab-button');
+    tabButtons.forEach(button => {
+        button.addEventListener('click', function() {
+            const tabName = this.id.replace('-tab', '');
+            showTab(tabName);
+        });
+    });
+});
+
+// Game invite sharing functionality
+function shareGameInvite(gameId, gameTime, groupName) {
+    // Create the shareable game URL
+    const gameUrl = `${window.location.origin}/games/${gameId}`;
+    const shareText = `🏈 Join us for football!\n\n${groupName}\n${gameTime}\n\nClick to vote on your availability:\n${gameUrl}`;
+
+    // Check if the Web Share API is available
+    if (navigator.share) {
+        navigator.share({
+            title: `${groupName} - Football Game`,
+            text: shareText,
+            url: gameUrl
+        }).then(() => {
+            console.log('Shared successfully');
+        }).catch((error) => {
+            console.log('Error sharing:', error);
+            fallbackShare(shareText);
+        });
+    } else {
+        fallbackShare(shareText);
+    }
+}
+
+// Fallback sharing method
+function fallbackShare(shareText) {
+    // Try to copy to clipboard
+    if (navigator.clipboard && navigator.clipboard.writeText) {
+        navigator.clipboard.writeText(shareText).then(() => {
+            showToast('Game invite copied to clipboard!', 'success');
+        }).catch(() => {
+            showShareModal(shareText);
+        });
+    } else {
+        showShareModal(shareText);
+    }
+}
+
+// Show share modal with the text
+function showShareModal(shareText) {
+    const modal = document.createElement('div');
+    modal.className = 'fixed inset-0 bg-gray-600 bg-opacity-50 overflow-y-auto h-full w-full z-50';
+    modal.innerHTML = `
+        <div class="relative top-20 mx-auto p-5 border w-96 shadow-lg rounded-md bg-white">
+            <div class="mt-3">
+                <div class="flex items-center justify-between mb-4">
+                    <h3 class="text-lg font-medium text-gray-900">Share Game Invite</h3>
+                    <button onclick="this.closest('.fixed').remove()" class="text-gray-400 hover:text-gray-600">
+                        <i class="fas fa-times"></i>
+                    </button>
+                </div>
+                <div class="mt-2 px-4 py-3 bg-gray-50 rounded-lg">
+                    <textarea id="shareText" class="w-full h-32 text-sm text-gray-700 bg-transparent border-none resize-none focus:outline-none" readonly>${shareText}</textarea>
+                </div>
+                <div class="items-center px-4 py-3">
+                    <button onclick="copyShareText()" class="px-4 py-2 bg-blue-500 text-white text-base font-medium rounded-md w-full shadow-sm hover:bg-blue-700">
+                        <i class="fas fa-copy mr-2"></i>Copy to Clipboard
+                    </button>
+                </div>
+            </div>
+        </div>
+    `;
+    document.body.appendChild(modal);
+}
+
+// Copy share text function
+function copyShareText() {
+    const textArea = document.getElementById('shareText');
+    textArea.select();
+    document.execCommand('copy');
+    showToast('Copied to clipboard!', 'success');
+    document.querySelector('.fixed').remove();
+}
+
+// Toast notifications are now handled globally by base.html
+
+// Leaderboard sorting functionality
+let currentSortColumn = 'points';
+let currentSortDirection = 'desc';
+
+function initializeLeaderboardSorting() {
+    const sortableHeaders = document.querySelectorAll('.sortable');
+    sortableHeaders.forEach(header => {
+        header.addEventListener('click', function() {
+            const column = this.getAttribute('data-column');
+            sortLeaderboard(column);
+        });
+    });
+
+    // Set initial sort indicators
+    updateSortIndicators();
+}
+
+function sortLeaderboard(column) {
+    const tbody = document.getElementById('leaderboard-tbody');
+    const rows = Array.from(tbody.querySelectorAll('.leaderboard-row'));
+
+    // Determine sort direction
+    if (currentSortColumn === column) {
+        currentSortDirection = currentSortDirection === 'asc' ? 'desc' : 'asc';
+    } else {
+        currentSortColumn = column;
+        currentSortDirection = getDefaultSortDirection(column);
+    }
+
+    // Sort rows based on column and direction
+    rows.sort((a, b) => {
+        const aData = JSON.parse(a.getAttribute('data-player-data'));
+        const bData = JSON.parse(b.getAttribute('data-player-data'));
+
+        let aValue, bValue;
+
+        switch(column) {
+            case 'rank':
+                aValue = getCurrentRank(a);
+                bValue = getCurrentRank(b);
+                break;
+            case 'player':
+                aValue = aData.display_name.toLowerCase();
+                bValue = bData.display_name.toLowerCase();
+                break;
+            case 'points':
+                aValue = aData.points;
+                bValue = bData.points;
+                break;
+            case 'games':
+                aValue = aData.games_played;
+                bValue = bData.games_played;
+                break;
+            case 'wins':
+                aValue = aData.wins;
+                bValue = bData.wins;
+                break;
+            case 'draws':
+                aValue = aData.draws;
+                bValue = bData.draws;
+                break;
+            case 'losses':
+                aValue = aData.losses;
+                bValue = bData.losses;
+                break;
+            case 'goals':
+                aValue = aData.goals;
+                bValue = bData.goals;
+                break;
+            case 'assists':
+                aValue = aData.assists;
+                bValue = bData.assists;
+                break;
+            case 'own_goals':
+                aValue = aData.own_goals;
+                bValue = bData.own_goals;
+                break;
+            case 'potm':
+                aValue = aData.potm_awards;
+                bValue = bData.potm_awards;
+                break;
+            case 'contributions':
+                aValue = aData.total_contributions;
+                bValue = bData.total_contributions;
+                break;
+            default:
+                return 0;
+        }
+
+        // Handle string vs number comparison
+        if (typeof aValue === 'string') {
+            return currentSortDirection === 'asc' ? 
+                aValue.localeCompare(bValue) : 
+                bValue.localeCompare(aValue);
+        } else {
+            return currentSortDirection === 'asc' ? 
+                aValue - bValue : 
+                bValue - aValue;
+        }
+    });
+
+    // Re-append sorted rows
+    rows.forEach(row => tbody.appendChild(row));
+
+    // Update rank numbers if sorting by rank
+    if (column === 'rank') {
+        updateRankNumbers();
+    }
+
+    // Update sort indicators
+    updateSortIndicators();
+}
+
+function getCurrentRank(row) {
+    const rankCell = row.querySelector('td:first-child div');
+    const crownIcon = rankCell.querySelector('i.fa-crown');
+    if (crownIcon) return 1;
+
+    const rankText = rankCell.textContent.trim();
+    return parseInt(rankText) || 999;
+}
+
+function getDefaultSortDirection(column) {
+    // Most columns should sort high to low by default
+    const ascendingColumns = ['player', 'rank', 'own_goals'];
+    return ascendingColumns.includes(column) ? 'asc' : 'desc';
+}
+
+function updateSortIndicators() {
+    // Reset all sort icons
+    document.querySelectorAll('.sort-icon').forEach(icon => {
+        icon.className = 'fas fa-sort text-gray-400 sort-icon';
+    });
+
+    // Update active sort icon
+    const activeHeader = document.querySelector(`[data-column="${currentSortColumn}"]`);
+    if (activeHeader) {
+        const sortIcon = activeHeader.querySelector('.sort-icon');
+        if (currentSortDirection === 'asc') {
+            sortIcon.className = 'fas fa-sort-up text-blue-600 sort-icon';
+        } else {
+            sortIcon.className = 'fas fa-sort-down text-blue-600 sort-icon';
+        }
+    }
+}
+
+function updateRankNumbers() {
+    const tbody = document.getElementById('leaderboard-tbody');
+    const rows = Array.from(tbody.querySelectorAll('.leaderboard-row'));
+
+    rows.forEach((row, index) => {
+        const rankCell = row.querySelector('td:first-child div');
+        const rank = index + 1;
+
+        // Update rank display
+        if (rank === 1) {
+            rankCell.innerHTML = '<i class="fas fa-crown"></i>';
+            rankCell.className = 'flex items-center justify-center w-8 h-8 bg-gradient-to-r from-yellow-400 to-yellow-500 rounded-full text-white font-bold text-sm';
+        } else if (rank === 2) {
+            rankCell.textContent = '2';
+            rankCell.className = 'flex items-center justify-center w-8 h-8 bg-gradient-to-r from-gray-300 to-gray-400 rounded-full text-white font-bold text-sm';
+        } else if (rank === 3) {
+            rankCell.textContent = '3';
+            rankCell.className = 'flex items-center justify-center w-8 h-8 bg-gradient-to-r from-orange-300 to-orange-400 rounded-full text-white font-bold text-sm';
+        } else {
+            rankCell.textContent = rank;
+            rankCell.className = 'flex items-center justify-center w-8 h-8 bg-gray-100 rounded-full text-gray-600 font-semibold text-sm';
+        }
+    });
+}
+
+// Initialize leaderboard sorting when document is loaded
+document.addEventListener('DOMContentLoaded', function() {
+    showTab('overview');
+    // The leaderboard is cached for all members; mark the viewer's row here
+    document.querySelectorAll('[data-you-marker="' + groupPage.userId + '"]').forEach(function(marker) {
+        marker.classList.remove('hidden');
+    });
+    initializeLeaderboardSorting();
+    initializePlayerAttributesSearch();
+});
+
+// Player Attributes Search and Filter functionality
+function initializePlayerAttributesSearch() {
+    const searchInput = document.getElementById('player-search');
+    const positionFilter = document.getElementById('position-filter');
+
+    if (searchInput) {
+        searchInput.addEventListener('input', filterPlayers);
+    }
+    if (positionFilter) {
+        positionFilter.addEventListener('change', filterPlayers);
+    }
+}
+
+function filterPlayers() {
+    const searchTerm = document.getElementById('player-search').value.toLowerCase();
+    const positionFilter = document.getElementById('position-filter').value;
+    const playerCards = document.querySelectorAll('.player-card');
+
+    playerCards.forEach(card => {
+        const playerName = card.getAttribute('data-player-name');
+        const playerPosition = card.getAttribute('data-player-position');
+
+        const matchesSearch = playerName.includes(searchTerm);
+        const matchesPosition = !positionFilter || playerPosition === positionFilter;
+
+        if (matchesSearch && matchesPosition) {
+            card.style.display = 'block';
+        } else {
+            card.style.display = 'none';
+        }
+    });
+}
+
+// Edit Player Attributes Modal
+function editPlayerAttributes(playerId, playerName) {
+    const modalHtml = `
+        <div id="attributes-modal" class="fixed inset-0 bg-black bg-opacity-50 overflow-y-auto h-full w-full z-50 flex items-center justify-center p-4">
+            <div class="relative bg-white rounded-lg shadow-xl max-w-4xl w-full max-h-[90vh] overflow-hidden">
+                <!-- Header -->
+                <div class="bg-gradient-to-r from-blue-600 to-indigo-600 px-6 py-4">
+                    <div class="flex items-center justify-between">
+                        <div class="flex items-center space-x-3">
+                            <div class="h-10 w-10 bg-white bg-opacity-20 rounded-lg flex items-center justify-center">
+                                <i class="fas fa-chart-radar text-white"></i>
+                            </div>
+                            <div>
+                                <h3 class="text-lg font-semibold text-white">Player Attributes</h3>
+                                <p class="text-blue-100 text-sm">${playerName}</p>
+                            </div>
+                        </div>
+                        <button onclick="closeAttributesModal()" class="text-white hover:text-blue-200 transition-colors">
+                            <i class="fas fa-times text-xl"></i>
+                        </button>
+                    </div>
+                </div>
+
+                <!-- Content -->
+                <div class="overflow-y-auto max-h-[calc(90vh-80px)]">
+                    <form id="attributes-form" class="p-6">
+                        <input type="hidden" name="player_id" value="${playerId}">
+
+                        <!-- Position & Overall -->
+                        <div class="bg-gray-50 rounded-lg p-4 mb-6">
+                            <div class="grid grid-cols-1 md:grid-cols-2 gap-4">
+                                <div>
+                                    <label class="block text-sm font-medium text-gray-700 mb-2">
+                                        <i class="fas fa-map-marker-alt text-blue-600 mr-2"></i>
+                                        Preferred Position
+                                    </label>
+                                    <select name="preferred_position" class="w-full px-3 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-blue-500">
+                                        <option value="">Select Position</option>
+                                        <option value="GK">🥅 Goalkeeper</option>
+                                        <option value="DEF">🛡️ Defender</option>
+                                        <option value="MID">⚙️ Midfielder</option>
+                                        <option value="FWD">⚡ Forward</option>
+                                    </select>
+                                </div>
+                                <div>
+                                    <label class="block text-sm font-medium text-gray-700 mb-2">
+                                        <i class="fas fa-star text-yellow-500 mr-2"></i>
+                                        Overall Rating
+                                    </label>
+                                    <div class="bg-white rounded-lg border border-gray-300 p-3">
+                                        <div class="text-center">
+                                            <span id="overall-rating" class="text-2xl font-bold text-blue-600">5.0</span>
+                                            <span class="text-gray-500">/10</span>
+                                        </div>
+                                    </div>
+                                </div>
+                            </div>
+                        </div>
+
+                        <!-- Attributes Grid -->
+                        <div class="grid grid-cols-1 lg:grid-cols-2 gap-6 mb-6">
+                            <!-- Physical Attributes -->
+                            <div class="bg-red-50 border border-red-200 rounded-lg p-4">
+                                <h4 class="text-lg font-semibold text-red-800 mb-4 flex items-center">
+                                    <i class="fas fa-dumbbell mr-2"></i>Physical
+                                    <span id="physical-avg" class="ml-auto text-sm bg-red-100 px-2 py-1 rounded">0.0</span>
+                                </h4>
+                                <div class="space-y-4">
+                                    ${createModernAttributeSlider('pace', 'Pace', '🏃‍♂️')}
+                                    ${createModernAttributeSlider('stamina', 'Stamina', '💪')}
+                                    ${createModernAttributeSlider('strength', 'Strength', '🏋️‍♂️')}
+                                    ${createModernAttributeSlider('agility', 'Agility', '🤸‍♂️')}
+                                    ${createModernAttributeSlider('jumping', 'Jumping', '⬆️')}
+                                </div>
+                            </div>
+
+                            <!-- Technical Attributes -->
+                            <div class="bg-blue-50 border border-blue-200 rounded-lg p-4">
+                                <h4 class="text-lg font-semibold text-blue-800 mb-4 flex items-center">
+                                    <i class="fas fa-futbol mr-2"></i>Technical
+                                    <span id="technical-avg" class="ml-auto text-sm bg-blue-100 px-2 py-1 rounded">0.0</span>
+                                </h4>
+                                <div class="space-y-4">
+                                    ${createModernAttributeSlider('ball_control', 'Ball Control', '⚽')}
+                                    ${createModernAttributeSlider('dribbling', 'Dribbling', '🕺')}
+                                    ${createModernAttributeSlider('passing', 'Passing', '🎯')}
+                                    ${createModernAttributeSlider('shooting', 'Shooting', '🥅')}
+                                    ${createModernAttributeSlider('crossing', 'Crossing', '📐')}
+                                    ${createModernAttributeSlider('free_kicks', 'Free Kicks', '🎪')}
+                                </div>
+                            </div>
+
+                            <!-- Tactical Attributes -->
+                            <div class="bg-green-50 border border-green-200 rounded-lg p-4">
+                                <h4 class="text-lg font-semibold text-green-800 mb-4 flex items-center">
+                                    <i class="fas fa-chess mr-2"></i>Tactical
+                                    <span id="tactical-avg" class="ml-auto text-sm bg-green-100 px-2 py-1 rounded">0.0</span>
+                                </h4>
+                                <div class="space-y-4">
+                                    ${createModernAttributeSlider('positioning', 'Positioning', '📍')}
+                                    ${createModernAttributeSlider('marking', 'Marking', '👥')}
+                                    ${createModernAttributeSlider('tackling', 'Tackling', '🛑')}
+                                    ${createModernAttributeSlider('interceptions', 'Interceptions', '🚫')}
+                                    ${createModernAttributeSlider('vision', 'Vision', '👁️')}
+                                    ${createModernAttributeSlider('decision_making', 'Decision Making', '🧠')}
+                                </div>
+                            </div>
+
+                            <!-- Mental Attributes -->
+                            <div class="bg-purple-50 border border-purple-200 rounded-lg p-4">
+                                <h4 class="text-lg font-semibold text-purple-800 mb-4 flex items-center">
+                                    <i class="fas fa-brain mr-2"></i>Mental
+                                    <span id="mental-avg" class="ml-auto text-sm bg-purple-100 px-2 py-1 rounded">0.0</span>
+                                </h4>
+                                <div class="space-y-4">
+                                    ${createModernAttributeSlider('composure', 'Composure', '😌')}
+                                    ${createModernAttributeSlider('concentration', 'Concentration', '🎯')}
+                                    ${createModernAttributeSlider('determination', 'Determination', '💪')}
+                                    ${createModernAttributeSlider('leadership', 'Leadership', '👑')}
+                                    ${createModernAttributeSlider('teamwork', 'Teamwork', '🤝')}
+                                </div>
+                            </div>
+                        </div>
+
+                        <!-- Goalkeeping Attributes (Hidden by default) -->
+                        <div id="goalkeeping-section" class="bg-yellow-50 border border-yellow-200 rounded-lg p-4 mb-6" style="display: none;">
+                            <h4 class="text-lg font-semibold text-yellow-800 mb-4 flex items-center">
+                                <i class="fas fa-hand-paper mr-2"></i>Goalkeeping
+                                <span id="goalkeeping-avg" class="ml-auto text-sm bg-yellow-100 px-2 py-1 rounded">0.0</span>
+                            </h4>
+                            <div class="grid grid-cols-1 md:grid-cols-2 gap-4">
+                                ${createModernAttributeSlider('goalkeeping', 'Goalkeeping', '🥅')}
+                                ${createModernAttributeSlider('handling', 'Handling', '🧤')}
+                                ${createModernAttributeSlider('distribution', 'Distribution', '🎯')}
+                                ${createModernAttributeSlider('aerial_reach', 'Aerial Reach', '🦅')}
+                            </div>
+                        </div>
+
+                        <!-- Notes -->
+                        <div class="bg-gray-50 rounded-lg p-4 mb-6">
+                            <label class="block text-sm font-medium text-gray-700 mb-2">
+                                <i class="fas fa-sticky-note mr-2 text-gray-600"></i>
+                                Additional Notes
+                            </label>
+                            <textarea name="notes" rows="3" class="w-full px-3 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-blue-500" placeholder="Any additional notes about the player's abilities, playing style, or areas for improvement..."></textarea>
+                        </div>
+
+                        <!-- Action Buttons -->
+                        <div class="flex justify-end space-x-3 pt-4 border-t border-gray-200">
+                            <button type="button" onclick="closeAttributesModal()" class="px-6 py-2 border border-gray-300 text-gray-700 rounded-lg hover:bg-gray-50 font-medium transition-colors">
+                                Cancel
+                            </button>
+                            <button type="submit" class="px-6 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 font-medium transition-colors">
+                                <i class="fas fa-save mr-2"></i>Save Attributes
+                            </button>
+                        </div>
+                    </form>
+                </div>
+            </div>
+        </div>
+    `;
+
+    document.body.insertAdjacentHTML('beforeend', modalHtml);
+    initializeAttributesModal(playerId);
+}
+
+function createModernAttributeSlider(name, label, emoji) {
+    return `
+        <div class="space-y-2">
+            <div class="flex items-center justify-between">
+                <label class="text-sm font-medium text-gray-700 flex items-center">
+                    <span class="mr-2">${emoji}</span>
+                    ${label}
+                </label>
+                <div class="flex items-center space-x-2">
+                    <span id="${name}-value" class="text-sm font-bold text-gray-900 min-w-[20px] text-center">5</span>
+                    <div class="flex space-x-1">
+                        ${Array.from({length: 10}, (_, i) => `<div class="w-2 h-2 rounded-full bg-gray-200 ${name}-dot" data-value="${i + 1}"></div>`).join('')}
+                    </div>
+                </div>
+            </div>
+            <input type="range" name="${name}" id="${name}-slider" min="1" max="10" value="5" 
+                   class="w-full h-2 bg-gray-200 rounded-lg appearance-none cursor-pointer slider"
+                   oninput="updateModernSliderValue('${name}')">
+        </div>
+    `;
+}
+
+function updateModernSliderValue(attributeName) {
+    const slider = document.getElementById(attributeName + '-slider');
+    const valueDisplay = document.getElementById(attributeName + '-value');
+    valueDisplay.textContent = slider.value;
+
+    // Update dots visualization
+    const dots = document.querySelectorAll(`.${attributeName}-dot`);
+    dots.forEach((dot, index) => {
+        if (index < slider.value) {
+            dot.classList.remove('bg-gray-200');
+            dot.classList.add('bg-blue-500');
+        } else {
+            dot.classList.remove('bg-blue-500');
+            dot.classList.add('bg-gray-200');
+        }
+    });
+
+    // Update category averages
+    updateCategoryAverages();
+}
+
+function updateCategoryAverages() {
+    const categories = {
+        physical: ['pace', 'stamina', 'strength', 'agility', 'jumping'],
+        technical: ['ball_control', 'dribbling', 'passing', 'shooting', 'crossing', 'free_kicks'],
+        tactical: ['positioning', 'marking', 'tackling', 'interceptions', 'vision', 'decision_making'],
+        mental: ['composure', 'concentration', 'determination', 'leadership', 'teamwork'],
+        goalkeeping: ['goalkeeping', 'handling', 'distribution', 'aerial_reach']
+    };
+
+    Object.keys(categories).forEach(category => {
+        const attributes = categories[category];
+        let total = 0;
+        let count = 0;
+
+        attributes.forEach(attr => {
+            const slider = document.getElementById(attr + '-slider');
+            if (slider) {
+                total += parseInt(slider.value);
+                count++;
+            }
+        });
+
+        if (count > 0) {
+            const avg = (total / count).toFixed(1);
+            const avgElement = document.getElementById(category + '-avg');
+            if (avgElement) {
+                avgElement.textContent = avg;
+            }
+        }
+    });
+
+    // Update overall rating
+    const allSliders = document.querySelectorAll('#attributes-form input[type="range"]');
+    let totalRating = 0;
+    allSliders.forEach(slider => {
+        totalRating += parseInt(slider.value);
+    });
+    const overallRating = (totalRating / allSliders.length).toFixed(1);
+    const overallElement = document.getElementById('overall-rating');
+    if (overallElement) {
+        overallElement.textContent = overallRating;
+    }
+}
+
+function initializeAttributesModal(playerId) {
+    const form = document.getElementById('attributes-form');
+    const positionSelect = form.querySelector('[name="preferred_position"]');
+    const goalkeepingSection = document.getElementById('goalkeeping-section');
+
+    // Show/hide goalkeeping section based on position
+    positionSelect.addEventListener('change', function() {
+        if (this.value === 'GK') {
+            goalkeepingSection.style.display = 'block';
+        } else {
+            goalkeepingSection.style.display = 'none';
+        }
+    });
+
+    // Load existing attributes if they exist
+    loadPlayerAttributes(playerId);
+
+    // Handle form submission
+    form.addEventListener('submit', function(e) {
+        e.preventDefault();
+        savePlayerAttributes();
+    });
+}
+
+function loadPlayerAttributes(playerId) {
+    fetch(`/groups/${groupPage.groupId}/players/${playerId}/attributes`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.admin_attributes) {
+                const form = document.getElementById('attributes-form');
+                const attributes = data.admin_attributes;
+
+                // Set position
+                if (attributes.preferred_position) {
+                    form.querySelector('[name="preferred_position"]').value = attributes.preferred_position;
+
+                    // Show goalkeeping section if GK
+                    if (attributes.preferred_position === 'GK') {
+                        document.getElementById('goalkeeping-section').style.display = 'block';
+                    }
+                }
+
+                // Set all attribute values
+                const attributeNames = [
+                    'pace', 'stamina', 'strength', 'agility', 'jumping',
+                    'ball_control', 'dribbling', 'passing', 'shooting', 'crossing', 'free_kicks',
+                    'positioning', 'marking', 'tackling', 'interceptions', 'vision', 'decision_making',
+                    'composure', 'concentration', 'determination', 'leadership', 'teamwork',
+                    'goalkeeping', 'handling', 'distribution', 'aerial_reach'
+                ];
+
+                attributeNames.forEach(attr => {
+                    if (attributes[attr] !== undefined) {
+                        const slider = document.getElementById(attr + '-slider');
+                        const valueDisplay = document.getElementById(attr + '-value');
+                        if (slider && valueDisplay) {
+                            slider.value = attributes[attr];
+                            valueDisplay.textContent = attributes[attr];
+                        }
+                    }
+                });
+
+                // Set notes
+                if (attributes.notes) {
+                    form.querySelector('[name="notes"]').value = attributes.notes;
+                }
+            }
+        })
+        .catch(error => {
+            console.error('Error loading player attributes:', error);
+        });
+}
+
+function savePlayerAttributes() {
+    const form = document.getElementById('attributes-form');
+    const formData = new FormData(form);
+    const playerId = formData.get('player_id');
+
+    fetch(`/groups/${groupPage.groupId}/players/${playerId}/attributes`, {
+        method: 'POST',
+        body: formData
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            closeAttributesModal();
+            // Stay on the attributes tab and update the player's card
+            showTab('attributes');
+            // Update the specific player's card with new data
+            const playerId = document.getElementById('attributes-form').querySelector('[name="player_id"]').value;
+            updatePlayerCard(playerId);
+        } else {
+            showToast(data.error || 'Failed to update attributes', 'error');
+        }
+    })
+    .catch(error => {
+        console.error('Error saving player attributes:', error);
+        showToast('Error saving attributes', 'error');
+    });
+}
+
+function updatePlayerCard(playerId) {
+    // Fetch updated player data and re-render their card
+    fetch(`/groups/${groupPage.groupId}/players/${playerId}/attributes`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.averaged_attributes) {
+                // Find the player card element
+                const playerCard = document.querySelector(`[data-player-id="${playerId}"]`);
+                if (playerCard) {
+                    // Update the card content with new attributes
+                    updatePlayerCardDisplay(playerCard, data.averaged_attributes, data.player_name);
+                    showToast('Player attributes updated successfully!', 'success');
+                } else {
+                    // Card not found, just show success message
+                    showToast('Player attributes updated successfully!', 'success');
+                }
+            } else {
+                showToast('Player attributes updated successfully!', 'success');
+            }
+        })
+        .catch(error => {
+            console.error('Error updating player card:', error);
+            // Show success message since the save actually worked
+            showToast('Player attributes updated successfully!', 'success');
+        });
+}
+
+function updatePlayerCardDisplay(playerCard, attributes, playerName) {
+    // Calculate category averages
+    const categories = {
+        physical: {
+            pace: attributes.pace || 5,
+            stamina: attributes.stamina || 5,
+            strength: attributes.strength || 5,
+            agility: attributes.agility || 5,
+            jumping: attributes.jumping || 5
+        },
+        technical: {
+            ball_control: attributes.ball_control || 5,
+            dribbling: attributes.dribbling || 5,
+            passing: attributes.passing || 5,
+            shooting: attributes.shooting || 5,
+            crossing: attributes.crossing || 5,
+            free_kicks: attributes.free_kicks || 5
+        },
+        tactical: {
+            positioning: attributes.positioning || 5,
+            marking: attributes.marking || 5,
+            tackling: attributes.tackling || 5,
+            interceptions: attributes.interceptions || 5,
+            vision: attributes.vision || 5,
+            decision_making: attributes.decision_making || 5
+        },
+        mental: {
+            composure: attributes.composure || 5,
+            concentration: attributes.concentration || 5,
+            determination: attributes.determination || 5,
+            leadership: attributes.leadership || 5,
+            teamwork: attributes.teamwork || 5
+        }
+    };
+
+    // Add goalkeeping if position is GK
+    if (attributes.preferred_position === 'GK') {
+        categories.goalkeeping = {
+            goalkeeping: attributes.goalkeeping || 1,
+            handling: attributes.handling || 1,
+            distribution: attributes.distribution || 1,
+            aerial_reach: attributes.aerial_reach || 1
+        };
+    }
+
+    // Calculate averages
+    const categoryAverages = {};
+    for (const [categoryName, categoryAttrs] of Object.entries(categories)) {
+        const values = Object.values(categoryAttrs);
+        categoryAverages[categoryName] = values.reduce((a, b) => a + b, 0) / values.length;
+    }
+
+    // Update the player card data attributes
+    playerCard.setAttribute('data-player-position', attributes.preferred_position || '');
+
+    // Find the position badge and update it
+    const positionBadge = playerCard.querySelector('.bg-green-100');
+    if (positionBadge && attributes.preferred_position) {
+        let positionText = '';
+        let icon = '';
+
+        switch(attributes.preferred_position) {
+            case 'GK':
+                icon = 'fas fa-hand-paper';
+                positionText = 'Goalkeeper';
+                break;
+            case 'DEF':
+                icon = 'fas fa-shield-alt';
+                positionText = 'Defender';
+                break;
+            case 'MID':
+                icon = 'fas fa-cogs';
+                positionText = 'Midfielder';
+                break;
+            case 'FWD':
+                icon = 'fas fa-running';
+                positionText = 'Forward';
+                break;
+        }
+
+        positionBadge.innerHTML = `<i class="${icon} mr-1"></i>${positionText}`;
+    }
+
+    // Generate progress bars HTML
+    function generateProgressBars(categoryAttrs, colorClass) {
+        return Object.values(categoryAttrs).map(value => 
+            `<div class="flex-1 bg-${colorClass}-200 rounded-full h-2">
+                <div class="bg-${colorClass}-500 h-2 rounded-full" style="width: ${value * 10}%"></div>
+            </div>`
+        ).join('');
+    }
+
+    // Find the attributes container and update it
+    const attributesContainer = playerCard.querySelector('.space-y-3');
+    if (attributesContainer) {
+        let newContent = '';
+
+        // Physical attributes
+        newContent += `
+            <div class="bg-red-50 rounded-lg p-3">
+                <div class="flex items-center justify-between mb-2">
+                    <span class="text-sm font-medium text-red-700">
+                        <i class="fas fa-running mr-1"></i>Physical
+                    </span>
+                    <span class="text-sm font-bold text-red-800">
+                        ${categoryAverages.physical.toFixed(1)}
+                    </span>
+                </div>
+                <div class="flex space-x-1">
+                    ${generateProgressBars(categories.physical, 'red')}
+                </div>
+            </div>`;
+
+        // Technical attributes
+        newContent += `
+            <div class="bg-blue-50 rounded-lg p-3">
+                <div class="flex items-center justify-between mb-2">
+                    <span class="text-sm font-medium text-blue-700">
+                        <i class="fas fa-futbol mr-1"></i>Technical
+                    </span>
+                    <span class="text-sm font-bold text-blue-800">
+                        ${categoryAverages.technical.toFixed(1)}
+                    </span>
+                </div>
+                <div class="flex space-x-1">
+                    ${generateProgressBars(categories.technical, 'blue')}
+                </div>
+            </div>`;
+
+        // Tactical attributes
+        newContent += `
+            <div class="bg-green-50 rounded-lg p-3">
+                <div class="flex items-center justify-between mb-2">
+                    <span class="text-sm font-medium text-green-700">
+                        <i class="fas fa-chess mr-1"></i>Tactical
+                    </span>
+                    <span class="text-sm font-bold text-green-800">
+                        ${categoryAverages.tactical.toFixed(1)}
+                    </span>
+                </div>
+                <div class="flex space-x-1">
+                    ${generateProgressBars(categories.tactical, 'green')}
+                </div>
+            </div>`;
+
+        // Mental attributes
+        newContent += `
+            <div class="bg-purple-50 rounded-lg p-3">
+                <div class="flex items-center justify-between mb-2">
+                    <span class="text-sm font-medium text-purple-700">
+                        <i class="fas fa-brain mr-1"></i>Mental
+                    </span>
+                    <span class="text-sm font-bold text-purple-800">
+                        ${categoryAverages.mental.toFixed(1)}
+                    </span>
+                </div>
+                <div class="flex space-x-1">
+                    ${generateProgressBars(categories.mental, 'purple')}
+                </div>
+            </div>`;
+
+        // Goalkeeping attributes (if applicable)
+        if (categories.goalkeeping) {
+            newContent += `
+                <div class="bg-yellow-50 rounded-lg p-3">
+                    <div class="flex items-center justify-between mb-2">
+                        <span class="text-sm font-medium text-yellow-700">
+                            <i class="fas fa-hand-paper mr-1"></i>Goalkeeping
+                        </span>
+                        <span class="text-sm font-bold text-yellow-800">
+                            ${categoryAverages.goalkeeping.toFixed(1)}
+                        </span>
+                    </div>
+                    <div class="flex space-x-1">
+                        ${generateProgressBars(categories.goalkeeping, 'yellow')}
+                    </div>
+                </div>`;
+        }
+
+        // Notes (if any)
+        if (attributes.notes) {
+            newContent += `
+                <div class="bg-gray-50 rounded-lg p-3">
+                    <p class="text-sm text-gray-600">
+                        <i class="fas fa-sticky-note mr-1 text-gray-400"></i>
+                        ${attributes.notes}
+                    </p>
+                </div>`;
+        }
+
+        attributesContainer.innerHTML = newContent;
+    }
+
+    // Update the button text if needed
+    const editButton = playerCard.querySelector('button');
+    if (editButton) {
+        editButton.innerHTML = '<i class="fas fa-edit mr-2"></i>Edit Attributes';
+    }
+}
+
+function closeAttributesModal() {
+    const modal = document.getElementById('attributes-modal');
+    if (modal) {
+        modal.remove();
+    }
+}
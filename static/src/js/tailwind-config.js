@@ -0,0 +1,32 @@
+// Enhanced Tailwind configuration
+if (typeof tailwind !== 'undefined') {
+    tailwind.config = {
+        theme: {
+            extend: {
+                fontFamily: {
+                    sans: ['Roboto', 'ui-sans-serif', 'system-ui'],
+                    mono: ['Roboto Mono', 'ui-monospace', 'monospace']
+                },
+                fontWeight: {
+                    'ultra-light': 100,
+                    'extra-light': 200,
+                    'light': 300,
+                    'normal': 400,
+                    'medium': 500,
+                    'semibold': 600,
+                    'bold': 700,
+                    'extra-bold': 800,
+                    'black': 900
+                },
+                screens: {
+                    'xs': '475px',
+                    '3xl': '1600px'
+                },
+                spacing: {
+                    '18': '4.5rem',
+                    '88': '22rem'
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,1237 @@
+// Values from the page: data-* attributes of this script's tag
+const teamsPage = document.currentScript.dataset;
+
+// Drag and drop functionality
+let draggedElement = null;
+
+document.querySelectorAll('.player-item').forEach(item => {
+    item.addEventListener('dragstart', function(e) {
+        draggedElement = this;
+        this.style.opacity = '0.7';
+        this.style.transform = 'scale(0.98)';
+    });
+
+    item.addEventListener('dragend', function(e) {
+        this.style.opacity = '1';
+        this.style.transform = 'scale(1)';
+        draggedElement = null;
+    });
+
+    item.addEventListener('click', function(e) {
+        if (this.parentElement.id === 'team-a') {
+            movePlayer(this, 'available-players');
+        } else if (this.parentElement.id === 'team-b') {
+            movePlayer(this, 'available-players');
+        } else {
+            // Move to team with fewer players
+            const teamACount = document.querySelectorAll('#team-a .player-item').length;
+            const teamBCount = document.querySelectorAll('#team-b .player-item').length;
+            const targetTeam = teamACount <= teamBCount ? 'team-a' : 'team-b';
+            movePlayer(this, targetTeam);
+        }
+    });
+});
+
+['available-players', 'team-a', 'team-b'].forEach(containerId => {
+    const container = document.getElementById(containerId);
+
+    container.addEventListener('dragover', function(e) {
+        e.preventDefault();
+        this.style.backgroundColor = '#f1f5f9';
+        this.style.borderColor = '#94a3b8';
+    });
+
+    container.addEventListener('dragleave', function(e) {
+        if (containerId === 'team-a') {
+            this.style.backgroundColor = '#eff6ff';
+            this.style.borderColor = '#93c5fd';
+        } else if (containerId === 'team-b') {
+            this.style.backgroundColor = '#fef2f2';
+            this.style.borderColor = '#fca5a5';
+        } else {
+            this.style.backgroundColor = '';
+        }
+    });
+
+    container.addEventListener('drop', function(e) {
+        e.preventDefault();
+        if (containerId === 'team-a') {
+            this.style.backgroundColor = '#eff6ff';
+            this.style.borderColor = '#93c5fd';
+        } else if (containerId === 'team-b') {
+            this.style.backgroundColor = '#fef2f2';
+            this.style.borderColor = '#fca5a5';
+        } else {
+            this.style.backgroundColor = '';
+        }
+        if (draggedElement) {
+            movePlayer(draggedElement, containerId);
+        }
+    });
+});
+
+function movePlayer(playerElement, targetContainerId) {
+    const targetContainer = document.getElementById(targetContainerId);
+    const playerId = playerElement.getAttribute('data-player-id');
+
+    // Remove existing hidden input
+    const existingInput = playerElement.querySelector('input[type="hidden"]');
+    if (existingInput) {
+        existingInput.remove();
+    }
+
+    // Update styling and add new hidden input if needed
+    playerElement.className = 'player-item p-3 border rounded-lg cursor-pointer transition-colors';
+
+    if (targetContainerId === 'team-a') {
+        playerElement.className += ' bg-blue-100 border-blue-200';
+        const hiddenInput = document.createElement('input');
+        hiddenInput.type = 'hidden';
+        hiddenInput.name = 'team_a';
+        hiddenInput.value = playerId;
+        playerElement.appendChild(hiddenInput);
+    } else if (targetContainerId === 'team-b') {
+        playerElement.className += ' bg-red-100 border-red-200';
+        const hiddenInput = document.createElement('input');
+        hiddenInput.type = 'hidden';
+        hiddenInput.name = 'team_b';
+        hiddenInput.value = playerId;
+        playerElement.appendChild(hiddenInput);
+    } else {
+        playerElement.className += ' border-gray-300 hover:bg-gray-50';
+    }
+
+    targetContainer.appendChild(playerElement);
+
+    // Update team counts and ratings
+    updateTeamCounts();
+    updateTeamRatings();
+}
+
+function updateTeamCounts() {
+    const teamACount = document.querySelectorAll('#team-a .player-item').length;
+    const teamBCount = document.querySelectorAll('#team-b .player-item').length;
+
+    document.getElementById('team-a-count').textContent = `${teamACount} player${teamACount !== 1 ? 's' : ''}`;
+    document.getElementById('team-b-count').textContent = `${teamBCount} player${teamBCount !== 1 ? 's' : ''}`;
+}
+
+function updateTeamRatings() {
+    // Show/hide rating sections based on whether teams have players
+    const teamACount = document.querySelectorAll('#team-a .player-item').length;
+    const teamBCount = document.querySelectorAll('#team-b .player-item').length;
+
+    const teamARatings = document.getElementById('team-a-ratings');
+    const teamBRatings = document.getElementById('team-b-ratings');
+
+    if (teamACount > 0) {
+        teamARatings.classList.remove('hidden');
+    } else {
+        teamARatings.classList.add('hidden');
+    }
+
+    if (teamBCount > 0) {
+        teamBRatings.classList.remove('hidden');
+    } else {
+        teamBRatings.classList.add('hidden');
+    }
+
+    // Only fetch ratings if both teams have players
+    if (teamACount > 0 || teamBCount > 0) {
+        fetchTeamRatings();
+    }
+}
+
+function fetchTeamRatings() {
+    // Get current team compositions
+    const teamAPlayers = Array.from(document.querySelectorAll('#team-a .player-item')).map(el => el.getAttribute('data-player-id'));
+    const teamBPlayers = Array.from(document.querySelectorAll('#team-b .player-item')).map(el => el.getAttribute('data-player-id'));
+
+    // Create temporary form data to send current team state
+    const formData = new FormData();
+    teamAPlayers.forEach(id => formData.append('team_a', id));
+    teamBPlayers.forEach(id => formData.append('team_b', id));
+
+    fetch(`/games/${teamsPage.gameId}/team-ratings`, {
+        method: 'POST',
+        body: formData
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            updateRatingDisplay('team-a', data.team_a_ratings);
+            updateRatingDisplay('team-b', data.team_b_ratings);
+        }
+    })
+    .catch(error => {
+        console.error('Error fetching team ratings:', error);
+    });
+}
+
+function updateRatingDisplay(teamPrefix, ratings) {
+    document.getElementById(`${teamPrefix}-attack`).textContent = ratings.attack;
+    document.getElementById(`${teamPrefix}-midfield`).textContent = ratings.midfield;
+    document.getElementById(`${teamPrefix}-defense`).textContent = ratings.defense;
+    document.getElementById(`${teamPrefix}-pace`).textContent = ratings.pace;
+    document.getElementById(`${teamPrefix}-overall`).textContent = ratings.overall;
+}
+
+// Initialize on page load
+document.addEventListener('DOMContentLoaded', function() {
+    updateTeamCounts();
+    updateTeamRatings();
+});
+
+// Algorithm selection handling
+document.querySelectorAll('input[name="balance-algorithm"]').forEach(radio => {
+    radio.addEventListener('change', function() {
+        // Update visual selection
+        document.querySelectorAll('.algorithm-option').forEach(option => {
+            option.classList.remove('ring-2', 'ring-blue-500', 'ring-purple-500', 'ring-green-500', 'bg-blue-50', 'bg-purple-50', 'bg-green-50');
+            option.classList.add('bg-white');
+        });
+
+        const selectedLabel = document.querySelector(`label[for="${this.id}"]`);
+        const selectedValue = this.value;
+
+        // Apply color scheme based on selection
+        if (selectedValue === 'smart_draft') {
+            selectedLabel.classList.add('ring-2', 'ring-blue-500', 'bg-blue-50');
+            document.getElementById('balance-button-text').textContent = 'Smart Balance Teams';
+            updateAlgorithmDescription('Balances teams using player attributes, historical performance, recent form, and participation reliability', 'bg-blue-100');
+        } else if (selectedValue === 'bandit') {
+            selectedLabel.classList.add('ring-2', 'ring-purple-500', 'bg-purple-50');
+            document.getElementById('balance-button-text').textContent = 'ML Bandit Balance';
+            updateAlgorithmDescription('Uses Multi-Armed Bandit machine learning to explore different balancing strategies and learn the most effective approach', 'bg-purple-100');
+        } else if (selectedValue === 'simulated_annealing') {
+            selectedLabel.classList.add('ring-2', 'ring-green-500', 'bg-green-50');
+            document.getElementById('balance-button-text').textContent = 'ML Annealing Balance';
+            updateAlgorithmDescription('Advanced optimization algorithm that iteratively improves team balance by accepting and rejecting player swaps', 'bg-green-100');
+        }
+    });
+});
+
+function updateAlgorithmDescription(text, bgClass) {
+    const desc = document.getElementById('algorithm-description');
+    desc.textContent = '';
+    desc.className = `text-xs text-gray-600 text-center p-2 rounded ${bgClass}`;
+    desc.innerHTML = `<i class="fas fa-info-circle mr-1"></i>${text}`;
+}
+
+// Initialize first option as selected
+document.getElementById('smart-draft').checked = true;
+document.querySelector('label[for="smart-draft"]').classList.add('ring-2', 'ring-blue-500', 'bg-blue-50');
+
+// Auto balance teams using selected algorithm
+document.getElementById('auto-balance').addEventListener('click', function() {
+    const button = this;
+    const originalText = button.innerHTML;
+    const selectedAlgorithm = document.querySelector('input[name="balance-algorithm"]:checked').value;
+
+    console.log('Auto-balance clicked! Selected algorithm:', selectedAlgorithm);
+
+    // Show loading state based on algorithm
+    button.disabled = true;
+    let loadingText = '<i class="fas fa-spinner fa-spin mr-2"></i>';
+
+    if (selectedAlgorithm === 'bandit') {
+        loadingText += 'ML Learning...';
+    } else if (selectedAlgorithm === 'simulated_annealing') {
+        loadingText += 'Optimizing...';
+    } else {
+        loadingText += 'Analyzing players...';
+    }
+
+    button.innerHTML = loadingText;
+
+    // Call the balancing API with selected algorithm
+    console.log('Making API call to:', `/games/${teamsPage.gameId}/auto-balance`);
+    console.log('Request body:', JSON.stringify({algorithm: selectedAlgorithm}));
+
+    fetch(`/games/${teamsPage.gameId}/auto-balance`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            algorithm: selectedAlgorithm
+        })
+    })
+    .then(response => {
+        console.log('API Response status:', response.status);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        return response.json();
+    })
+    .then(data => {
+        console.log('API Response data:', data);
+        if (data.success) {
+            // Check current view mode
+            const isFieldView = !document.getElementById('field-view-content').classList.contains('hidden');
+
+            if (isFieldView) {
+                // Clear all positioned players in field view
+                document.querySelectorAll('.positioned-player').forEach(player => {
+                    movePlayerToAvailable(player);
+                });
+
+                // Auto-balance doesn't position on field, just assigns to teams
+                // Show message to user about manual positioning
+                showToast(`${data.method} completed! Drag players to specific positions on the field.`, 'success');
+
+                // Update available players styling to show team assignments
+                data.team_a.forEach(player => {
+                    const playerElement = document.querySelector(`[data-player-id="${player.id}"]`);
+                    if (playerElement && !playerElement.classList.contains('positioned-player')) {
+                        playerElement.className = 'field-player-item team-a-player p-2 bg-blue-100 border border-blue-300 rounded-lg cursor-pointer hover:bg-blue-50 transition-colors shadow-sm';
+                        // Add hidden input for team assignment
+                        const existingInput = playerElement.querySelector('input[type="hidden"]');
+                        if (existingInput) existingInput.remove();
+                        const hiddenInput = document.createElement('input');
+                        hiddenInput.type = 'hidden';
+                        hiddenInput.name = 'team_a';
+                        hiddenInput.value = player.id;
+                        playerElement.appendChild(hiddenInput);
+                    }
+                });
+
+                data.team_b.forEach(player => {
+                    const playerElement = document.querySelector(`[data-player-id="${player.id}"]`);
+                    if (playerElement && !playerElement.classList.contains('positioned-player')) {
+                        playerElement.className = 'field-player-item team-b-player p-2 bg-red-100 border border-red-300 rounded-lg cursor-pointer hover:bg-red-50 transition-colors shadow-sm';
+                        // Add hidden input for team assignment
+                        const existingInput = playerElement.querySelector('input[type="hidden"]');
+                        if (existingInput) existingInput.remove();
+                        const hiddenInput = document.createElement('input');
+                        hiddenInput.type = 'hidden';
+                        hiddenInput.name = 'team_b';
+                        hiddenInput.value = player.id;
+                        playerElement.appendChild(hiddenInput);
+                    }
+                });
+            } else {
+                // Original list view behavior
+                document.querySelectorAll('#team-a .player-item, #team-b .player-item').forEach(player => {
+                    movePlayer(player, 'available-players');
+                });
+
+                // Assign players to balanced teams
+                data.team_a.forEach(player => {
+                    const playerElement = document.querySelector(`[data-player-id="${player.id}"]`);
+                    if (playerElement) {
+                        movePlayer(playerElement, 'team-a');
+                    }
+                });
+
+                data.team_b.forEach(player => {
+                    const playerElement = document.querySelector(`[data-player-id="${player.id}"]`);
+                    if (playerElement) {
+                        movePlayer(playerElement, 'team-b');
+                    }
+                });
+
+                // Show success message with affinity information
+                let successMessage = `Teams balanced using ${data.method}!`;
+                if (data.affinity_considered && data.team_a_affinity !== undefined) {
+                    successMessage += ` (Team A Affinity: ${data.team_a_affinity.toFixed(1)}, Team B Affinity: ${data.team_b_affinity.toFixed(1)})`;
+                }
+                showToast(successMessage, 'success');
+            }
+
+            // Update ratings displays with the returned data
+            updateRatingDisplay('team-a', data.team_a_ratings);
+            updateRatingDisplay('team-b', data.team_b_ratings);
+
+            // Update team counts
+            updateTeamCounts();
+
+            // Show results
+            showBalanceResults(data);
+        } else {
+            showToast(data.error || 'Failed to balance teams', 'error');
+        }
+    })
+    .catch(error => {
+        console.error('Error balancing teams:', error);
+        console.error('Full error details:', error);
+        showToast('Error balancing teams: ' + error.message, 'error');
+    })
+    .finally(() => {
+        // Restore button
+        button.disabled = false;
+        button.innerHTML = originalText;
+    });
+});
+
+function showBalanceResults(data) {
+    const resultsDiv = document.getElementById('balance-results');
+    const methodSpan = document.getElementById('method-used');
+    const fitnessSpan = document.getElementById('fitness-score');
+    const iterationsSpan = document.getElementById('iterations-used');
+
+    let methodText = `Method: ${data.method}`;
+
+    // Add affinity information for smart_draft algorithm
+    if (data.affinity_considered && data.team_a_affinity !== undefined) {
+        methodText += ` | Affinity: A=${data.team_a_affinity.toFixed(1)}, B=${data.team_b_affinity.toFixed(1)}`;
+    }
+
+    methodSpan.textContent = methodText;
+
+    if (data.fitness_score) {
+        fitnessSpan.textContent = `| Fitness: ${data.fitness_score.toFixed(2)}/10.0`;
+        fitnessSpan.classList.remove('hidden');
+    } else {
+        fitnessSpan.classList.add('hidden');
+    }
+
+    if (data.iterations) {
+        iterationsSpan.textContent = `| Iterations: ${data.iterations}`;
+        iterationsSpan.classList.remove('hidden');
+    } else {
+        iterationsSpan.classList.add('hidden');
+    }
+
+    resultsDiv.classList.remove('hidden');
+
+    // Hide results after 10 seconds
+    setTimeout(() => {
+        resultsDiv.classList.add('hidden');
+    }, 10000);
+}
+
+// View toggle functionality
+document.getElementById('list-view').addEventListener('click', function() {
+    switchToView('list');
+});
+
+document.getElementById('field-view').addEventListener('click', function() {
+    switchToView('field');
+});
+
+function switchToView(view) {
+    const listViewBtn = document.getElementById('list-view');
+    const fieldViewBtn = document.getElementById('field-view');
+    const listContent = document.getElementById('list-view-content');
+    const fieldContent = document.getElementById('field-view-content');
+
+    if (view === 'list') {
+        listViewBtn.classList.add('active', 'bg-blue-100', 'border-blue-300', 'text-blue-700');
+        listViewBtn.classList.remove('hover:bg-gray-50');
+        fieldViewBtn.classList.remove('active', 'bg-blue-100', 'border-blue-300', 'text-blue-700');
+        fieldViewBtn.classList.add('hover:bg-gray-50');
+
+        listContent.classList.remove('hidden');
+        fieldContent.classList.add('hidden');
+    } else {
+        fieldViewBtn.classList.add('active', 'bg-blue-100', 'border-blue-300', 'text-blue-700');
+        fieldViewBtn.classList.remove('hover:bg-gray-50');
+        listViewBtn.classList.remove('active', 'bg-blue-100', 'border-blue-300', 'text-blue-700');
+        listViewBtn.classList.add('hover:bg-gray-50');
+
+        listContent.classList.add('hidden');
+        fieldContent.classList.remove('hidden');
+
+        // Initialize field view
+        updateFormation();
+    }
+}
+
+// Formation configurations with pixel coordinates for 800x533 field
+const formations = {
+    '4-4-2': {
+        'A': {
+            'GK': [{left: '80px', top: '266px', label: 'GK'}],
+            'DEF': [
+                {left: '170px', top: '133px', label: 'RB'}, 
+                {left: '170px', top: '216px', label: 'CB'}, 
+                {left: '170px', top: '316px', label: 'CB'}, 
+                {left: '170px', top: '400px', label: 'LB'}
+            ],
+            'MID': [
+                {left: '310px', top: '160px', label: 'RM'}, 
+                {left: '310px', top: '240px', label: 'CM'}, 
+                {left: '310px', top: '293px', label: 'CM'}, 
+                {left: '310px', top: '373px', label: 'LM'}
+            ],
+            'FWD': [
+                {left: '370px', top: '196px', label: 'ST'}, 
+                {left: '370px', top: '337px', label: 'ST'}
+            ]
+        },
+        'B': {
+            'GK': [{left: '720px', top: '266px', label: 'GK'}],
+            'DEF': [
+                {left: '630px', top: '133px', label: 'LB'}, 
+                {left: '630px', top: '216px', label: 'CB'}, 
+                {left: '630px', top: '316px', label: 'CB'}, 
+                {left: '630px', top: '400px', label: 'RB'}
+            ],
+            'MID': [
+                {left: '490px', top: '160px', label: 'LM'}, 
+                {left: '490px', top: '240px', label: 'CM'}, 
+                {left: '490px', top: '293px', label: 'CM'}, 
+                {left: '490px', top: '373px', label: 'RM'}
+            ],
+            'FWD': [
+                {left: '430px', top: '196px', label: 'ST'}, 
+                {left: '430px', top: '337px', label: 'ST'}
+            ]
+        }
+    },
+    '4-3-3': {
+        'A': {
+            'GK': [{left: '80px', top: '266px', label: 'GK'}],
+            'DEF': [
+                {left: '170px', top: '120px', label: 'RB'}, 
+                {left: '170px', top: '200px', label: 'CB'}, 
+                {left: '170px', top: '333px', label: 'CB'}, 
+                {left: '170px', top: '413px', label: 'LB'}
+            ],
+            'MID': [
+                {left: '310px', top: '176px', label: 'CM'}, 
+                {left: '310px', top: '266px', label: 'CM'}, 
+                {left: '310px', top: '357px', label: 'CM'}
+            ],
+            'FWD': [
+                {left: '370px', top: '120px', label: 'RW'}, 
+                {left: '370px', top: '266px', label: 'ST'}, 
+                {left: '370px', top: '413px', label: 'LW'}
+            ]
+        },
+        'B': {
+            'GK': [{left: '720px', top: '266px', label: 'GK'}],
+            'DEF': [
+                {left: '630px', top: '120px', label: 'LB'}, 
+                {left: '630px', top: '200px', label: 'CB'}, 
+                {left: '630px', top: '333px', label: 'CB'}, 
+                {left: '630px', top: '413px', label: 'RB'}
+            ],
+            'MID': [
+                {left: '490px', top: '176px', label: 'CM'}, 
+                {left: '490px', top: '266px', label: 'CM'}, 
+                {left: '490px', top: '357px', label: 'CM'}
+            ],
+            'FWD': [
+                {left: '430px', top: '120px', label: 'LW'}, 
+                {left: '430px', top: '266px', label: 'ST'}, 
+                {left: '430px', top: '413px', label: 'RW'}
+            ]
+        }
+    },
+    '3-5-2': {
+        'A': {
+            'GK': [{left: '80px', top: '266px', label: 'GK'}],
+            'DEF': [
+                {left: '170px', top: '160px', label: 'CB'}, 
+                {left: '170px', top: '266px', label: 'CB'}, 
+                {left: '170px', top: '373px', label: 'CB'}
+            ],
+            'MID': [
+                {left: '250px', top: '100px', label: 'RWB'}, 
+                {left: '310px', top: '186px', label: 'CM'}, 
+                {left: '310px', top: '266px', label: 'CM'}, 
+                {left: '310px', top: '347px', label: 'CM'}, 
+                {left: '250px', top: '433px', label: 'LWB'}
+            ],
+            'FWD': [
+                {left: '370px', top: '213px', label: 'ST'}, 
+                {left: '370px', top: '320px', label: 'ST'}
+            ]
+        },
+        'B': {
+            'GK': [{left: '720px', top: '266px', label: 'GK'}],
+            'DEF': [
+                {left: '630px', top: '160px', label: 'CB'}, 
+                {left: '630px', top: '266px', label: 'CB'}, 
+                {left: '630px', top: '373px', label: 'CB'}
+            ],
+            'MID': [
+                {left: '550px', top: '100px', label: 'LWB'}, 
+                {left: '490px', top: '186px', label: 'CM'}, 
+                {left: '490px', top: '266px', label: 'CM'}, 
+                {left: '490px', top: '347px', label: 'CM'}, 
+                {left: '550px', top: '433px', label: 'RWB'}
+            ],
+            'FWD': [
+                {left: '430px', top: '213px', label: 'ST'}, 
+                {left: '430px', top: '320px', label: 'ST'}
+            ]
+        }
+    },
+    '4-5-1': {
+        'A': {
+            'GK': [{left: '80px', top: '266px', label: 'GK'}],
+            'DEF': [
+                {left: '170px', top: '120px', label: 'RB'}, 
+                {left: '170px', top: '200px', label: 'CB'}, 
+                {left: '170px', top: '333px', label: 'CB'}, 
+                {left: '170px', top: '413px', label: 'LB'}
+            ],
+            'MID': [
+                {left: '270px', top: '100px', label: 'RM'}, 
+                {left: '310px', top: '186px', label: 'CM'}, 
+                {left: '310px', top: '266px', label: 'CM'}, 
+                {left: '310px', top: '347px', label: 'CM'}, 
+                {left: '270px', top: '433px', label: 'LM'}
+            ],
+            'FWD': [
+                {left: '370px', top: '266px', label: 'ST'}
+            ]
+        },
+        'B': {
+            'GK': [{left: '720px', top: '266px', label: 'GK'}],
+            'DEF': [
+                {left: '630px', top: '120px', label: 'LB'}, 
+                {left: '630px', top: '200px', label: 'CB'}, 
+                {left: '630px', top: '333px', label: 'CB'}, 
+                {left: '630px', top: '413px', label: 'RB'}
+            ],
+            'MID': [
+                {left: '530px', top: '100px', label: 'LM'}, 
+                {left: '490px', top: '186px', label: 'CM'}, 
+                {left: '490px', top: '266px', label: 'CM'}, 
+                {left: '490px', top: '347px', label: 'CM'}, 
+                {left: '530px', top: '433px', label: 'RM'}
+            ],
+            'FWD': [
+                {left: '430px', top: '266px', label: 'ST'}
+            ]
+        }
+    },
+    '3-4-3': {
+        'A': {
+            'GK': [{left: '80px', top: '266px', label: 'GK'}],
+            'DEF': [
+                {left: '170px', top: '160px', label: 'CB'}, 
+                {left: '170px', top: '266px', label: 'CB'}, 
+                {left: '170px', top: '373px', label: 'CB'}
+            ],
+            'MID': [
+                {left: '310px', top: '146px', label: 'CM'}, 
+                {left: '310px', top: '230px', label: 'CM'}, 
+                {left: '310px', top: '303px', label: 'CM'}, 
+                {left: '310px', top: '387px', label: 'CM'}
+            ],
+            'FWD': [
+                {left: '370px', top: '120px', label: 'RW'}, 
+                {left: '370px', top: '266px', label: 'ST'}, 
+                {left: '370px', top: '413px', label: 'LW'}
+            ]
+        },
+        'B': {
+            'GK': [{left: '720px', top: '266px', label: 'GK'}],
+            'DEF': [
+                {left: '630px', top: '160px', label: 'CB'}, 
+                {left: '630px', top: '266px', label: 'CB'}, 
+                {left: '630px', top: '373px', label: 'CB'}
+            ],
+            'MID': [
+                {left: '490px', top: '146px', label: 'CM'}, 
+                {left: '490px', top: '230px', label: 'CM'}, 
+                {left: '490px', top: '303px', label: 'CM'}, 
+                {left: '490px', top: '387px', label: 'CM'}
+            ],
+            'FWD': [
+                {left: '430px', top: '120px', label: 'LW'}, 
+                {left: '430px', top: '266px', label: 'ST'}, 
+                {left: '430px', top: '413px', label: 'RW'}
+            ]
+        }
+    },
+    '5-3-2': {
+        'A': {
+            'GK': [{left: '80px', top: '266px', label: 'GK'}],
+            'DEF': [
+                {left: '170px', top: '80px', label: 'RB'}, 
+                {left: '170px', top: '160px', label: 'CB'}, 
+                {left: '170px', top: '266px', label: 'CB'}, 
+                {left: '170px', top: '373px', label: 'CB'}, 
+                {left: '170px', top: '453px', label: 'LB'}
+            ],
+            'MID': [
+                {left: '310px', top: '186px', label: 'CM'}, 
+                {left: '310px', top: '266px', label: 'CM'}, 
+                {left: '310px', top: '347px', label: 'CM'}
+            ],
+            'FWD': [
+                {left: '370px', top: '213px', label: 'ST'}, 
+                {left: '370px', top: '320px', label: 'ST'}
+            ]
+        },
+        'B': {
+            'GK': [{left: '720px', top: '266px', label: 'GK'}],
+            'DEF': [
+                {left: '630px', top: '80px', label: 'LB'}, 
+                {left: '630px', top: '160px', label: 'CB'}, 
+                {left: '630px', top: '266px', label: 'CB'}, 
+                {left: '630px', top: '373px', label: 'CB'}, 
+                {left: '630px', top: '453px', label: 'RB'}
+            ],
+            'MID': [
+                {left: '490px', top: '186px', label: 'CM'}, 
+                {left: '490px', top: '266px', label: 'CM'}, 
+                {left: '490px', top: '347px', label: 'CM'}
+            ],
+            'FWD': [
+                {left: '430px', top: '213px', label: 'ST'}, 
+                {left: '430px', top: '320px', label: 'ST'}
+            ]
+        }
+    }
+};
+
+// Formation change handler
+document.getElementById('formation').addEventListener('change', function() {
+    updateFormation();
+});
+
+function updateFormation() {
+    const selectedFormation = document.getElementById('formation').value;
+    const formationConfig = formations[selectedFormation];
+
+    // Save currently positioned players before clearing
+    const positionedPlayers = [];
+    document.querySelectorAll('.positioned-player').forEach(player => {
+        positionedPlayers.push({
+            element: player.cloneNode(true),
+            team: player.closest('.formation-positions').getAttribute('data-team'),
+            playerId: player.getAttribute('data-player-id')
+        });
+        // Move player back to available pool temporarily
+        movePlayerToAvailable(player);
+    });
+
+    // Clear existing position slots
+    document.querySelectorAll('.formation-positions').forEach(container => {
+        container.innerHTML = '';
+    });
+
+    // Create position slots for both teams
+    ['A', 'B'].forEach(team => {
+        const container = document.querySelector(`.formation-positions[data-team="${team}"]`);
+        const teamConfig = formationConfig[team];
+
+        Object.entries(teamConfig).forEach(([position, positions]) => {
+            positions.forEach((pos, index) => {
+                const slot = document.createElement('div');
+                slot.className = `position-slot ${position.toLowerCase()}`;
+                slot.setAttribute('data-position', position);
+                slot.setAttribute('data-team', team);
+                slot.setAttribute('data-position-short', pos.label);
+
+                // Apply positioning using absolute positioning
+                slot.style.left = pos.left;
+                slot.style.top = pos.top;
+                slot.style.position = 'absolute';
+
+                // Add position label
+                const label = document.createElement('div');
+                label.className = 'position-label';
+                label.textContent = pos.label;
+                slot.appendChild(label);
+
+                // Add drop functionality
+                addDropFunctionality(slot);
+
+                container.appendChild(slot);
+            });
+        });
+    });
+
+    // Show message about formation change
+    if (positionedPlayers.length > 0) {
+        showToast(`Formation changed to ${selectedFormation}. Previously positioned players moved to player pool.`, 'info');
+    }
+}
+
+function getPositionLabel(position, index) {
+    const labels = {
+        'GK': ['GK'],
+        'DEF': ['CB', 'CB', 'LB', 'RB', 'CB'],
+        'MID': ['CM', 'CM', 'LM', 'RM', 'CDM'],
+        'FWD': ['ST', 'LW', 'RW', 'CF', 'ST']
+    };
+    return labels[position][index] || position;
+}
+
+// Field drag and drop functionality
+let fieldDraggedElement = null;
+
+// Add drag functionality to player cards
+function initializeFieldDragDrop() {
+    document.querySelectorAll('.player-card').forEach(item => {
+        item.addEventListener('dragstart', function(e) {
+            fieldDraggedElement = this;
+            this.style.opacity = '0.7';
+            this.style.transform = 'scale(0.95)';
+        });
+
+        item.addEventListener('dragend', function(e) {
+            this.style.opacity = '1';
+            this.style.transform = '';
+            fieldDraggedElement = null;
+        });
+    });
+}
+
+function addDropFunctionality(slot) {
+    slot.addEventListener('dragover', function(e) {
+        e.preventDefault();
+        this.classList.add('drop-active');
+    });
+
+    slot.addEventListener('dragleave', function(e) {
+        this.classList.remove('drop-active');
+    });
+
+    slot.addEventListener('drop', function(e) {
+        e.preventDefault();
+        this.classList.remove('drop-active');
+
+        if (fieldDraggedElement) {
+            const team = this.getAttribute('data-team');
+            const position = this.getAttribute('data-position');
+            const playerId = fieldDraggedElement.getAttribute('data-player-id');
+
+            // Position validation (optional - could add player attribute checking)
+            const validationResult = validatePlayerPosition(playerId, position);
+
+            // Check if slot is already occupied
+            const existingPlayer = this.querySelector('.field-player-item');
+            if (existingPlayer) {
+                // Move existing player back to available
+                movePlayerToAvailable(existingPlayer);
+            }
+
+            // Move player to position
+            movePlayerToPosition(fieldDraggedElement, this, team, position);
+
+            // Show position suggestion if not ideal
+            if (!validationResult.ideal) {
+                showPositionHint(validationResult.message);
+            }
+        }
+    });
+}
+
+function movePlayerToPosition(playerElement, positionSlot, team, position) {
+    // Update player styling based on team
+    playerElement.className = `player-card positioned-player`;
+
+    if (team === 'A') {
+        playerElement.classList.add('team-a');
+    } else {
+        playerElement.classList.add('team-b');
+    }
+
+    // Update hidden input for form submission
+    const existingInput = playerElement.querySelector('input[type="hidden"]');
+    if (existingInput) {
+        existingInput.remove();
+    }
+
+    const hiddenInput = document.createElement('input');
+    hiddenInput.type = 'hidden';
+    hiddenInput.name = team === 'A' ? 'team_a' : 'team_b';
+    hiddenInput.value = playerElement.getAttribute('data-player-id');
+    playerElement.appendChild(hiddenInput);
+
+    // Position player in slot
+    positionSlot.appendChild(playerElement);
+
+    // Re-initialize drag and drop for the positioned player
+    playerElement.addEventListener('dragstart', function(e) {
+        fieldDraggedElement = this;
+        this.style.opacity = '0.7';
+    });
+
+    playerElement.addEventListener('dragend', function(e) {
+        this.style.opacity = '1';
+        fieldDraggedElement = null;
+    });
+
+    // Update team counts and ratings
+    updateTeamCounts();
+    updateTeamRatings();
+}
+
+function movePlayerToAvailable(playerElement) {
+    // Reset player styling to unassigned
+    playerElement.className = 'player-card unassigned p-3 bg-gray-50 border-2 border-gray-200 rounded-lg cursor-move hover:bg-gray-100 hover:border-gray-300 transition-all duration-200 shadow-sm hover:shadow-md';
+
+    // Remove hidden input
+    const existingInput = playerElement.querySelector('input[type="hidden"]');
+    if (existingInput) {
+        existingInput.remove();
+    }
+
+    // Move back to available players
+    document.getElementById('field-available-players').appendChild(playerElement);
+
+    // Re-initialize drag and drop for the available player
+    playerElement.addEventListener('dragstart', function(e) {
+        fieldDraggedElement = this;
+        this.style.opacity = '0.7';
+        this.style.transform = 'scale(0.95)';
+    });
+
+    playerElement.addEventListener('dragend', function(e) {
+        this.style.opacity = '1';
+        this.style.transform = '';
+        fieldDraggedElement = null;
+    });
+
+    // Update team counts and ratings
+    updateTeamCounts();
+    updateTeamRatings();
+}
+
+// Position validation
+function validatePlayerPosition(playerId, targetPosition) {
+    // This is a basic validation - in real implementation, 
+    // you could fetch player attributes and match against position
+
+    // For now, just provide helpful hints
+    const suggestions = {
+        'GK': 'Consider players with high goalkeeping, handling, and distribution skills',
+        'DEF': 'Best for players with good tackling, marking, and defensive positioning',
+        'MID': 'Ideal for players with strong passing, vision, and stamina',
+        'FWD': 'Perfect for players with high shooting, pace, and finishing ability'
+    };
+
+    return {
+        ideal: true, // Could implement actual checking here
+        message: suggestions[targetPosition] || 'Position assigned successfully'
+    };
+}
+
+function showPositionHint(message) {
+    // Create a temporary hint that fades after 3 seconds
+    const hint = document.createElement('div');
+    hint.className = 'fixed top-4 right-4 bg-blue-100 border border-blue-300 text-blue-800 px-4 py-2 rounded-lg text-sm z-50';
+    hint.innerHTML = `<i class="fas fa-info-circle mr-2"></i>${message}`;
+
+    document.body.appendChild(hint);
+
+    setTimeout(() => {
+        hint.style.opacity = '0';
+        hint.style.transition = 'opacity 0.5s ease';
+        setTimeout(() => {
+            if (hint.parentNode) {
+                hint.parentNode.removeChild(hint);
+            }
+        }, 500);
+    }, 3000);
+}
+
+// Formation constraints validation
+function validateFormationConstraints() {
+    const selectedFormation = document.getElementById('formation').value;
+    const [defenders, midfielders, forwards] = selectedFormation.split('-').map(Number);
+
+    // Count current positioned players
+    const teamACounts = {
+        'GK': document.querySelectorAll('.formation-positions[data-team="A"] .position-slot.gk .positioned-player').length,
+        'DEF': document.querySelectorAll('.formation-positions[data-team="A"] .position-slot.def .positioned-player').length,
+        'MID': document.querySelectorAll('.formation-positions[data-team="A"] .position-slot.mid .positioned-player').length,
+        'FWD': document.querySelectorAll('.formation-positions[data-team="A"] .position-slot.fwd .positioned-player').length
+    };
+
+    const teamBCounts = {
+        'GK': document.querySelectorAll('.formation-positions[data-team="B"] .position-slot.gk .positioned-player').length,
+        'DEF': document.querySelectorAll('.formation-positions[data-team="B"] .position-slot.def .positioned-player').length,
+        'MID': document.querySelectorAll('.formation-positions[data-team="B"] .position-slot.mid .positioned-player').length,
+        'FWD': document.querySelectorAll('.formation-positions[data-team="B"] .position-slot.fwd .positioned-player').length
+    };
+
+    const issues = [];
+
+    // Check Team A
+    if (teamACounts.DEF > defenders) issues.push(`Team A has too many defenders (${teamACounts.DEF}/${defenders})`);
+    if (teamACounts.MID > midfielders) issues.push(`Team A has too many midfielders (${teamACounts.MID}/${midfielders})`);
+    if (teamACounts.FWD > forwards) issues.push(`Team A has too many forwards (${teamACounts.FWD}/${forwards})`);
+
+    // Check Team B
+    if (teamBCounts.DEF > defenders) issues.push(`Team B has too many defenders (${teamBCounts.DEF}/${defenders})`);
+    if (teamBCounts.MID > midfielders) issues.push(`Team B has too many midfielders (${teamBCounts.MID}/${midfielders})`);
+    if (teamBCounts.FWD > forwards) issues.push(`Team B has too many forwards (${teamBCounts.FWD}/${forwards})`);
+
+    return issues;
+}
+
+// Add formation validation warning
+function checkFormationCompliance() {
+    const issues = validateFormationConstraints();
+    const warningDiv = document.getElementById('formation-warning');
+
+    if (issues.length > 0) {
+        if (!warningDiv) {
+            const warning = document.createElement('div');
+            warning.id = 'formation-warning';
+            warning.className = 'mt-2 p-2 bg-yellow-100 border border-yellow-300 text-yellow-800 rounded text-sm';
+            warning.innerHTML = `<i class="fas fa-exclamation-triangle mr-2"></i>Formation issues: ${issues.join(', ')}`;
+            document.querySelector('.bg-green-50').appendChild(warning);
+        } else {
+            warningDiv.innerHTML = `<i class="fas fa-exclamation-triangle mr-2"></i>Formation issues: ${issues.join(', ')}`;
+        }
+    } else if (warningDiv) {
+        warningDiv.remove();
+    }
+}
+
+// Initialize field drag and drop when switching to field view
+document.addEventListener('DOMContentLoaded', function() {
+    initializeFieldDragDrop();
+});
+
+// Export teams as image to clipboard
+async function exportTeamsAsImage() {
+    try {
+        // Create a canvas
+        const canvas = document.createElement('canvas');
+        const ctx = canvas.getContext('2d');
+
+        // Get team players
+        const teamAPlayers = document.querySelectorAll('#team-a .player-item');
+        const teamBPlayers = document.querySelectorAll('#team-b .player-item');
+        const maxPlayers = Math.max(teamAPlayers.length, teamBPlayers.length);
+
+        // Professional matchday dimensions
+        canvas.width = 800;
+        canvas.height = 600;
+
+        // Create dark professional background
+        const gradient = ctx.createLinearGradient(0, 0, canvas.width, canvas.height);
+        gradient.addColorStop(0, '#0f172a');
+        gradient.addColorStop(0.5, '#1e293b');
+        gradient.addColorStop(1, '#0f172a');
+        ctx.fillStyle = gradient;
+        ctx.fillRect(0, 0, canvas.width, canvas.height);
+
+        // Add subtle pattern overlay
+        ctx.globalAlpha = 0.05;
+        for (let i = 0; i < canvas.width; i += 40) {
+            for (let j = 0; j < canvas.height; j += 40) {
+                ctx.fillStyle = '#ffffff';
+                ctx.fillRect(i, j, 2, 2);
+            }
+        }
+        ctx.globalAlpha = 1;
+
+        // Header section with accent
+        ctx.fillStyle = '#059669';
+        ctx.fillRect(0, 0, canvas.width, 8);
+
+        // Main title
+        ctx.font = 'bold 28px Inter, -apple-system, BlinkMacSystemFont, sans-serif';
+        ctx.fillStyle = '#ffffff';
+        ctx.textAlign = 'center';
+        ctx.fillText('MATCHDAY SQUAD', canvas.width / 2, 50);
+
+        // Subtitle with game info
+        ctx.font = '16px Inter, sans-serif';
+        ctx.fillStyle = '#94a3b8';
+        ctx.fillText(teamsPage.groupName, canvas.width / 2, 75);
+        ctx.fillText(teamsPage.kickoff, canvas.width / 2, 95);
+
+        // Team containers
+        const teamWidth = 340;
+        const teamHeight = 420;
+        const teamY = 130;
+        const team1X = 50;
+        const team2X = 410;
+
+        // Helper function to get player position
+        function getPlayerPosition(playerId) {
+            const positionedPlayer = document.querySelector(`.formation-positions .positioned-player[data-player-id="${playerId}"]`);
+            if (positionedPlayer) {
+                const positionSlot = positionedPlayer.closest('.position-slot');
+                if (positionSlot) {
+                    const position = positionSlot.getAttribute('data-position');
+                    switch(position) {
+                        case 'GK': return { short: 'GK', full: 'Goalkeeper', color: '#f59e0b' };
+                        case 'DEF': return { short: 'DEF', full: 'Defender', color: '#059669' };
+                        case 'MID': return { short: 'MID', full: 'Midfielder', color: '#0ea5e9' };
+                        case 'FWD': return { short: 'ATT', full: 'Attacker', color: '#dc2626' };
+                    }
+                }
+            }
+            return null;
+        }
+
+        // Draw team containers
+        function drawTeamContainer(x, y, teamName, teamColor, players) {
+            // Team container background
+            ctx.fillStyle = '#1e293b';
+            ctx.fillRect(x, y, teamWidth, teamHeight);
+
+            // Team container border
+            ctx.strokeStyle = teamColor;
+            ctx.lineWidth = 3;
+            ctx.strokeRect(x, y, teamWidth, teamHeight);
+
+            // Team header
+            ctx.fillStyle = teamColor;
+            ctx.fillRect(x, y, teamWidth, 50);
+
+            // Team name
+            ctx.font = 'bold 20px Inter, sans-serif';
+            ctx.fillStyle = '#ffffff';
+            ctx.textAlign = 'center';
+            ctx.fillText(teamName, x + teamWidth/2, y + 32);
+
+            // Player count
+            ctx.font = '12px Inter, sans-serif';
+            ctx.fillStyle = '#e2e8f0';
+            ctx.fillText(`${players.length} PLAYERS`, x + teamWidth/2, y + teamHeight - 15);
+
+            // Players list
+            let playerY = y + 70;
+            players.forEach((player, index) => {
+                const playerId = player.getAttribute('data-player-id');
+                const playerName = player.querySelector('span.text-gray-900').textContent.trim();
+                const position = getPlayerPosition(playerId);
+
+                // Player row background (alternating)
+                if (index % 2 === 0) {
+                    ctx.fillStyle = '#334155';
+                    ctx.fillRect(x + 10, playerY - 15, teamWidth - 20, 28);
+                }
+
+                // Player number
+                ctx.font = 'bold 14px Inter, sans-serif';
+                ctx.fillStyle = '#94a3b8';
+                ctx.textAlign = 'left';
+                ctx.fillText((index + 1).toString().padStart(2, '0'), x + 20, playerY + 5);
+
+                // Position badge
+                if (position) {
+                    ctx.fillStyle = position.color;
+                    ctx.fillRect(x + 50, playerY - 8, 35, 16);
+                    ctx.font = 'bold 10px Inter, sans-serif';
+                    ctx.fillStyle = '#ffffff';
+                    ctx.textAlign = 'center';
+                    ctx.fillText(position.short, x + 67.5, playerY + 2);
+                }
+
+                // Player name
+                ctx.font = '14px Inter, sans-serif';
+                ctx.fillStyle = '#ffffff';
+                ctx.textAlign = 'left';
+                const nameX = position ? x + 95 : x + 50;
+                const maxNameWidth = teamWidth - (nameX - x) - 20;
+
+                // Truncate long names
+                let displayName = playerName.toUpperCase();
+                ctx.fillStyle = '#ffffff';
+                const nameWidth = ctx.measureText(displayName).width;
+                if (nameWidth > maxNameWidth) {
+                    while (ctx.measureText(displayName + '...').width > maxNameWidth && displayName.length > 0) {
+                        displayName = displayName.slice(0, -1);
+                    }
+                    displayName += '...';
+                }
+
+                ctx.fillText(displayName, nameX, playerY + 5);
+
+                playerY += 28;
+            });
+        }
+
+        // Draw both teams
+        drawTeamContainer(team1X, teamY, 'TEAM BLUE', '#0ea5e9', Array.from(teamAPlayers));
+        drawTeamContainer(team2X, teamY, 'TEAM RED', '#dc2626', Array.from(teamBPlayers));
+
+        // Center divider line
+        ctx.strokeStyle = '#475569';
+        ctx.lineWidth = 2;
+        ctx.setLineDash([10, 10]);
+        ctx.beginPath();
+        ctx.moveTo(canvas.width / 2, teamY);
+        ctx.lineTo(canvas.width / 2, teamY + teamHeight);
+        ctx.stroke();
+        ctx.setLineDash([]);
+
+        // VS indicator
+        ctx.fillStyle = '#334155';
+        ctx.beginPath();
+        ctx.arc(canvas.width / 2, teamY + teamHeight/2, 25, 0, 2 * Math.PI);
+        ctx.fill();
+        ctx.strokeStyle = '#059669';
+        ctx.lineWidth = 3;
+        ctx.stroke();
+
+        ctx.font = 'bold 16px Inter, sans-serif';
+        ctx.fillStyle = '#ffffff';
+        ctx.textAlign = 'center';
+        ctx.fillText('VS', canvas.width / 2, teamY + teamHeight/2 + 5);
+
+        // Position legend
+        const legendY = 570;
+        const legends = [
+            { short: 'GK', color: '#f59e0b', label: 'Goalkeeper' },
+            { short: 'DEF', color: '#059669', label: 'Defender' },
+            { short: 'MID', color: '#0ea5e9', label: 'Midfielder' },
+            { short: 'ATT', color: '#dc2626', label: 'Attacker' }
+        ];
+
+        ctx.font = '10px Inter, sans-serif';
+        ctx.fillStyle = '#64748b';
+        ctx.textAlign = 'center';
+        ctx.fillText('POSITIONS', canvas.width / 2, legendY - 15);
+
+        let legendX = (canvas.width - (legends.length * 80)) / 2;
+        legends.forEach(legend => {
+            // Legend badge
+            ctx.fillStyle = legend.color;
+            ctx.fillRect(legendX, legendY - 8, 20, 12);
+            ctx.font = 'bold 8px Inter, sans-serif';
+            ctx.fillStyle = '#ffffff';
+            ctx.textAlign = 'center';
+            ctx.fillText(legend.short, legendX + 10, legendY - 1);
+
+            // Legend label
+            ctx.font = '9px Inter, sans-serif';
+            ctx.fillStyle = '#94a3b8';
+            ctx.fillText(legend.label, legendX + 25, legendY - 1);
+
+            legendX += 80;
+        });
+
+        // Convert canvas to blob
+        canvas.toBlob(async (blob) => {
+            try {
+                // Copy to clipboard
+                await navigator.clipboard.write([
+                    new ClipboardItem({
+                        'image/png': blob
+                    })
+                ]);
+
+                showToast('Professional matchday squad exported to clipboard!', 'success');
+            } catch (clipboardError) {
+                console.error('Clipboard error:', clipboardError);
+
+                // Fallback: Download the image
+                const url = URL.createObjectURL(blob);
+                const a = document.createElement('a');
+                a.href = url;
+                a.download = `matchday-squad-${teamsPage.date}.png`;
+                document.body.appendChild(a);
+                a.click();
+                document.body.removeChild(a);
+                URL.revokeObjectURL(url);
+
+                showToast('Matchday squad downloaded (clipboard not supported)', 'info');
+            }
+        }, 'image/png');
+
+    } catch (error) {
+        console.error('Export error:', error);
+        showToast('Failed to export matchday squad', 'error');
+    }
+}
+
+// Toast notifications are now handled globally by base.html
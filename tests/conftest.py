@@ -0,0 +1,105 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import create_app, normalize_database_url
+from database import db
+from models import Game, Group, GroupMembership, MatchEvent, TeamAssignment, User
+
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def database_url(request, tmp_path):
+    """
+    Every test runs on SQLite and on the PostgreSQL database at
+    TEST_DATABASE_URL (e.g. postgresql://localhost/footmob_test), whose
+    tables are dropped after each test. Without one, the PostgreSQL runs
+    are skipped.
+    """
+    if request.param == 'sqlite':
+        return f'sqlite:///{tmp_path / "footmob.db"}'
+
+    url = os.environ.get('TEST_DATABASE_URL')
+    if not url:
+        pytest.skip('set TEST_DATABASE_URL to run against PostgreSQL')
+    try:
+        engine = create_engine(normalize_database_url(url))
+        engine.connect().close()
+        engine.dispose()
+    except Exception as e:
+        # psycopg2 missing or no server
+        pytest.skip(f'PostgreSQL at TEST_DATABASE_URL is not available: {e}')
+    return url
+
+
+@pytest.fixture
+def app(database_url):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'WTF_CSRF_ENABLED': False,
+        'GAME_SWEEP_INTERVAL': 0,
+        'COMPRESSION_ENABLED': False,
+        # Nothing written under instance/
+        'TEMPLATE_CACHE_DIR': '',
+    })
+    with app.app_context():
+        db.create_all()
+
+    yield app
+
+    # Identity and profile caches are per process and keyed by ID; don't carry them into the next database
+    from services.player_stats import _stats_cache
+    from services.user_snapshot import _snapshot_cache
+    _stats_cache.clear()
+    _snapshot_cache.clear()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def login(client, user_id):
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+
+def add_group(players=10):
+    """A group whose first member is its admin; returns (group, users)"""
+    group = Group(name='Tuesday Football')
+    db.session.add(group)
+    offset = User.query.count()
+    users = [
+        User(username=f'player{offset + i}', password_hash='x', display_name=f'Player {offset + i}')
+        for i in range(players)
+    ]
+    db.session.add_all(users)
+    db.session.flush()
+    for i, user in enumerate(users):
+        db.session.add(GroupMembership(user_id=user.id, group_id=group.id, is_admin=i == 0))
+    db.session.commit()
+    return group, users
+
+
+def add_finished_games(group, users, count):
+    """`count` finished games, a week apart, with both teams and two goals each"""
+    first = datetime.now(timezone.utc) - timedelta(days=7 * (Game.query.filter_by(group_id=group.id).count() + count))
+    games = []
+    for k in range(count):
+        game = Game(group_id=group.id, datetime=first + timedelta(days=7 * k), status='finished')
+        db.session.add(game)
+        db.session.flush()
+        for i, user in enumerate(users):
+            db.session.add(TeamAssignment(game_id=game.id, user_id=user.id, team='A' if i % 2 == 0 else 'B'))
+        db.session.add(MatchEvent(game_id=game.id, event_type='goal', scorer_id=users[0].id, assist_id=users[2].id))
+        db.session.add(MatchEvent(game_id=game.id, event_type='goal', scorer_id=users[1].id))
+        games.append(game)
+    db.session.commit()
+    return games
@@ -0,0 +1,183 @@
+import os
+
+import pytest
+
+from database import db
+from models import Game, MatchEvent, PlayerForm, PlayerPairStat, StatsAppliedGame
+from services.game_status import expire_past_games
+from services.match_stats import load_game_lines, record_finished_game
+from services.pair_stats import PAIR_FIELDS, PairStatsRebuilder
+from services.schema_migrations import Operations, load_migration
+from services.recent_form import RecentFormRebuilder
+from tests.conftest import add_finished_games, add_group, login
+
+
+def stored_pairs(group_id):
+    pairs = {}
+    for row in PlayerPairStat.query.filter_by(group_id=group_id):
+        totals = {field: getattr(row, field) for field in PAIR_FIELDS}
+        # Pairs split up by a team correction keep an all-zero row
+        if any(totals.values()):
+            pairs[(row.player_id, row.other_player_id)] = totals
+    return pairs
+
+
+def stored_forms(group_id):
+    return {form.user_id: form.get_recent() for form in PlayerForm.query.filter_by(group_id=group_id) if form.results}
+
+
+def rebuild(rebuilder):
+    """Feed the group's recorded games to a rebuilder, as `flask stats rebuild` does"""
+    recorded = Game.query.join(StatsAppliedGame, StatsAppliedGame.game_id == Game.id).filter(
+        Game.group_id == rebuilder.group_id
+    ).order_by(Game.id)
+    for game in recorded:
+        rebuilder.add_game(game, *load_game_lines(game.id))
+    return rebuilder
+
+
+def rebuilt_pairs(group_id):
+    rebuilder = rebuild(PairStatsRebuilder(group_id))
+    return {pair: totals for pair, totals in rebuilder.totals.items() if any(totals.values())}
+
+
+def rebuilt_forms(group_id):
+    rebuilder = rebuild(RecentFormRebuilder(group_id))
+    return {
+        user_id: [entry for _, entry in sorted(entries, key=lambda item: item[0], reverse=True)]
+        for user_id, entries in rebuilder.entries.items()
+    }
+
+
+@pytest.fixture
+def ended_games(app, client):
+    """Two matches ended through the app, with the group admin logged in"""
+    with app.app_context():
+        group, users = add_group(players=6)
+        games = add_finished_games(group, users, 2)
+        for game in games:
+            game.status = 'in_progress'
+        db.session.commit()
+        ids = {'group_id': group.id, 'game_ids': [game.id for game in games], 'user_ids': [user.id for user in users]}
+    login(client, ids['user_ids'][0])
+    for game_id in ids['game_ids']:
+        assert client.post(f'/games/{game_id}/end').status_code == 302
+    return ids
+
+
+def test_end_match_records_pairs_and_form(app, ended_games):
+    with app.app_context():
+        pairs = stored_pairs(ended_games['group_id'])
+        assert pairs == rebuilt_pairs(ended_games['group_id'])
+        first, _, third = ended_games['user_ids'][:3]
+        assert pairs[(first, third)]['games_together'] == 2
+        forms = stored_forms(ended_games['group_id'])
+        assert forms == rebuilt_forms(ended_games['group_id'])
+        # One goal, no assists, two draws
+        assert forms[first] == [(1, 0, 0), (1, 0, 0)]
+
+
+def test_corrections_after_the_match_update_pairs_and_form(app, client, ended_games):
+    first_game, second_game = ended_games['game_ids']
+    users = ended_games['user_ids']
+    with app.app_context():
+        before = stored_pairs(ended_games['group_id']), stored_forms(ended_games['group_id'])
+
+    client.post(f'/games/{first_game}/events', data={'event_type': 'goal', 'scorer_id': users[1], 'assist_id': users[3]})
+    client.post(f'/games/{first_game}/events/remove', data={'action': 'remove_goal', 'player_id': users[0]})
+    client.post(f'/games/{second_game}/events/remove', data={'action': 'remove_assist', 'player_id': users[2]})
+    client.post(f'/games/{second_game}/assists', data={'assist_player_id': users[4]})
+    client.post(f'/games/{second_game}/teams', data={'team_a': users[:2] + users[4:], 'team_b': users[2:4]})
+
+    with app.app_context():
+        after = stored_pairs(ended_games['group_id']), stored_forms(ended_games['group_id'])
+        assert after == (rebuilt_pairs(ended_games['group_id']), rebuilt_forms(ended_games['group_id']))
+        assert after[0] != before[0] and after[1] != before[1]
+
+
+def test_corrections_record_games_finished_without_the_end_button(app, client):
+    with app.app_context():
+        group, users = add_group(players=4)
+        game = add_finished_games(group, users, 1)[0]
+        group_id, game_id, user_ids = group.id, game.id, [user.id for user in users]
+    login(client, user_ids[0])
+
+    client.post(f'/games/{game_id}/events', data={'event_type': 'goal', 'scorer_id': user_ids[0]})
+
+    with app.app_context():
+        assert StatsAppliedGame.query.filter_by(game_id=game_id).count() == 1
+        assert stored_pairs(group_id) == rebuilt_pairs(group_id)
+        assert stored_forms(group_id) == rebuilt_forms(group_id)
+
+
+def test_correcting_an_older_game_keeps_the_form_window(app, client):
+    with app.app_context():
+        group, users = add_group(players=4)
+        games = add_finished_games(group, users, PlayerForm.WINDOW + 2)
+        for game in games:
+            record_finished_game(game)
+        db.session.commit()
+        group_id, user_ids = group.id, [user.id for user in users]
+        # Inside the window, and the oldest game, which has already dropped out of it
+        corrected = [games[4].id, games[0].id]
+    login(client, user_ids[0])
+
+    for game_id in corrected:
+        client.post(f'/games/{game_id}/events', data={'event_type': 'goal', 'scorer_id': user_ids[1]})
+
+    with app.app_context():
+        forms = stored_forms(group_id)
+        assert forms == rebuilt_forms(group_id)
+        assert len(forms[user_ids[1]]) == PlayerForm.WINDOW
+        # The second player's team won the corrected game
+        assert forms[user_ids[1]][len(games) - 1 - 4] == (2, 0, 1)
+
+
+def test_games_recorded_out_of_order_keep_the_form_order(app):
+    with app.app_context():
+        group, users = add_group(players=4)
+        older, newer = add_finished_games(group, users, 2)
+        db.session.add(MatchEvent(game_id=older.id, event_type='goal', scorer_id=users[0].id))
+        # The older game finishes last
+        for game in (newer, older):
+            record_finished_game(game)
+        db.session.commit()
+
+        forms = stored_forms(group.id)
+        assert forms == rebuilt_forms(group.id)
+        assert forms[users[0].id] == [(1, 0, 0), (2, 0, 1)]
+
+
+def test_games_finished_by_the_sweeper_are_recorded(app):
+    with app.app_context():
+        group, users = add_group(players=4)
+        games = add_finished_games(group, users, 3)
+        for game in games:
+            game.status = 'upcoming'
+        # No teams: nothing to record
+        empty = Game(group_id=group.id, datetime=games[0].datetime, status='upcoming')
+        db.session.add(empty)
+        db.session.commit()
+
+        assert expire_past_games() == 4
+        assert StatsAppliedGame.query.count() == 3
+        assert stored_pairs(group.id) == rebuilt_pairs(group.id)
+        assert stored_forms(group.id) == rebuilt_forms(group.id)
+        assert len(stored_forms(group.id)[users[0].id]) == 3
+
+
+def test_stats_migration_loads_finished_matches(app):
+    with app.app_context():
+        group, users = add_group(players=4)
+        add_finished_games(group, users, 3)
+        for model in (PlayerPairStat, PlayerForm, StatsAppliedGame):
+            model.__table__.drop(db.engine)
+
+        migration = load_migration(4, os.path.join(app.root_path, 'migrations', '0004_match_stats_tables.py'))
+        with db.engine.begin() as connection:
+            migration.upgrade(Operations(connection))
+
+        assert StatsAppliedGame.query.count() == 3
+        assert stored_pairs(group.id) == rebuilt_pairs(group.id)
+        assert stored_forms(group.id) == rebuilt_forms(group.id)
+        assert stored_pairs(group.id)[(users[0].id, users[2].id)]['games_together'] == 3
@@ -0,0 +1,79 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+from flask import Flask
+
+from app import create_app, load_config
+from database import db
+from models import FeedItem, Game, POTMVote
+from tests.conftest import add_finished_games, add_group, login
+
+
+def test_utc_datetime_round_trip(app):
+    with app.app_context():
+        group, _ = add_group(players=1)
+        kickoff = datetime(2024, 3, 31, 20, 30, tzinfo=timezone(timedelta(hours=2)))
+        aware = Game(group_id=group.id, datetime=kickoff)
+        naive = Game(group_id=group.id, datetime=datetime(2024, 3, 31, 18, 30))
+        db.session.add_all([aware, naive])
+        db.session.commit()
+        ids = aware.id, naive.id
+        db.session.expunge_all()
+
+        for game_id in ids:
+            stored = db.session.get(Game, game_id).datetime
+            assert stored == kickoff
+            assert stored.utcoffset() == timedelta(0)
+        # Comparisons in SQL see the same UTC value
+        assert Game.query.filter(Game.datetime == kickoff).count() == 2
+
+
+def test_main_pages(app, client):
+    with app.app_context():
+        group, users = add_group()
+        game = add_finished_games(group, users, 3)[-1]
+        group_id, game_id, user_id = group.id, game.id, users[0].id
+    login(client, user_id)
+
+    for url in ['/', '/dashboard', '/history', '/history/page', '/profile', '/settings',
+                f'/groups/{group_id}', f'/groups/{group_id}/members', f'/games/{game_id}']:
+        response = client.get(url, follow_redirects=True)
+        assert response.status_code == 200, url
+
+
+def test_end_match_announces_player_of_the_match(app, client):
+    with app.app_context():
+        group, users = add_group(players=6)
+        game = add_finished_games(group, users, 1)[0]
+        game.status = 'in_progress'
+        # Two votes for the second player beat one for the first
+        for voter, voted_for in [(users[2], users[1]), (users[3], users[1]), (users[4], users[0])]:
+            db.session.add(POTMVote(game_id=game.id, voter_id=voter.id, voted_for_id=voted_for.id))
+        db.session.commit()
+        group_id, game_id, admin_id = group.id, game.id, users[0].id
+    login(client, admin_id)
+
+    assert client.post(f'/games/{game_id}/end').status_code == 302
+
+    with app.app_context():
+        assert db.session.get(Game, game_id).status == 'finished'
+        feed = [item.content for item in FeedItem.query.filter_by(group_id=group_id)]
+        assert 'Match finished: Team A 1 - 1 Team B' in feed
+        assert 'Player of the Match: Player 1' in feed
+
+
+def test_replica_url_is_read_like_the_primary(tmp_path):
+    app = Flask(__name__)
+    load_config(app, {'DATABASE_REPLICA_URL': 'postgres://footmob@replica/footmob'})
+    assert app.config['DATABASE_REPLICA_URL'] == 'postgresql+psycopg2://footmob@replica/footmob'
+
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "footmob.db"}',
+        'DATABASE_REPLICA_URL': 'sqlite:///replica.db',
+        'GAME_SWEEP_INTERVAL': 0,
+        'TEMPLATE_CACHE_DIR': '',
+    })
+    engine = app.extensions['db_replica']
+    assert engine.url.database == os.path.join(app.instance_path, 'replica.db')
+    engine.dispose()
@@ -0,0 +1,78 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from database import db
+from models import Game
+from services.sql_instrumentation import QUERY_BUDGETS, QueryBudgetExceeded, assert_query_budget, count_queries, query_budget
+from tests.conftest import add_finished_games, add_group, login
+
+
+@pytest.fixture
+def member(app, client):
+    """A logged in admin of a group with finished games and one upcoming game"""
+    with app.app_context():
+        group, users = add_group()
+        finished = add_finished_games(group, users, 25)[-1]
+        upcoming = Game(group_id=group.id, datetime=datetime.now(timezone.utc) + timedelta(days=2))
+        db.session.add(upcoming)
+        db.session.commit()
+        ids = {'group_id': group.id, 'finished_id': finished.id, 'upcoming_id': upcoming.id}
+        login(client, users[0].id)
+    # The first request loads the identity snapshot
+    client.get('/dashboard')
+    return ids
+
+
+@pytest.mark.parametrize('endpoint, url', [
+    ('main.dashboard', '/dashboard'),
+    ('main.game_history', '/history'),
+    ('main.game_history_page', '/history/page'),
+    ('main.profile', '/profile'),
+    ('games.view', '/games/{finished_id}'),
+    ('games.view', '/games/{upcoming_id}'),
+])
+def test_key_pages_stay_within_budget(client, member, endpoint, url):
+    response = assert_query_budget(client, url.format(**member), QUERY_BUDGETS[endpoint])
+    assert response.status_code == 200
+
+
+def test_query_budget_raises_under_testing(app):
+    with app.app_context():
+        with pytest.raises(QueryBudgetExceeded):
+            with query_budget(1):
+                db.session.execute(text('SELECT 1'))
+                db.session.execute(text('SELECT 2'))
+
+
+def test_count_queries_ignores_other_threads(app):
+    def other_request():
+        with app.app_context():
+            for _ in range(5):
+                db.session.execute(text('SELECT 1'))
+
+    with app.app_context():
+        with count_queries() as stats:
+            thread = threading.Thread(target=other_request)
+            thread.start()
+            thread.join()
+            db.session.execute(text('SELECT 1'))
+
+    assert stats.count == 1
+
+
+def test_failed_statement_does_not_skew_later_timings(app):
+    with app.app_context():
+        with count_queries() as stats:
+            with pytest.raises(DBAPIError):
+                db.session.execute(text('SELECT * FROM no_such_table'))
+            db.session.rollback()
+            db.session.execute(text('SELECT 1'))
+        connection_info = db.session.connection().info
+
+    assert stats.count == 1
+    assert stats.duration < 1
+    assert 'query_start' not in connection_info
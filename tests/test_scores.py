@@ -0,0 +1,72 @@
+from database import db
+from models import Game, Group, GroupMembership, MatchEvent, POTMVote, TeamAssignment, User
+from services.player_stats import get_user_stats
+from services.scores import load_scores
+from services.sql_instrumentation import count_queries
+from tests.conftest import add_finished_games, add_group, login
+
+
+def page_queries(client, url):
+    with count_queries() as stats:
+        response = client.get(url)
+    assert response.status_code == 200
+    return stats.count
+
+
+def test_load_scores(app):
+    with app.app_context():
+        group, users = add_group()
+        games = add_finished_games(group, users, 3)
+
+        scores = load_scores([game.id for game in games])
+
+        assert scores == {game.id: {'team_a': 1, 'team_b': 1} for game in games}
+        assert scores[games[0].id] == games[0].get_score()
+
+
+def test_profile_stats(app):
+    with app.app_context():
+        group, users = add_group(players=4)
+        games = add_finished_games(group, users, 3)
+        _, strangers = add_group(players=1)
+        # Team B's own goal wins the first game for Team A; a goal by someone not on either team doesn't count
+        db.session.add(MatchEvent(game_id=games[0].id, event_type='own_goal', scorer_id=users[3].id))
+        db.session.add(MatchEvent(game_id=games[1].id, event_type='goal', scorer_id=strangers[0].id))
+        goalless = Game(group_id=group.id, datetime=games[-1].datetime, status='finished')
+        db.session.add(goalless)
+        db.session.flush()
+        for i, user in enumerate(users):
+            db.session.add(TeamAssignment(game_id=goalless.id, user_id=user.id, team='A' if i % 2 == 0 else 'B'))
+        for game in games[:2]:
+            db.session.add(POTMVote(voter_id=users[1].id, game_id=game.id, voted_for_id=users[0].id))
+        db.session.commit()
+
+        first, fourth = get_user_stats(users[0].id), get_user_stats(users[3].id)
+
+        assert first['totals'] == {'games_played': 4, 'wins': 1, 'draws': 3, 'losses': 0,
+                                   'goals': 3, 'assists': 0, 'own_goals': 0, 'potm_awards': 2}
+        assert [stats['id'] for stats in first['groups']] == [group.id]
+        assert fourth['totals']['losses'] == 1 and fourth['totals']['own_goals'] == 1
+
+
+def test_game_lists_query_count_does_not_grow(app, client):
+    # Fewer games than a history page holds, so every game is on the page
+    n = 5
+    with app.app_context():
+        group, users = add_group()
+        add_finished_games(group, users, n)
+        group_id, user_id = group.id, users[0].id
+    login(client, user_id)
+    # The first request loads the identity snapshot
+    client.get('/dashboard')
+
+    urls = ['/history', f'/groups/{group_id}', '/dashboard']
+    before = {url: page_queries(client, url) for url in urls}
+
+    with app.app_context():
+        group = db.session.get(Group, group_id)
+        users = User.query.join(GroupMembership).filter(GroupMembership.group_id == group_id).order_by(User.id).all()
+        add_finished_games(group, users, n)
+    after = {url: page_queries(client, url) for url in urls}
+
+    assert after == before
@@ -0,0 +1,106 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import create_app
+from database import db
+from models import AvailabilityVote, Game, GroupMembership, MatchEvent, Notification
+from services.sharding import split_database, use_shard
+from services.sqlite_profile import DEFAULT_PRAGMAS
+from tests.conftest import add_group, login
+
+
+def _config(path, **overrides):
+    return dict({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'WTF_CSRF_ENABLED': False,
+        'GAME_SWEEP_INTERVAL': 0,
+        'COMPRESSION_ENABLED': False,
+        'TEMPLATE_CACHE_DIR': '',
+        # Fail fast instead of queueing for a lock the test holds
+        'SQLITE_PRAGMAS': dict(DEFAULT_PRAGMAS, busy_timeout=200),
+    }, **overrides)
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    """Two groups on different shards of a two-shard layout, both joined by one player"""
+    path = tmp_path / 'footmob.db'
+    unsplit = create_app(_config(path))
+    with unsplit.app_context():
+        db.create_all()
+        first, first_users = add_group(4)
+        second, second_users = add_group(4)
+        db.session.add(GroupMembership(user_id=first_users[1].id, group_id=second.id))
+        now = datetime.now(timezone.utc)
+        live = Game(group_id=first.id, datetime=now - timedelta(hours=1), status='in_progress')
+        upcoming = Game(group_id=first.id, datetime=now + timedelta(days=2), status='upcoming')
+        other = Game(group_id=second.id, datetime=now + timedelta(days=2), status='upcoming')
+        db.session.add_all([live, upcoming, other])
+        db.session.commit()
+        ids = {
+            'first': first.id, 'second': second.id, 'live': live.id, 'upcoming': upcoming.id, 'other': other.id,
+            'first_admin': first_users[0].id, 'second_admin': second_users[0].id, 'both': first_users[1].id,
+        }
+        db.engine.dispose()
+    split_database(str(path), str(tmp_path / 'shards'), 2, db.metadata, echo=lambda line: None)
+
+    app = create_app(_config(path, DB_SHARDS=2, SHARD_DIR=str(tmp_path / 'shards')))
+    yield app, path, ids
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+        for engine in app.extensions['db_shards'].engines:
+            engine.dispose()
+
+
+def test_match_day_writes_pass_while_the_directory_is_locked(sharded):
+    app, path, ids = sharded
+    client = app.test_client()
+    login(client, ids['first_admin'])
+    etag = client.get(f'/games/{ids["live"]}').headers['ETag']
+
+    # Another group's write transaction holds the directory's write lock
+    other_group = sqlite3.connect(path, isolation_level=None)
+    other_group.execute('BEGIN IMMEDIATE')
+    try:
+        for i in range(20):
+            response = client.post(f'/games/{ids["live"]}/events', data={
+                'event_type': 'goal', 'scorer_id': ids['first_admin'], 'minute': i
+            })
+            assert response.status_code == 302
+            response = client.post(f'/games/{ids["upcoming"]}/vote', data={'status': ('in', 'out')[i % 2]})
+            assert response.status_code == 302
+    finally:
+        other_group.execute('ROLLBACK')
+        other_group.close()
+
+    with app.app_context(), use_shard(ids['first']):
+        assert MatchEvent.query.filter_by(game_id=ids['live']).count() == 20
+        assert AvailabilityVote.query.filter_by(game_id=ids['upcoming']).one().status == 'out'
+        # Every member, for every goal
+        assert Notification.query.filter_by(game_id=ids['live'], type='goal_scored').count() == 4 * 20
+    assert client.get(f'/games/{ids["live"]}').headers['ETag'] != etag
+
+
+def test_notifications_from_several_shards(sharded):
+    app, path, ids = sharded
+    for admin, game in (('first_admin', 'upcoming'), ('second_admin', 'other')):
+        client = app.test_client()
+        login(client, ids[admin])
+        client.post(f'/games/{ids[game]}/delete')
+
+    client = app.test_client()
+    login(client, ids['both'])
+    notifications = client.get('/api/notifications').get_json()['notifications']
+    assert {n['group_id'] for n in notifications} == {ids['first'], ids['second']}
+    # IDs stay unique across shards, so they can be marked read one by one
+    assert len({n['id'] for n in notifications}) == len(notifications)
+
+    assert client.post(f'/api/notifications/{notifications[0]["id"]}/read').get_json()['success']
+    assert client.get('/api/notifications/count').get_json()['count'] == len(notifications) - 1
+    assert client.post('/api/notifications/mark-all-read').get_json()['marked_count'] == len(notifications) - 1
+    assert client.get('/api/notifications/count').get_json()['count'] == 0